@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for labxchange_xblocks.
+
+These are not run by the test suite; see each module for how to run it.
+"""
@@ -0,0 +1,120 @@
+"""
+Benchmark the views, handlers and OLX parsing of every block type, on an in-memory runtime.
+
+Results are printed, and saved as JSON so that runs can be compared over time.
+
+Usage: python -m benchmarks.blocks [--repeat N] [--sizes 10,100] [--block-types lx_question,...] [--output FILE]
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import timeit
+
+from labxchange_xblocks import __version__
+
+from .fixtures import FIXTURES
+from .runtime import InMemoryRuntime, clear_caches, configure_django
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def measure(func, repeat):
+    """
+    Return the durations of `repeat` calls of `func`, in seconds, with the block caches cleared before each.
+    """
+    return timeit.repeat(func, setup=clear_caches, number=1, repeat=repeat)
+
+
+def export_olx(runtime, usage_id):
+    """
+    Return the OLX of a block, as exported by the runtime.
+    """
+    olx = io.BytesIO()
+    runtime.export_to_xml(runtime.get_block(usage_id), olx)
+    return olx.getvalue()
+
+
+def run_fixture(fixture, size, repeat):
+    """
+    Measure the operations of `fixture` with content of the given size, and return the results.
+    """
+    runtime = InMemoryRuntime()
+    usage_id = fixture.create(runtime, size)
+    operations = dict(fixture.operations)
+
+    olx = fixture.olx(size) if fixture.olx else export_olx(runtime, usage_id)
+    parse_runtime = InMemoryRuntime()
+    operations['parse_xml'] = lambda _runtime, _usage_id: parse_runtime.parse_xml_string(olx)
+
+    results = []
+    for operation_name, operation in operations.items():
+        durations = measure(lambda: operation(runtime, usage_id), repeat)  # pylint: disable=cell-var-from-loop
+        results.append({
+            'block_type': fixture.block_type,
+            'operation': operation_name,
+            'size': size,
+            'runs': len(durations),
+            'min': min(durations),
+            'median': statistics.median(durations),
+            'mean': statistics.mean(durations),
+        })
+    return results
+
+
+def run(repeat, sizes=None, block_types=None):
+    """
+    Run the benchmarks of the given block types (all by default) and content sizes (all by default).
+    """
+    configure_django()
+    results = []
+    for fixture in FIXTURES:
+        if block_types and fixture.block_type not in block_types:
+            continue
+        fixture_sizes = [size for size in fixture.sizes if size in sizes] if sizes else fixture.sizes
+        # Fixtures that don't scale with the content size are always run
+        for size in fixture_sizes or fixture.sizes[:1]:
+            for result in run_fixture(fixture, size, repeat):
+                print('{block_type:<20} {operation:<34} {size:>5} {median_ms:>10.3f} ms (min {min_ms:.3f})'.format(
+                    median_ms=result['median'] * 1000, min_ms=result['min'] * 1000, **result,
+                ))
+                results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--sizes', help='comma separated content sizes (default: 10,100,1000)')
+    parser.add_argument('--block-types', help='comma separated block types (default: all)')
+    parser.add_argument('--output', help='JSON file to save the results to (default: in benchmarks/results/)')
+    args = parser.parse_args()
+
+    started = datetime.datetime.now(datetime.timezone.utc)
+    results = run(
+        args.repeat,
+        sizes=[int(size) for size in args.sizes.split(',')] if args.sizes else None,
+        block_types=args.block_types.split(',') if args.block_types else None,
+    )
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, started.strftime('%Y%m%dT%H%M%SZ.json'))
+    with open(output, 'w') as output_file:
+        json.dump({
+            'started': started.isoformat(),
+            'labxchange_xblocks': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'results': results,
+        }, output_file, indent=2)
+    print(f'Results saved to {output}')
+
+
+if __name__ == '__main__':
+    main()
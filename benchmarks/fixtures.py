@@ -0,0 +1,265 @@
+"""
+Content fixtures of the block benchmarks, one per block type.
+
+Each fixture creates a block in an `InMemoryRuntime` with content of the given size
+(number of children, annotations, choices, transcript cues or paragraphs, depending on the block type),
+and lists the operations to measure on it.
+"""
+import json
+from collections import namedtuple
+
+from webob import Request
+
+# `operations` maps operation names to functions called with the runtime and the usage id of the block.
+# `olx` returns the OLX to measure `parse_xml` with, or None to export the block.
+Fixture = namedtuple('Fixture', ['block_type', 'sizes', 'create', 'operations', 'olx'])
+
+SIZES = (10, 100, 1000)
+
+
+def paragraphs(count, text='Paragraph'):
+    return ''.join(
+        f'<p>{text} {index} with <b>bold</b> and <a href="/static/{index}.png">a link</a>.</p>\n'
+        for index in range(count)
+    )
+
+
+def handle(handler_name, url='/', suffix='', **request_kwargs):
+    """
+    Return an operation calling the handler `handler_name` of a freshly loaded block.
+
+    Error responses fail the benchmark, so that error paths aren't measured by mistake.
+    """
+    def operation(runtime, usage_id):
+        block = runtime.get_block(usage_id)
+        response = runtime.handle(block, handler_name, Request.blank(url, **request_kwargs), suffix)
+        if response.status_code >= 400:
+            raise AssertionError(f'{handler_name} of {usage_id} returned {response.status}: {response.body[:200]}')
+        return response
+    return operation
+
+
+def render(view_name):
+    """
+    Return an operation rendering the view `view_name` of a freshly loaded block.
+    """
+    def operation(runtime, usage_id):
+        return runtime.render(runtime.get_block(usage_id), view_name, {})
+    return operation
+
+
+def json_body(data):
+    return {'method': 'POST', 'body': json.dumps(data).encode('utf-8')}
+
+
+STUDENT_VIEW_OPERATIONS = {
+    'student_view': render('student_view'),
+    'v1_student_view_data': handle('v1_student_view_data'),
+}
+
+
+def create_image(runtime, size):  # pylint: disable=unused-argument
+    return runtime.create_block('lx_image', {
+        'display_name': 'Image',
+        'alt_text': 'An image',
+        'image_url': '/static/image.png',
+        'caption': 'Caption',
+        'citation': 'Citation',
+        'extended_desc': 'A longer description of the image.',
+    })
+
+
+def create_document(runtime, size):  # pylint: disable=unused-argument
+    return runtime.create_block('lx_document', {
+        'display_name': 'Document',
+        'document_type': 'application/pdf',
+        'document_name': 'document.pdf',
+        'document_url': '/static/document.pdf',
+    })
+
+
+def create_simulation(runtime, size):  # pylint: disable=unused-argument
+    return runtime.create_block('lx_simulation', {
+        'display_name': 'Simulation',
+        'simulation_url': 'https://example.com/simulation/',
+    })
+
+
+def create_narrative(runtime, size):
+    return runtime.create_block('lx_narrative', {
+        'display_name': 'Narrative',
+        'key_points': '<ul><li>Point one.</li><li>Point two.</li></ul>',
+        'narrative': paragraphs(size),
+    })
+
+
+def create_html(runtime, size):
+    return runtime.create_block('lx_html', {'display_name': 'Html', 'data': paragraphs(size)})
+
+
+def html_olx(size):
+    return f'<lx_html display_name="Html">{paragraphs(size)}</lx_html>'
+
+
+def srt(cues):
+    return ''.join(
+        f'{index + 1}\n00:00:{index % 60:02d},000 --> 00:00:{index % 60:02d},900\nCue {index} of the transcript.\n\n'
+        for index in range(cues)
+    )
+
+
+def create_video(runtime, size):
+    usage_id = runtime.create_block('lx_video', {
+        'display_name': 'Video',
+        'youtube_id_1_0': 'p2Q6BrNhdh8',
+        'transcripts': {'en': 'en.srt', 'fr': 'fr.srt'},
+    })
+    for language in ('en', 'fr'):
+        runtime.blockstore.add_file(usage_id, f'{language}.srt', srt(size).encode('utf-8'))
+    return usage_id
+
+
+def create_audio(runtime, size):
+    return runtime.create_block('lx_audio', {
+        'display_name': 'Audio',
+        'embed_code': '<iframe src="https://example.com/track"></iframe>',
+        'transcripts': {
+            language: {'type': 'inlinehtml', 'content': paragraphs(size, 'Transcript')}
+            for language in ('en', 'fr', 'es')
+        },
+    })
+
+
+def choiceresponse(size):
+    return {
+        'type': 'choiceresponse',
+        'question': '<p>Which of these are correct?</p>',
+        'choices': [
+            {
+                'content': f'Choice <b>{index}</b>',
+                'correct': index % 2 == 1,
+                'selected_comment': f'Selected {index}',
+                'unselected_comment': f'Not selected {index}',
+            }
+            for index in range(size)
+        ],
+        'comments': {'0 1': 'Group comment'},
+    }
+
+
+def create_question(runtime, size):
+    return runtime.create_block('lx_question', {
+        'display_name': 'Question',
+        'question_data': choiceresponse(size),
+        'hints': [{'content': 'A hint'}, {'content': 'Another hint'}],
+    })
+
+
+def question_olx(size):
+    choices = ''.join(
+        f'<choice correct="{"true" if index % 2 else "false"}">Choice &lt;b&gt;{index}&lt;/b&gt;'
+        f'<choicehint selected="true">Selected {index}</choicehint>'
+        f'<choicehint selected="false">Not selected {index}</choicehint></choice>'
+        for index in range(size)
+    )
+    return (
+        '<lx_question display_name="Question" max_attempts="0">'
+        '<choiceresponse><label>&lt;p&gt;Which of these are correct?&lt;/p&gt;</label>'
+        f'<checkboxgroup>{choices}<compoundhint value="A B">Group comment</compoundhint></checkboxgroup>'
+        '</choiceresponse>'
+        '<demandhint><hint>A hint</hint><hint>Another hint</hint></demandhint>'
+        '</lx_question>'
+    )
+
+
+def create_case_study(block_type):
+    """
+    Return a fixture creating a case study with `size` image and document children, 10 per section.
+    """
+    def create(runtime, size):
+        children = [
+            create_image(runtime, 1) if index % 2 else create_document(runtime, 1)
+            for index in range(size)
+        ]
+        sections = [
+            {
+                'title': f'Section {start // 10}',
+                'children': [
+                    child
+                    for usage_id in children[start:start + 10]
+                    for child in ({'inlinehtml': paragraphs(2)}, {'usage_id': str(usage_id), 'embed': True})
+                ],
+            }
+            for start in range(0, size, 10)
+        ]
+        return runtime.create_block(block_type, {
+            'display_name': 'Case study',
+            'sections': sections,
+            'attachments': [str(usage_id) for usage_id in children[:5]],
+        }, children=children)
+    return create
+
+
+def create_annotated_video(runtime, size):
+    video_usage_id = create_video(runtime, 10)
+    return runtime.create_block('lx_annotated_video', {
+        'display_name': 'Annotated video',
+        'video_id': str(video_usage_id),
+        'annotations': [
+            {
+                'id': f'annotation-{index}',
+                'title': f'Annotation {index}',
+                'description': f'Description of annotation {index}',
+                'start': index,
+                'end': index + 5,
+                'tags': ['tag'],
+                'image_url': f'/static/annotation-{index}.png',
+                'question': {
+                    'type': 'select',
+                    'question': 'The question',
+                    'answers': [{'text': 'First answer', 'correct': True}, {'text': 'Second answer', 'correct': False}],
+                },
+            }
+            for index in range(size)
+        ],
+    }, children=[video_usage_id])
+
+
+def create_assignment(runtime, size):
+    children = [create_question(runtime, 4) for _ in range(size)]
+    return runtime.create_block('lx_assignment', {'display_name': 'Assignment'}, children=children)
+
+
+FIXTURES = [
+    Fixture('lx_image', (1,), create_image, STUDENT_VIEW_OPERATIONS, None),
+    Fixture('lx_document', (1,), create_document, STUDENT_VIEW_OPERATIONS, None),
+    Fixture('lx_simulation', (1,), create_simulation, STUDENT_VIEW_OPERATIONS, None),
+    Fixture('lx_narrative', SIZES, create_narrative, STUDENT_VIEW_OPERATIONS, None),
+    Fixture('lx_html', SIZES, create_html, STUDENT_VIEW_OPERATIONS, html_olx),
+    Fixture('lx_video', SIZES, create_video, dict(
+        STUDENT_VIEW_OPERATIONS,
+        student_view_user_state=handle('student_view_user_state'),
+        transcript=handle('transcript', url='/?lang=fr', suffix='download'),
+    ), None),
+    Fixture('lx_audio', SIZES, create_audio, dict(
+        STUDENT_VIEW_OPERATIONS,
+        student_view_user_state=handle('student_view_user_state'),
+        transcript=handle('transcript', url='/?lang=fr'),
+    ), None),
+    Fixture('lx_question', SIZES, create_question, dict(
+        STUDENT_VIEW_OPERATIONS,
+        student_view_user_state=handle('student_view_user_state'),
+        # A wrong answer, so that the question can be answered again
+        submit_answer=handle('submit_answer', **json_body({'selected': [0]})),
+    ), question_olx),
+    Fixture('lx_case_study', SIZES, create_case_study('lx_case_study'), STUDENT_VIEW_OPERATIONS, None),
+    Fixture('lx_teaching_guide', SIZES, create_case_study('lx_teaching_guide'), STUDENT_VIEW_OPERATIONS, None),
+    Fixture('lx_annotated_video', SIZES, create_annotated_video, dict(
+        STUDENT_VIEW_OPERATIONS,
+        student_view_data_and_user_state=handle('student_view_data_and_user_state'),
+    ), None),
+    Fixture('lx_assignment', SIZES, create_assignment, dict(
+        STUDENT_VIEW_OPERATIONS,
+        student_view_user_state=handle('student_view_user_state'),
+    ), None),
+]
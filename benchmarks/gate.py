@@ -0,0 +1,297 @@
+"""
+Fail when a hot path of the blocks is slower, or allocates more memory, than its committed baseline.
+
+Each case is warmed up, then timed over repeated samples, and compared on its median.
+Timings are relative to a fixed pure Python reference workload, sampled alternately with the case,
+so that the baseline holds on a faster or slower box, as long as it runs the same Python version.
+Memory is the peak traced by tracemalloc during a single call, which doesn't depend on the box.
+
+Usage: python -m benchmarks.gate [--repeat N] [--threshold 0.25] [--memory-threshold 0.1] [--update-baseline]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+from labxchange_xblocks.fields import RelativeTime
+
+from .fixtures import create_case_study, create_html, create_question, handle, json_body, render
+from .runtime import InMemoryRuntime, clear_caches, configure_django
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# `setup` returns the function to measure, which is called without arguments.
+Case = namedtuple('Case', ['name', 'setup'])
+
+# Samples shorter than this are made of several calls, to reduce the timer noise.
+MIN_SAMPLE_TIME = 0.005
+
+
+def reference_workload():
+    """
+    Fixed pure Python work that the case timings are expressed in.
+    """
+    data = {}
+    for index in range(2000):
+        data[f'key {index}'] = [index, str(index), {'value': index * 2}]
+    return sorted(data.items(), key=lambda item: item[1][1])
+
+
+def operation_case(create, operation, size):
+    """
+    Return the setup of a case measuring `operation` on a block created by `create`, with cold caches.
+    """
+    def setup():
+        runtime = InMemoryRuntime()
+        usage_id = create(runtime, size)
+
+        def call():
+            clear_caches()
+            operation(runtime, usage_id)
+        return call
+    return setup
+
+
+def create_stringresponse(runtime, size):  # pylint: disable=unused-argument
+    return runtime.create_block('lx_question', {
+        'question_data': {
+            'type': 'stringresponse',
+            'question': '<p>What is the answer?</p>',
+            'answers': [f'answer {index}' for index in range(size)],
+            'comments': {f'wrong {index}': f'Comment {index}' for index in range(size)},
+        },
+    })
+
+
+def create_optionresponse(runtime, size):
+    return runtime.create_block('lx_question', {
+        'question_data': {
+            'type': 'optionresponse',
+            'display': 'dropdown',
+            'question': '<p>Which one is correct?</p>',
+            'options': [
+                {'content': f'Option {index}', 'correct': index == size - 1, 'comment': f'Comment {index}'}
+                for index in range(size)
+            ],
+        },
+    })
+
+
+def relative_time_parsing():
+    """
+    Return a function parsing and serializing RelativeTime values of all the supported kinds.
+    """
+    field = RelativeTime()
+    values = [f'{hours:02d}:{minutes:02d}:{minutes:02d}' for hours in range(24) for minutes in range(0, 60, 6)]
+    values += [str(seconds) for seconds in range(0, 86400, 360)]
+
+    def call():
+        for value in values:
+            field.to_json(field.from_json(value))
+    return call
+
+
+CASES = [
+    # QuestionBlock grading, with a wrong answer so that the question can be answered again
+    Case('question_grading_choiceresponse', operation_case(
+        create_question, handle('submit_answer', **json_body({'selected': [0]})), 100,
+    )),
+    Case('question_grading_stringresponse', operation_case(
+        create_stringresponse, handle('submit_answer', **json_body({'response': 'wrong 50'})), 100,
+    )),
+    Case('question_grading_optionresponse', operation_case(
+        create_optionresponse, handle('submit_answer', **json_body({'index': 0})), 100,
+    )),
+    # QuestionBlock user state, loaded by each learner
+    Case('question_student_view_user_state', operation_case(
+        create_question, handle('student_view_user_state'), 50,
+    )),
+    # CaseStudyBlock data assembly
+    Case('case_study_student_view_data', operation_case(
+        create_case_study('lx_case_study'), handle('v1_student_view_data'), 100,
+    )),
+    # Template rendering
+    Case('html_student_view', operation_case(create_html, render('student_view'), 100)),
+    Case('relative_time_parsing', relative_time_parsing),
+]
+
+
+def calls_per_sample(func):
+    """
+    Return how many calls of `func` make a sample of at least `MIN_SAMPLE_TIME`.
+    """
+    number = 1
+    while number < 1000:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= MIN_SAMPLE_TIME:
+            break
+        number *= 2
+    return number
+
+
+def sample(func, number):
+    """
+    Return the mean duration of `number` calls of `func`, in seconds.
+    """
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
+
+
+def relative_time_samples(func, repeat, warmup):
+    """
+    Return `repeat` samples of the duration of a call of `func` relative to the reference workload.
+
+    Each sample of `func` is taken right after a sample of the reference workload, so that both see
+    the same CPU frequency and load, and the garbage collector is paused while sampling.
+    """
+    for _ in range(warmup):
+        func()
+        reference_workload()
+    number = calls_per_sample(func)
+    reference_number = calls_per_sample(reference_workload)
+
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            reference = sample(reference_workload, reference_number)
+            samples.append(sample(func, number) / reference)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return samples
+
+
+def peak_memory(func, calls=3):
+    """
+    Return the peak memory allocated during a call of `func`, in bytes.
+
+    This is the lowest peak over a few calls, as one-off allocations (interned strings, type caches...)
+    can land in any call.
+    """
+    if not hasattr(tracemalloc, 'reset_peak'):
+        return _peak_memory_restarting(func, calls)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(calls):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return min(peaks)
+
+
+def _peak_memory_restarting(func, calls):
+    """
+    `peak_memory` for Python < 3.9, which has no `tracemalloc.reset_peak`: tracing is started for each call.
+
+    Memory allocated by a previous call and freed by this one doesn't lower the peak, so peaks are higher
+    than with `reset_peak`; baselines measured on another Python version aren't comparable anyway.
+    """
+    peaks = []
+    for _ in range(calls):
+        tracemalloc.start()
+        try:
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    return min(peaks)
+
+
+def measure(cases, repeat, warmup):
+    """
+    Return the measurements of each case.
+    """
+    measurements = {}
+    for case in cases:
+        func = case.setup()
+        measurements[case.name] = {
+            'relative_time': statistics.median(relative_time_samples(func, repeat, warmup)),
+            'peak_memory': peak_memory(func),
+        }
+    return measurements
+
+
+def compare(baseline, measurements, threshold, memory_threshold):
+    """
+    Print the measurements against the baseline, and return the names of the cases that regressed.
+    """
+    regressions = []
+    print(f'{"case":<36} {"time":>10} {"baseline":>10} {"memory":>10} {"baseline":>10}')
+    for name, current in measurements.items():
+        expected = baseline.get(name)
+        if expected is None:
+            print(f'{name:<36} {current["relative_time"]:>10.2f} {"-":>10} {current["peak_memory"]:>10} {"-":>10}')
+            continue
+        slower = current['relative_time'] > expected['relative_time'] * (1 + threshold)
+        bigger = current['peak_memory'] > expected['peak_memory'] * (1 + memory_threshold)
+        print('{:<36} {:>10.2f} {:>10.2f} {:>10} {:>10}{}'.format(
+            name,
+            current['relative_time'],
+            expected['relative_time'],
+            current['peak_memory'],
+            expected['peak_memory'],
+            '  REGRESSION' if slower or bigger else '',
+        ))
+        if slower or bigger:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative slowdown')
+    parser.add_argument('--memory-threshold', type=float, default=0.1, help='allowed relative memory increase')
+    parser.add_argument('--cases', help='comma separated case names (default: all)')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='save the measurements as the new baseline')
+    args = parser.parse_args()
+
+    configure_django()
+    cases = [case for case in CASES if not args.cases or case.name in args.cases.split(',')]
+    measurements = measure(cases, args.repeat, args.warmup)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump({
+                'python': platform.python_version(),
+                'cases': {
+                    name: {'relative_time': round(current['relative_time'], 4), 'peak_memory': current['peak_memory']}
+                    for name, current in measurements.items()
+                },
+            }, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline['python'].rsplit('.', 1)[0] != platform.python_version().rsplit('.', 1)[0]:
+        print(f'Warning: the baseline was measured on Python {baseline["python"]}')
+    regressions = compare(baseline['cases'], measurements, args.threshold, args.memory_threshold)
+    if regressions:
+        print(f'{len(regressions)} case(s) regressed: {", ".join(regressions)}')
+        return 1
+    print('No regressions.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
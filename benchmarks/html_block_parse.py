@@ -0,0 +1,67 @@
+"""
+Benchmark HtmlBlock.parse_xml on large html blocks.
+
+Compares serializing the parsed nodes again with slicing the OLX source.
+
+Usage: python -m benchmarks.html_block_parse [--paragraphs N] [--repeat N]
+"""
+import argparse
+import timeit
+
+from lxml import etree
+from xblock.field_data import DictFieldData
+from xblock.fields import ScopeIds
+
+from labxchange_xblocks.html_block import HtmlBlock
+
+
+class ParseRuntime:
+    """
+    Just enough of a runtime for `HtmlBlock.parse_xml`.
+    """
+
+    def __init__(self, olx_source=None):
+        self.olx_source = olx_source
+        if olx_source is not None:
+            self.get_olx_source = lambda keys: self.olx_source
+
+    def construct_xblock_from_class(self, cls, keys):
+        return cls(self, scope_ids=keys, field_data=DictFieldData({}))
+
+
+def make_olx(paragraphs, cdata=False):
+    """
+    Return the OLX of an html block with `paragraphs` paragraphs of formatted text.
+    """
+    body = ''.join(
+        '<p>Paragraph {0} with <b>bold</b>, <i>italic</i> and <a href="/static/{0}.png">a link</a>.</p>\n'.format(i)
+        for i in range(paragraphs)
+    )
+    if cdata:
+        body = '<![CDATA[{}]]>'.format(body)
+    return '<html display_name="Benchmark">{}</html>'.format(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--paragraphs', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    keys = ScopeIds('user', 'lx_html', 'def_id', 'usage_id')
+    for cdata in (False, True):
+        olx = make_olx(args.paragraphs, cdata=cdata)
+        node = etree.fromstring(olx)
+        for label, runtime in (('serialize nodes', ParseRuntime()), ('slice source', ParseRuntime(olx))):
+            seconds = min(timeit.repeat(
+                lambda: HtmlBlock.parse_xml(node, runtime, keys),  # pylint: disable=cell-var-from-loop
+                number=1,
+                repeat=args.repeat,
+            ))
+            print('{:<8} {:<16} {:>10.3f} ms  ({} KiB of OLX)'.format(
+                'cdata' if cdata else 'markup', label, seconds * 1000, len(olx) // 1024,
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark the JSON backends of `dump_json` on representative handler payloads.
+
+Usage: python -m benchmarks.json_backends [--repeat N]
+"""
+import argparse
+import json
+import timeit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def case_study_data(sections=50, children=10):
+    """
+    Student view data of a long case study.
+    """
+    return {
+        'display_name': 'Case Study',
+        'sections': [
+            {
+                'title': f'Section {section}',
+                'children': [
+                    {'inlinehtml': f'<p>Paragraph {child} of section {section}, with <b>some</b> text.</p>' * 5}
+                    if child % 2 else
+                    {'usage_id': f'lb:LabXchange:1a2b3c4d:lx_image:{section}-{child}', 'embed': True}
+                    for child in range(children)
+                ],
+            }
+            for section in range(sections)
+        ],
+        'child_blocks': [
+            {
+                'usage_id': f'lb:LabXchange:1a2b3c4d:lx_image:{index}',
+                'block_type': 'lx_image',
+                'display_name': f'Image {index}',
+            }
+            for index in range(sections * children // 2)
+        ],
+        'attachments': [],
+    }
+
+
+def question_user_state():
+    """
+    User state of a multiple choice question.
+    """
+    return {
+        'maxAttempts': 3,
+        'current_score': 0,
+        'total_possible': 1,
+        'questionData': {
+            'type': 'choiceresponse',
+            'question': '<p>Which of these are correct?</p>',
+            'choices': [
+                {'content': f'Choice {index}', 'checked': index % 2 == 0, 'comment': 'Think again.'}
+                for index in range(6)
+            ],
+            'comment': '',
+            'studentAnswer': {'selected': [0, 2, 4]},
+        },
+        'hints': [{'content': 'A hint'}],
+        'studentAttempts': 1,
+        'correct': False,
+    }
+
+
+def audio_data(languages=12):
+    """
+    Student view data of an audio block with many transcripts.
+    """
+    transcripts = {
+        f'l{index}': {'type': 'inlinehtml', 'content': '<p>Welcome to the show, ستارے.</p>' * 200}
+        for index in range(languages)
+    }
+    return {
+        'display_name': 'Audio',
+        'embed_code': '<iframe src="https://example.com/track"></iframe>',
+        'options': [{'lang': lang, 'language': None} for lang in transcripts],
+        'transcripts': transcripts,
+        'user_state': {'current_language': 'l0'},
+    }
+
+
+BACKENDS = {
+    'json': lambda data: json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+}
+if orjson is not None:
+    BACKENDS['orjson'] = lambda data: orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    payloads = {
+        'case study': case_study_data(),
+        'question user state': question_user_state(),
+        'audio with transcripts': audio_data(),
+    }
+    for name, payload in payloads.items():
+        for backend, dump in BACKENDS.items():
+            timings = timeit.repeat(
+                lambda: dump(payload),  # pylint: disable=cell-var-from-loop
+                number=10,
+                repeat=args.repeat,
+            )
+            seconds = min(timings) / 10
+            print('{:<24} {:<8} {:>10.1f} us  ({} KiB)'.format(
+                name, backend, seconds * 1e6, len(dump(payload)) // 1024,
+            ))
+
+
+if __name__ == '__main__':
+    main()
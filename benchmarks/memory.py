@@ -0,0 +1,104 @@
+"""
+Profile the memory of the block handlers, and the memory each learner's block instance keeps.
+
+For each operation of the benchmark fixtures, prints the peak memory allocated during a call, and the
+allocation sites of the memory still allocated after it (see `metrics.start_memory_profiling`).
+Then, for the blocks with large content, loads the same block for many learners, keeping all the
+instances alive as concurrent requests would, and prints the memory held per instance.
+
+Usage: python -m benchmarks.memory [--size N] [--learners N] [--top N] [--block-types lx_question,...]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from webob import Request
+
+from labxchange_xblocks.metrics import start_memory_profiling, stop_memory_profiling
+
+from .fixtures import FIXTURES
+from .runtime import InMemoryRuntime, clear_caches, configure_django
+
+# The handler that each learner calls on the blocks measured per learner.
+LEARNER_HANDLERS = {
+    'lx_question': 'student_view_user_state',
+    'lx_case_study': 'v1_student_view_data',
+    'lx_annotated_video': 'student_view_data_and_user_state',
+}
+
+
+def profile_handlers(fixtures, size, top):
+    """
+    Print the memory profile of the operations of `fixtures`, with content of the given size.
+    """
+    for fixture in fixtures:
+        runtime = InMemoryRuntime()
+        usage_id = fixture.create(runtime, size if size in fixture.sizes else fixture.sizes[0])
+        profile = start_memory_profiling(frames=1)
+        try:
+            for operation in fixture.operations.values():
+                clear_caches()
+                operation(runtime, usage_id)
+        finally:
+            stop_memory_profiling()
+
+        for (block_type, handler), calls in sorted(profile.calls.items()):
+            if block_type != fixture.block_type:
+                # Children rendered by the block are part of its calls
+                continue
+            print(f'{block_type} {handler}: {calls} call(s), peak {profile.peaks[(block_type, handler)]} bytes')
+            for site, retained, count in profile.top(block_type, handler, limit=top):
+                print(f'    {retained:>10} bytes in {count:>5} blocks  {site}')
+
+
+def memory_per_learner(fixture, size, learners):
+    """
+    Return the memory held by each learner's instance of a block, in bytes.
+    """
+    runtime = InMemoryRuntime()
+    usage_id = fixture.create(runtime, size)
+    handler_name = LEARNER_HANDLERS[fixture.block_type]
+    clear_caches()
+    # The first learner fills the shared caches
+    runtime.handle(runtime.get_block(usage_id), handler_name, Request.blank('/'))
+
+    blocks = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for learner in range(learners):
+            runtime.user_id = f'learner-{learner}'
+            block = runtime.get_block(usage_id)
+            runtime.handle(block, handler_name, Request.blank('/'))
+            blocks.append(block)
+        gc.collect()
+        return (tracemalloc.get_traced_memory()[0] - before) // learners
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--learners', type=int, default=100)
+    parser.add_argument('--top', type=int, default=5, help='number of allocation sites to print per handler')
+    parser.add_argument('--block-types', help='comma separated block types (default: all)')
+    args = parser.parse_args()
+
+    configure_django()
+    fixtures = [
+        fixture for fixture in FIXTURES
+        if not args.block_types or fixture.block_type in args.block_types.split(',')
+    ]
+    profile_handlers(fixtures, args.size, args.top)
+
+    print()
+    for fixture in fixtures:
+        if fixture.block_type in LEARNER_HANDLERS:
+            per_learner = memory_per_learner(fixture, args.size, args.learners)
+            print(f'{fixture.block_type}: {per_learner} bytes per learner ({args.learners} learners)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+A lightweight in-memory XBlock runtime for the benchmarks.
+
+Blocks are stored in memory with their children and field data, handler URLs are plain paths,
+and the block classes are the `xblock.v1` entry points of `setup.py` (the package doesn't need to be installed).
+"""
+import os
+import re
+from importlib import import_module
+
+from django.conf import settings
+from xblock.runtime import DictKeyValueStore, KvsFieldData, MemoryIdManager, Runtime
+
+from labxchange_xblocks import content, utils
+
+SETUP_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'setup.py')
+
+
+def block_classes():
+    """
+    Return the block classes of the `xblock.v1` entry points of `setup.py`, by block type.
+    """
+    with open(SETUP_PY) as setup_file:
+        entry_points = re.findall(r"'(\w+) = ([\w.]+):(\w+)'", setup_file.read())
+    return {
+        block_type: getattr(import_module(module_name), class_name)
+        for block_type, module_name, class_name in entry_points
+    }
+
+
+def configure_django():
+    """
+    Configure the Django settings used by the blocks, if they aren't configured yet.
+    """
+    if settings.configured:
+        return
+    settings.configure(
+        TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates'}],
+        YOUTUBE={'IMAGE_API': 'https://img.youtube.com/vi/{youtube_id}/0.jpg'},
+    )
+    import django  # pylint: disable=import-outside-toplevel
+    django.setup()
+
+
+def clear_caches():
+    """
+    Clear the in-process caches of the blocks, so that each measured call does all the work.
+    """
+    for cache in (
+        content.interned_content_cache,
+        utils.child_metadata_cache,
+        utils.offline_bundle_cache,
+        utils.processed_html_cache,
+        utils.student_view_data_cache,
+        utils.student_view_data_history,
+        utils.user_state_content_cache,
+    ):
+        cache.clear()
+
+
+class InMemoryBlockstore:
+    """
+    Blockstore service serving the static files added with `add_file`.
+    """
+
+    def __init__(self):
+        self.files = {}  # (usage_id, filename) => bytes
+
+    def add_file(self, usage_id, filename, content):
+        self.files[(str(usage_id), filename)] = content
+
+    def get_library_block_asset_file_content(self, usage_id, filename):
+        return self.files[(str(usage_id), filename)]
+
+
+class InMemoryRuntime(Runtime):
+    """
+    Runtime keeping all the blocks and their field data in memory, for a single learner.
+
+    Set `user_id` to load the blocks of another learner.
+    """
+    # A plain attribute rather than the deprecated `Runtime.user_id` property
+    user_id = None
+
+    def __init__(self, user_id='learner'):
+        id_manager = MemoryIdManager()
+        self.blockstore = InMemoryBlockstore()
+        self.classes = block_classes()
+        super().__init__(
+            id_reader=id_manager,
+            id_generator=id_manager,
+            field_data=KvsFieldData(DictKeyValueStore()),
+            services={'blockstore': self.blockstore},
+        )
+        self.user_id = user_id
+        self.course_id = None
+
+    def load_block_type(self, block_type):
+        return self.classes[block_type]
+
+    def create_block(self, block_type, fields=None, children=()):
+        """
+        Add a block with the given field values and children (usage ids) and return its usage id.
+        """
+        def_id = self.id_generator.create_definition(block_type)
+        usage_id = self.id_generator.create_usage(def_id)
+        block = self.get_block(usage_id)
+        for name, value in (fields or {}).items():
+            setattr(block, name, value)
+        if children:
+            block.children = list(children)
+        block.save()
+        return usage_id
+
+    def get_block(self, usage_id, for_parent=None, **kwargs):  # pylint: disable=arguments-differ
+        # `block_type_overrides` and `use_original` are only meaningful in the LabXchange runtime
+        return super().get_block(usage_id, for_parent=for_parent)
+
+    def handler_url(self, block, handler_name, suffix='', query='', thirdparty=False):
+        url = f'/handler/{block.scope_ids.usage_id}/{handler_name}/{suffix}'
+        return f'{url}?{query}' if query else url
+
+    def resource_url(self, resource):
+        return f'/resource/{resource}'
+
+    def local_resource_url(self, block, uri):
+        return f'/resource/{block.scope_ids.block_type}/{uri}'
+
+    def publish(self, block, event_type, event_data):
+        pass
@@ -5,3 +5,14 @@ XBlocks developed for the LabXchange project.
 from __future__ import absolute_import, unicode_literals
 
 __version__ = "0.10.2"
+
+# Only needed before Django 3.2, which finds the configuration by itself
+default_app_config = 'labxchange_xblocks.apps.LabXchangeXBlocksConfig'  # pylint: disable=invalid-name
+
+
+def warm_up(*args, **kwargs):
+    """
+    Run `labxchange_xblocks.warmup.warm_up`, imported on first use since it imports all the blocks.
+    """
+    from .warmup import warm_up as _warm_up  # pylint: disable=import-outside-toplevel
+    return _warm_up(*args, **kwargs)
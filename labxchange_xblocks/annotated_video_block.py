@@ -2,15 +2,20 @@
 """
 Annotated Video XBlock.
 """
-import json
-
 from django.conf import settings
-from webob import Response
 from xblock.completable import XBlockCompletionMode
 from xblock.core import XBlock
 from xblock.fields import List, Scope, String
 
-from .utils import StudentViewBlockMixin, _, xblock_specs_from_categories
+from .content import AnnotatedVideoContent
+from .utils import (
+    StudentViewBlockMixin,
+    _,
+    field_requested,
+    json_response,
+    project_fields,
+    xblock_specs_from_categories
+)
 
 try:
     from xblockutils.studio_editable import (
@@ -106,48 +111,70 @@ class AnnotatedVideoBlock(
     )
 
     student_view_template = 'templates/annotated_video_student_view.html'
+    # Keys of the student view data that depend on the children
+    child_dependent_fields = ('child_blocks', 'video_poster', 'video_youtube_id')
+    # The template doesn't render the annotations nor the children, so they aren't loaded for the LMS views
+    lms_view_fields = ('display_name', 'video_id')
 
     @XBlock.handler
     def student_view_data_and_user_state(self, request, suffix=""):  # pylint: disable=unused-argument
         """
         Return content and settings for student view.
         """
+        fields = self._requested_fields(request)
+        context = {
+            'block_type_overrides': self._block_type_overrides(request),
+            'fields': fields,
+        }
+        return json_response(project_fields(self.student_view_data(context), fields))
+
+    def student_view_data(self, context=None):
+        """
+        Return content and settings for student view.
+
+        The children and the annotations are skipped if they aren't part of the requested fields.
+        """
+        context = context or {}
+        fields = context.get('fields')
+        block_type_overrides = context.get('block_type_overrides')
+        state = {
+            "display_name": self.display_name,
+            "video_id": self.video_id,
+        }
+
+        if field_requested(fields, "annotations"):
+            annotations = []
+            for embedded_annotation in AnnotatedVideoContent.for_block(self).annotations:
+                annotation = embedded_annotation.copy()
+                if embedded_annotation.get("image_url"):
+                    annotation["image_url"] = self.expand_static_url(
+                        embedded_annotation.get("image_url"),
+                    )
+                annotations.append(annotation)
+            state["annotations"] = annotations
+
+        if not any(field_requested(fields, name) for name in self.child_dependent_fields):
+            return state
+
         child_blocks = []
-        annotations = []
         video_block = None
-        block_type_overrides = self._block_type_overrides(request)
-
         for child_usage_id in self.children:  # pylint: disable=no-member
-            child_block = self.runtime.get_block(child_usage_id, block_type_overrides=block_type_overrides)
+            metadata = self.get_child_metadata(child_usage_id, block_type_overrides=block_type_overrides)
 
-            if child_block:
-                block_type = child_block.scope_ids.block_type
+            if metadata:
                 # We can assume there's going to be only one video
                 # associated with the annotated video block to avoid calculating
                 # the replica id when using this in pathways.
-                if block_type in ["video", "lx_video"]:
-                    video_block = child_block
+                # Only the video is instantiated, as its YouTube ID is needed below.
+                if metadata.block_type in ["video", "lx_video"]:
+                    video_block = self._video_block(child_usage_id, block_type_overrides)
                 child_block_data = {
                     "usage_id": str(child_usage_id),
-                    "block_type": block_type,
-                    "display_name": child_block.display_name,
+                    "block_type": metadata.block_type,
+                    "display_name": metadata.display_name,
                 }
                 child_blocks.append(child_block_data)
-
-        for embedded_annotation in self.annotations:
-            annotation = embedded_annotation.copy()
-            if embedded_annotation.get("image_url"):
-                annotation["image_url"] = self.expand_static_url(
-                    embedded_annotation.get("image_url"),
-                )
-            annotations.append(annotation)
-
-        state = {
-            "display_name": self.display_name,
-            "annotations": annotations,
-            "child_blocks": child_blocks,
-            "video_id": self.video_id,
-        }
+        state["child_blocks"] = child_blocks
 
         if video_block:
             state.update({
@@ -157,8 +184,32 @@ class AnnotatedVideoBlock(
                 "video_youtube_id": video_block.youtube_id_1_0,
             })
 
-        return Response(
-            json.dumps(state),
-            content_type='application/json',
-            charset='UTF-8'
-        )
+        return state
+
+    def _children_content(self, block_type_overrides, fields=None):
+        """
+        The student view data includes the metadata of the children, and the YouTube ID of the video.
+        """
+        if not any(field_requested(fields, name) for name in self.child_dependent_fields):
+            return super()._children_content(block_type_overrides, fields)
+        children_content = []
+        for child_usage_id in self.children:  # pylint: disable=no-member
+            metadata = self.get_child_metadata(child_usage_id, block_type_overrides=block_type_overrides)
+            youtube_id = None
+            if metadata and metadata.block_type in ["video", "lx_video"]:
+                video_block = self._video_block(child_usage_id, block_type_overrides)
+                youtube_id = video_block.youtube_id_1_0 if video_block else None
+            children_content.append([str(child_usage_id), metadata, youtube_id])
+        return children_content
+
+    def _video_block(self, child_usage_id, block_type_overrides):
+        """
+        Return the video child block, or None if it can't be loaded.
+
+        It is loaded once per instance of this block, as both the student view data and its version need it.
+        """
+        cache_key = (str(child_usage_id), bool(block_type_overrides))
+        video_blocks = self.__dict__.setdefault('_lx_video_blocks', {})
+        if cache_key not in video_blocks:
+            video_blocks[cache_key] = self.load_block(child_usage_id, block_type_overrides=block_type_overrides)
+        return video_blocks[cache_key]
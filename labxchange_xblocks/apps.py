@@ -0,0 +1,21 @@
+"""
+Django application configuration.
+"""
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class LabXchangeXBlocksConfig(AppConfig):
+    """
+    Configuration of the labxchange_xblocks application.
+
+    Add `labxchange_xblocks` to `INSTALLED_APPS` and set `LABXCHANGE_XBLOCKS_WARM_UP = True`
+    to warm up the blocks when each worker process starts, see `warmup.warm_up`.
+    """
+    name = 'labxchange_xblocks'
+    verbose_name = 'LabXchange XBlocks'
+
+    def ready(self):
+        if getattr(settings, 'LABXCHANGE_XBLOCKS_WARM_UP', False):
+            from .warmup import warm_up  # pylint: disable=import-outside-toplevel
+            warm_up()
@@ -2,14 +2,19 @@
 """
 Assignment XBlock.
 """
-import json
-
-from webob import Response
 from xblock.completable import XBlockCompletionMode
 from xblock.core import XBlock
 from xblock.fields import Scope, String
 
-from .utils import StudentViewBlockMixin, _, xblock_specs_from_categories
+from .metrics import timed_phase
+from .utils import (
+    StudentViewBlockMixin,
+    _,
+    field_requested,
+    json_response,
+    project_fields,
+    xblock_specs_from_categories
+)
 
 try:
     from xblockutils.studio_editable import (
@@ -62,6 +67,8 @@ class AssignmentBlock(
     allowed_nested_blocks = xblock_specs_from_categories(('problem', 'drag-and-drop-v2'))
 
     student_view_template = 'templates/assignment_student_view.html'
+    # The student view data depends on the weights and attempts of the children, and may depend on the user
+    student_view_data_cacheable = False
 
     def student_view_data(self, context=None):
         """
@@ -72,7 +79,7 @@ class AssignmentBlock(
 
         block_type_overrides = context.get('block_type_overrides')
         for child_usage_id in self.children:  # pylint: disable=no-member
-            child_block = self.runtime.get_block(child_usage_id, block_type_overrides=block_type_overrides)
+            child_block = self.load_block(child_usage_id, block_type_overrides=block_type_overrides)
             if child_block:
                 weight = self._get_weighted_score_possible_for_child(child_block)
                 child_block_data = {
@@ -96,20 +103,25 @@ class AssignmentBlock(
     def student_view_user_state(self, request, suffix=''):  # pylint: disable=unused-argument
         """
         Return JSON representation of student state.
+
+        The `fields` query parameter limits the response to these keys, and the children aren't scored if
+        neither `score` nor `child_blocks` is requested.
         """
         child_blocks_state = {}
         total_earned = 0
         total_possible = 0
 
+        fields = self._requested_fields(request)
         block_type_overrides = self._block_type_overrides(request)
-        for child_usage_id in self.children:  # pylint: disable=no-member
-            child_block = self.runtime.get_block(child_usage_id, block_type_overrides=block_type_overrides)
-            if child_block:
-                score = self.get_weighted_score_for_block(child_block)
-                child_blocks_state[str(child_usage_id)] = {'score': score}
-                if score:
-                    total_earned += score['earned']
-                    total_possible += score['possible']
+        if field_requested(fields, 'score') or field_requested(fields, 'child_blocks'):
+            for child_usage_id in self.children:  # pylint: disable=no-member
+                child_block = self.load_block(child_usage_id, block_type_overrides=block_type_overrides)
+                if child_block:
+                    score = self.get_weighted_score_for_block(child_block)
+                    child_blocks_state[str(child_usage_id)] = {'score': score}
+                    if score:
+                        total_earned += score['earned']
+                        total_possible += score['possible']
 
         state = {
             'score': {
@@ -119,12 +131,9 @@ class AssignmentBlock(
             'child_blocks': child_blocks_state,
         }
 
-        return Response(
-            json.dumps(state),
-            content_type='application/json',
-            charset='UTF-8'
-        )
+        return json_response(project_fields(state, fields))
 
+    @timed_phase('score')
     def get_weighted_score_for_block(self, block):
         """
         Return the weighted (earned, possible) score for the block.
@@ -162,6 +171,7 @@ class AssignmentBlock(
                     }
         return None
 
+    @timed_phase('score')
     def _get_weighted_score_possible_for_child(self, block):
         """
         Get the [weighted] maximum possible score for an XBlock.
@@ -2,20 +2,13 @@
 """
 Audio XBlock.
 """
-import json
-
 from webob import Response
 from xblock.core import XBlock
 from xblock.fields import Dict, Scope, String
 
-from .i18n import iso_languages
-from .utils import StudentViewBlockMixin, _
-
-try:
-    from openedx.core.djangoapps.content_libraries import api as library_api  # pylint: disable=unused-import
-    USE_LIBRARY_API = True
-except ModuleNotFoundError:
-    USE_LIBRARY_API = False
+from .content import read_field
+from .i18n import match_language, negotiate_language, transcript_language_options
+from .utils import StudentViewBlockMixin, _, field_requested
 
 try:
     from xblockutils.studio_editable import StudioEditableXBlockMixin
@@ -26,6 +19,10 @@ except ImportError:
         """
 
 
+# How long browsers can use a transcript before revalidating it with its ETag, in seconds
+TRANSCRIPT_MAX_AGE = 300
+
+
 @XBlock.wants('blockstore')
 class AudioBlock(XBlock, StudioEditableXBlockMixin, StudentViewBlockMixin):
     """
@@ -68,32 +65,69 @@ class AudioBlock(XBlock, StudioEditableXBlockMixin, StudentViewBlockMixin):
     )
 
     student_view_template = 'templates/audio_student_view.html'
+    # The student view data includes the transcript URLs, and handler URLs can be specific to the learner
+    student_view_data_cacheable = False
 
     def student_view_data(self, context=None):
         """
         Return content and settings for student view.
         """
-        options = []
-        for lang in self.transcripts.keys():
-            options.append({
-                'lang': lang,
-                'language': iso_languages.get(lang),
-            })
+        fields = (context or {}).get('fields')
+        data = self._student_view_content_data(fields)
+        if field_requested(fields, 'transcripts'):
+            data['transcripts'] = self._transcript_urls()
+        if field_requested(fields, 'user_state'):
+            data['user_state'] = self.user_state
+        return data
 
-        return {
+    def _student_view_content_data(self, fields=None):
+        """
+        Return the part of the student view data that is the same for all learners.
+
+        The language options are skipped if they aren't part of the requested `fields`.
+        """
+        data = {
             'display_name': self.display_name,
             'embed_code': self.embed_code,
-            'options': options,
-            'transcripts': self.transcripts,
-            'user_state': self.user_state,
         }
+        if field_requested(fields, 'options'):
+            data['options'] = transcript_language_options(tuple(read_field(self, 'transcripts')))
+        return data
+
+    def _transcript_urls(self):
+        """
+        Return the URL of the `transcript` handler for each transcript language.
+
+        Transcripts are loaded one language at a time, from these URLs.
+        """
+        return {
+            lang: self.runtime.handler_url(self, 'transcript', query=f'lang={lang}')
+            for lang in read_field(self, 'transcripts')
+        }
+
+    def offline_bundle_files(self):
+        """
+        Add the inline transcripts to offline bundles, as html files.
+        """
+        files = []
+        for lang, transcript in self.transcripts.items():
+            if isinstance(transcript, dict) and transcript.get('type') == 'inlinehtml':
+                files.append((f'transcripts/{lang}.html', transcript.get('content', '').encode('utf-8')))
+        return files
 
     @property
     def user_state(self):
-        languages = self.transcripts.keys()
-        current_language = None
-        if languages:
-            current_language = list(languages)[0]
+        return self._user_state()
+
+    def _user_state(self, accept_language=None):
+        """
+        Return the user state, with the transcript language best matching the `accept_language` header value,
+        or the first one.
+        """
+        languages = tuple(read_field(self, 'transcripts'))
+        current_language = negotiate_language(accept_language, languages)
+        if current_language is None and languages:
+            current_language = languages[0]
         return {
             'current_language': current_language,
         }
@@ -106,7 +140,50 @@ class AudioBlock(XBlock, StudioEditableXBlockMixin, StudentViewBlockMixin):
         Return JSON representation of the block with enough data to render the student view.
         Also, we can use this endpoint to render the view somewhere else
         """
-        state = self.student_view_data()
-        return Response(
-            json.dumps(state), content_type="application/json", charset="UTF-8"
+        fields = self._requested_fields(request)
+        user_data = {}
+        if field_requested(fields, 'transcripts'):
+            user_data['transcripts'] = self._transcript_urls()
+        if field_requested(fields, 'user_state'):
+            user_data['user_state'] = self._user_state(self._request_header(request, 'Accept-Language'))
+        response = self.user_state_response(
+            self._student_view_content_data,
+            user_data,
+            fields,
         )
+        if 'user_state' in user_data:
+            # The current language of the user state is negotiated from the header
+            response.vary = ('Accept-Language',)
+        return response
+
+    @XBlock.handler
+    def transcript(self, request, suffix=''):  # pylint: disable=unused-argument
+        """
+        Return the HTML of the inline transcript in the language of the `lang` query parameter or,
+        without it, in the language of the user state.
+
+        The response has the content version as ETag, and an empty 304 response is returned
+        if the client already has it.
+        """
+        transcripts = read_field(self, 'transcripts')
+        lang = self._request_param(request, 'lang')
+        if lang:
+            language = match_language(lang, tuple(transcripts))
+        else:
+            language = self._user_state(self._request_header(request, 'Accept-Language'))['current_language']
+        transcript = transcripts.get(language) if language else None
+        if not isinstance(transcript, dict) or transcript.get('type') != 'inlinehtml':
+            return Response(status=404)
+
+        etag = f'{self.content_version()}-{language}'
+        if self._etag_matches(request, etag):
+            response = Response(status=304)
+        else:
+            response = Response(transcript.get('content', ''), content_type='text/html', charset='utf8')
+            response.headers['Content-Language'] = language
+        response.etag = etag
+        response.cache_control.private = True
+        response.cache_control.max_age = TRANSCRIPT_MAX_AGE
+        if not lang:
+            response.vary = ('Accept-Language',)
+        return response
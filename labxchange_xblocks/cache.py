@@ -0,0 +1,93 @@
+"""
+In-process caches.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe cache holding at most `max_size` entries, evicting the least recently used ones first.
+
+    If `ttl` (in seconds) is given, entries older than that are treated as missing.
+    If `max_bytes` is given, the least recently used entries are also evicted to keep the total size
+    of the values under `max_bytes`. Larger values aren't cached. The size of a value is `sizeof(value)`,
+    its length by default (eg. for bytes).
+    """
+
+    def __init__(self, max_size=1024, ttl=None, max_bytes=None, sizeof=len):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()  # key => (expiry time or None, value, size)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the value cached for `key`, or `default`.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """
+        Cache `value` for `key`.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._remove(key)
+            size = 0
+            if self.max_bytes is not None:
+                size = self.sizeof(value)
+                if size > self.max_bytes:
+                    return
+                self._total_bytes += size
+            self._entries[key] = (expires_at, value, size)
+            while len(self._entries) > self.max_size or (
+                self.max_bytes is not None and self._total_bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key):
+        """
+        Remove `key` from the cache, if present.
+        """
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self):
+        """
+        Total size of the cached values, if `max_bytes` is given.
+        """
+        return self._total_bytes
+
+    def _remove(self, key):
+        """
+        Remove `key` from the cache, if present. The lock must be held.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[2]
+
+    def __len__(self):
+        return len(self._entries)
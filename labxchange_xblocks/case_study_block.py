@@ -2,11 +2,13 @@
 """
 Case Study XBlock.
 """
+from webob import Response
 from xblock.completable import XBlockCompletionMode
 from xblock.core import XBlock
-from xblock.fields import List, Scope, String
+from xblock.fields import Integer, List, Scope, String
 
-from .utils import StudentViewBlockMixin, _
+from .content import CaseStudyContent
+from .utils import StudentViewBlockMixin, _, field_requested, json_response
 
 try:
     from xblockutils.studio_editable import (
@@ -31,6 +33,48 @@ except ImportError:
         """
 
 
+# Version of the compact layout produced by `normalize_sections`.
+# Bump it whenever that layout changes, so stale stored sections get re-validated on read.
+SECTIONS_FORMAT_VERSION = 1
+
+
+def normalize_sections(sections):
+    """
+    Return a compact, validated copy of case study `sections`.
+
+    Only children that are safe to send to clients are kept, and their defaults are filled in,
+    so that reading the normalized form never needs to check types again:
+
+        {"inlinehtml": "<span>hello</span>"}
+        {"usage_id": "lb:LabXchange:770d8e06:video:1-1", "embed": True}
+
+    Whether an embedded child is a valid xblock is only known at read time,
+    so those children are kept here and filtered by `CaseStudyBlock.student_view_data`.
+    """
+    normalized = []
+    for section in sections:
+        if not isinstance(section, dict):
+            continue
+        children = []
+        for child in section.get("children") or []:
+            if not isinstance(child, dict):
+                continue
+            if "inlinehtml" in child and isinstance(child["inlinehtml"], str):
+                children.append({
+                    "inlinehtml": child["inlinehtml"],
+                })
+            elif child.get("usage_id") and isinstance(child["usage_id"], str):
+                children.append({
+                    "usage_id": child["usage_id"],
+                    "embed": bool(child.get("embed", True)),
+                })
+        normalized.append({
+            "title": section.get("title", ""),
+            "children": children,
+        })
+    return normalized
+
+
 class CaseStudyBlock(
     XBlock,
     StudentViewBlockMixin,
@@ -74,12 +118,22 @@ For example: [
         enforce_type=True,
     )
 
+    # Not editable: set whenever `sections` is normalized on save or import.
+    sections_format = Integer(
+        help=_("Version of the normalized layout stored in sections (0 means not normalized)."),
+        scope=Scope.content,
+        default=0,
+    )
+
     editable_fields = (
         "display_name",
         "sections",
         "attachments",
     )
 
+    # Keys of the student view data that depend on the children
+    child_dependent_fields = ("sections", "child_blocks", "attachments")
+
     completion_mode = XBlockCompletionMode.AGGREGATOR
     has_children = True
     student_view_template = "templates/case_study_student_view.html"
@@ -88,61 +142,187 @@ For example: [
         """
         Return content and settings for student view.
         """
-        valid_child_block_ids = {}  # child_usage_id => original usage_id
-        child_blocks = []
         context = context or {}
+        fields = context.get('fields')
+        data = {"display_name": self.display_name}
 
-        block_type_overrides = context.get('block_type_overrides')
-        for child_usage_id in self.children:  # pylint: disable=no-member
-            child_block = self.runtime.get_block(
+        # The children are only loaded if a key that depends on them is requested
+        if not any(field_requested(fields, name) for name in self.child_dependent_fields):
+            return data
+        valid_child_block_ids, child_blocks = self._load_child_blocks(
+            self.children,  # pylint: disable=no-member
+            context.get('block_type_overrides'),
+        )
+
+        if field_requested(fields, "sections"):
+            data["sections"] = [
+                self._section_data(section, valid_child_block_ids)
+                for section in self._get_normalized_sections()
+            ]
+
+        data["child_blocks"] = child_blocks
+
+        attachments = []
+        for xblock_id in CaseStudyContent.for_block(self).attachments:
+            if isinstance(xblock_id, str):
+                attachments.append(str(valid_child_block_ids.get(xblock_id, xblock_id)))
+        data["attachments"] = attachments
+
+        return data
+
+    @XBlock.handler
+    def v1_section_outline(self, request, suffix=''):  # pylint: disable=unused-argument
+        """
+        Return JSON representation of the section titles and the ids of their children.
+
+        No child block is loaded, so `child_ids` are the usage ids as stored in the sections.
+        Use `v1_section_data` to get the full content of a section.
+        """
+        sections = []
+        for section in self._get_normalized_sections():
+            sections.append({
+                "title": section["title"],
+                "child_ids": [child["usage_id"] for child in section["children"] if "usage_id" in child],
+            })
+
+        outline = {
+            "display_name": self.display_name,
+            "sections": sections,
+        }
+        return json_response(outline)
+
+    @XBlock.handler
+    def v1_section_data(self, request, suffix=''):
+        """
+        Return JSON representation of the content of the section at index `suffix`.
+
+        Only the children referenced by that section are loaded.
+        """
+        sections = self._get_normalized_sections()
+        try:
+            index = int(suffix)
+        except (TypeError, ValueError):
+            return Response(status=404)
+        if not 0 <= index < len(sections):
+            return Response(status=404)
+        section = sections[index]
+
+        section_child_ids = {child["usage_id"] for child in section["children"] if "usage_id" in child}
+        valid_child_block_ids, child_blocks = self._load_child_blocks(
+            [
+                child_usage_id for child_usage_id in self.children  # pylint: disable=no-member
+                if str(child_usage_id) in section_child_ids
+            ],
+            self._block_type_overrides(request),
+        )
+
+        section_data = self._section_data(section, valid_child_block_ids)
+        section_data["child_blocks"] = child_blocks
+        return json_response(section_data)
+
+    def _load_child_blocks(self, child_usage_ids, block_type_overrides):
+        """
+        Load the given children.
+
+        Returns a dict mapping the valid child usage ids to their original usage ids,
+        and the list of data for the loaded child blocks.
+        """
+        valid_child_block_ids = {}  # child_usage_id => original usage_id
+        child_blocks = []
+        for child_usage_id in child_usage_ids:
+            metadata = self.get_child_metadata(
                 child_usage_id,
                 block_type_overrides=block_type_overrides,
                 use_original=True,
             )
-            if child_block:
+            if metadata:
                 # Store the original usage_id against the valid child usage_id
-                valid_child_block_ids[str(child_usage_id)] = child_block.scope_ids.usage_id
+                valid_child_block_ids[str(child_usage_id)] = metadata.usage_id
                 child_block_data = {
-                    "usage_id": str(child_block.scope_ids.usage_id),
-                    "block_type": child_block.scope_ids.block_type,
-                    "display_name": child_block.display_name,
+                    "usage_id": metadata.usage_id,
+                    "block_type": metadata.block_type,
+                    "display_name": metadata.display_name,
                 }
                 child_blocks.append(child_block_data)
+        return valid_child_block_ids, child_blocks
 
-        sections = []
-        for section in self.sections:
-            children = []
-            for child in section.get("children"):
-                # Here we only add valid entries to the sections returned.
-                # This ensures that clients always get type-safe response.
-                if "inlinehtml" in child and isinstance(child["inlinehtml"], str):
-                    children.append({
-                        "inlinehtml": child["inlinehtml"]
-                    })
-                elif child.get("usage_id"):
-                    # If we're embedding, it needs to be a valid xblock
-                    # If we're not embedding, still include it: it might be a pathway or some other non-xblock asset.
-                    if child.get("embed", True) and not child["usage_id"] in valid_child_block_ids:
-                        continue
-
-                    children.append({
-                        "usage_id": str(valid_child_block_ids.get(child["usage_id"], child["usage_id"])),
-                        "embed": child.get("embed", True),
-                    })
-
-            sections.append({
-                "title": section.get("title", ""),
-                "children": children,
-            })
+    def _children_content(self, block_type_overrides, fields=None):
+        """
+        The student view data includes the metadata of the children.
+        """
+        if not any(field_requested(fields, name) for name in self.child_dependent_fields):
+            return super()._children_content(block_type_overrides, fields)
+        children_content = []
+        for child_usage_id in self.children:  # pylint: disable=no-member
+            metadata = self.get_child_metadata(
+                child_usage_id,
+                block_type_overrides=block_type_overrides,
+                use_original=True,
+            )
+            children_content.append([str(child_usage_id), metadata])
+        return children_content
 
-        attachments = []
-        for xblock_id in self.attachments:
-            if isinstance(xblock_id, str):
-                attachments.append(str(valid_child_block_ids.get(xblock_id, xblock_id)))
+    def _section_data(self, section, valid_child_block_ids):
+        """
+        Return the student view data of a normalized section.
+        """
+        children = []
+        for child in section["children"]:
+            usage_id = child.get("usage_id")
+            if usage_id is None:
+                children.append({
+                    "inlinehtml": self.process_html(child["inlinehtml"])
+                })
+            # If we're embedding, it needs to be a valid xblock
+            # If we're not embedding, still include it: it might be a pathway or some other non-xblock asset.
+            elif usage_id in valid_child_block_ids or not child["embed"]:
+                children.append({
+                    "usage_id": str(valid_child_block_ids.get(usage_id, usage_id)),
+                    "embed": child["embed"],
+                })
 
         return {
-            "display_name": self.display_name,
-            "sections": sections,
-            "child_blocks": child_blocks,
-            "attachments": attachments,
+            "title": section["title"],
+            "children": children,
         }
+
+    def _get_normalized_sections(self):
+        """
+        Return `sections` in the layout produced by `normalize_sections`.
+
+        Sections stored by `save` or `parse_xml` are already normalized, so the read-only sections
+        of `CaseStudyContent` are returned; anything else (content saved before normalization existed,
+        or sections changed since the last save) is normalized on the fly.
+        """
+        sections_field = self.fields["sections"]  # pylint: disable=unsubscriptable-object
+        if (
+            self.sections_format == SECTIONS_FORMAT_VERSION
+            and not sections_field._is_dirty(self)  # pylint: disable=protected-access
+        ):
+            return CaseStudyContent.for_block(self).sections
+        return normalize_sections(self.sections)
+
+    def _normalize_sections(self):
+        """
+        Store `sections` in the compact, pre-validated layout.
+        """
+        self.sections = normalize_sections(self.sections)
+        self.sections_format = SECTIONS_FORMAT_VERSION
+
+    def save(self):
+        """
+        Normalize sections that were edited before saving them.
+        """
+        sections_field = self.fields["sections"]  # pylint: disable=unsubscriptable-object
+        if sections_field._is_dirty(self):  # pylint: disable=protected-access
+            self._normalize_sections()
+        super().save()
+
+    @classmethod
+    def parse_xml(cls, node, runtime, keys, *args, **kwargs):  # pylint: disable=arguments-differ
+        """
+        Parse the OLX and normalize the imported sections.
+        """
+        block = super().parse_xml(node, runtime, keys, *args, **kwargs)
+        block._normalize_sections()  # pylint: disable=protected-access
+        return block
@@ -0,0 +1,189 @@
+"""
+Immutable content shared by the block instances of the same content version.
+
+XBlock copies the value of a mutable field (dict, list) the first time a block instance reads it,
+to detect changes when saving. For content fields, which learners can't change, that's one copy
+of the question data, annotations or sections per learner's block instance.
+
+The `InternedContent` subclasses read these fields without going through the field descriptors,
+and keep a single frozen copy of their values per content version, which all the instances reference.
+"""
+import hashlib
+
+from .cache import LRUCache
+from .metrics import count_field_read
+
+interned_content_cache = LRUCache(max_size=2000)
+
+
+def _read_only(self, *args, **kwargs):  # pylint: disable=unused-argument
+    raise TypeError(f"'{type(self).__name__}' object is read-only")
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict.
+
+    It is still a dict, so it can be serialized to JSON, and `copy()` returns a mutable dict.
+    """
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """
+    Read-only list.
+
+    It is still a list, so it can be serialized to JSON and compares equal to lists,
+    and `copy()` returns a mutable list.
+    """
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+# Types of the JSON-like values that are returned as is by `freeze`
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
+def freeze(value):
+    """
+    Return a read-only deep copy of a JSON-like value.
+    """
+    # Exact type checks first: this runs for every item of large question data, cold caches included
+    value_type = type(value)
+    if value_type in _SCALAR_TYPES:
+        return value
+    if value_type is dict:
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if value_type is list:
+        return FrozenList([freeze(item) for item in value])
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return FrozenList([freeze(item) for item in value])
+    return value
+
+
+class InternedContent:
+    """
+    Frozen values of content fields, shared by all the blocks of the same content version.
+
+    Subclasses list the names of the fields in `__slots__`. See `for_block`.
+    """
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, freeze(values[name]))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{type(self).__name__}' object is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"'{type(self).__name__}' object is read-only")
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({values})'
+
+    @classmethod
+    def for_block(cls, block):
+        """
+        Return the content of `block`.
+
+        The result is memoized on the block until one of the fields is assigned;
+        changes made in place to a field value aren't picked up.
+        """
+        # pylint: disable=protected-access
+        sources = tuple(block._field_data_cache.get(name) for name in cls.__slots__)
+        memo = block.__dict__.setdefault('_lx_interned_content', {})
+        memoized = memo.get(cls)
+        if memoized is not None and all(a is b for a, b in zip(memoized[0], sources)):
+            return memoized[1]
+
+        values = {name: read_field(block, name) for name in cls.__slots__}
+        key = (cls.__name__, _content_key(block, cls.__slots__, values))
+        content = interned_content_cache.get(key)
+        if content is None:
+            content = cls(**values)
+            interned_content_cache.set(key, content)
+        memo[cls] = (sources, content)
+        return content
+
+
+def read_field(block, name):
+    """
+    Return the value of the field `name` of `block`, without caching a copy of it in the block.
+
+    The value must not be changed.
+    """
+    # pylint: disable=protected-access
+    if name in block._field_data_cache:
+        return block._field_data_cache[name]
+    count_field_read(block, name)
+    field = block.fields[name]
+    if block._field_data.has(block, name):
+        return field.from_json(block._field_data.get(block, name))
+    return field.default
+
+
+def _content_key(block, names, values):
+    """
+    Return a key identifying the content version of the field `values` of `block`.
+    """
+    def_id = block.scope_ids.def_id
+    if (
+        getattr(def_id, 'bundle_version', None) and not getattr(def_id, 'draft_name', None)
+        # pylint: disable=protected-access
+        and not any(name in block._field_data_cache for name in names)
+    ):
+        # Published blockstore content, see `StudentViewBlockMixin.content_version`
+        return str(def_id)
+    # `repr` is much lighter than `json.dumps` for large values, and as exact for JSON-like values.
+    # Equal values with keys in a different order get different keys, and are interned separately.
+    return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()
+
+
+class QuestionContent(InternedContent):
+    """
+    Content of a `QuestionBlock`.
+    """
+    __slots__ = ('question_data', 'hints')
+
+
+class AnnotatedVideoContent(InternedContent):
+    """
+    Content of an `AnnotatedVideoBlock`.
+    """
+    __slots__ = ('annotations',)
+
+
+class CaseStudyContent(InternedContent):
+    """
+    Content of a `CaseStudyBlock`.
+    """
+    __slots__ = ('sections', 'attachments')
@@ -0,0 +1,124 @@
+"""
+Structural diffs of student view data, see `StudentViewBlockMixin.v1_student_view_data`.
+
+A delta between two student view data dicts looks like:
+
+    {
+        "set": {"display_name": "New name"},
+        "unset": ["video_poster"],
+        "lists": {
+            "child_blocks": {
+                "id_key": "usage_id",
+                "added": [{"usage_id": "c", ...}],
+                "removed": ["a"],
+                "changed": [{"usage_id": "b", ...}],
+                "order": ["b", "c"],
+            },
+            "sections": {
+                "added": [{"title": "Section 3", ...}],
+                "removed": [3, 4],
+                "changed": {"0": {"title": "Section 1", ...}},
+            },
+        },
+    }
+
+Items of lists of dicts with an `id` (eg. annotations) or a `usage_id` (eg. child blocks) are matched
+by that key; items of other lists (eg. sections) are matched by index.
+"""
+
+# Keys identifying the items of a list, in order of preference.
+ID_KEYS = ('id', 'usage_id')
+
+
+def _list_id_key(*lists):
+    """
+    Return the key identifying the items of all `lists`, or None if they must be matched by index.
+    """
+    for id_key in ID_KEYS:
+        if all(
+            all(isinstance(item, dict) and isinstance(item.get(id_key), str) for item in items)
+            and len({item[id_key] for item in items}) == len(items)
+            for items in lists
+        ):
+            return id_key
+    return None
+
+
+def diff_lists(old, new):
+    """
+    Return the delta between the `old` and `new` lists, or None if they are equal.
+    """
+    if old == new:
+        return None
+    id_key = _list_id_key(old, new)
+    if id_key is None:
+        return {
+            'added': new[len(old):],
+            'removed': list(range(len(new), len(old))),
+            'changed': {
+                str(index): new_item
+                for index, (old_item, new_item) in enumerate(zip(old, new))
+                if old_item != new_item
+            },
+        }
+
+    old_items = {item[id_key]: item for item in old}
+    new_ids = {item[id_key] for item in new}
+    return {
+        'id_key': id_key,
+        'added': [item for item in new if item[id_key] not in old_items],
+        'removed': [item[id_key] for item in old if item[id_key] not in new_ids],
+        'changed': [
+            item for item in new
+            if item[id_key] in old_items and old_items[item[id_key]] != item
+        ],
+        'order': [item[id_key] for item in new],
+    }
+
+
+def diff_student_view_data(old, new):
+    """
+    Return the delta between the `old` and `new` student view data dicts.
+    """
+    delta = {'set': {}, 'unset': [], 'lists': {}}
+    for key, new_value in new.items():
+        old_value = old.get(key)
+        if key in old and isinstance(old_value, list) and isinstance(new_value, list):
+            list_delta = diff_lists(old_value, new_value)
+            if list_delta is not None:
+                delta['lists'][key] = list_delta
+        elif key not in old or old_value != new_value:
+            delta['set'][key] = new_value
+    delta['unset'] = [key for key in old if key not in new]
+    return delta
+
+
+def apply_list_delta(old, list_delta):
+    """
+    Return the list resulting from applying `list_delta` to the `old` list.
+    """
+    id_key = list_delta.get('id_key')
+    if id_key is None:
+        removed = set(list_delta['removed'])
+        items = [
+            list_delta['changed'].get(str(index), item)
+            for index, item in enumerate(old)
+            if index not in removed
+        ]
+        return items + list_delta['added']
+
+    items = {item[id_key]: item for item in old}
+    for item in list_delta['added'] + list_delta['changed']:
+        items[item[id_key]] = item
+    return [items[item_id] for item_id in list_delta['order']]
+
+
+def apply_delta(old, delta):
+    """
+    Return the student view data resulting from applying `delta` to the `old` data.
+    """
+    new = {key: value for key, value in old.items() if key not in delta['unset']}
+    new.update(delta['set'])
+    for key, list_delta in delta['lists'].items():
+        new[key] = apply_list_delta(old[key], list_delta)
+    return new
@@ -0,0 +1,23 @@
+"""
+Optional dependencies.
+
+Some optional dependencies (eg. the edx-platform modules) are slow to import, and only needed by some
+requests. Modules check whether they are installed with `module_available`, which doesn't import them,
+and import them where they're used.
+"""
+import functools
+from importlib.util import find_spec
+
+
+@functools.lru_cache(maxsize=None)
+def module_available(module_name):
+    """
+    Return True if the module `module_name` (eg. `openedx.core.lib.blockstore_api`) can be imported.
+
+    Only the parent packages of the module are imported.
+    """
+    try:
+        return find_spec(module_name) is not None
+    except ImportError:
+        # A parent package is missing
+        return False
@@ -60,6 +60,7 @@ class DocumentBlock(XBlock, StudioEditableXBlockMixin, StudentViewBlockMixin):
     )
 
     student_view_template = 'templates/document_student_view.html'
+    student_view_template_backend = 'python'
     css_resource_url = 'public/css/document-xblock.css'
 
     def student_view_data(self, context=None):
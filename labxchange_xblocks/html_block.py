@@ -1,16 +1,69 @@
 """
 HTML XBlock.
 """
+import html
+import re
+
 from lxml import etree
 from xblock.core import XBlock
 from xblock.fields import Scope, String
 
 from .utils import StudentViewBlockMixin, _
 
+# XML declaration, comments and doctype before the root element of an OLX document
+_OLX_PROLOG_RE = re.compile(r'\s*(?:<\?.*?\?>\s*|<!--.*?-->\s*|<!DOCTYPE[^>]*>\s*)*', re.DOTALL)
+# Start tag of the root element; group 1 is the tag name, group 2 is "/" if the element is empty
+_START_TAG_RE = re.compile(r'<([^\s/>]+)(?:[^>"\']|"[^"]*"|\'[^\']*\')*?(/?)>')
+# Namespace declaration in a start tag
+_XMLNS_RE = re.compile(r'\sxmlns[:=]')
+
+
+def inner_html_from_olx(olx, tag):
+    """
+    Return the inner html of the root element of the `olx` source, sliced out of the source.
+
+    The result is the same html as serializing the parsed node, as `HtmlBlock.parse_xml` does,
+    though the markup of the child elements is kept as written in the source (eg. quotes, character references):
+    - A body made of a single CDATA section is unwrapped, as lxml does.
+    - The text before the first child element is unescaped, as lxml does. It can't be escaped instead,
+      because after parsing it can't be told apart from a CDATA section (the usual way html is written in OLX).
+    Returns None if the root element isn't a `tag` element or the body can't be sliced,
+    in which case the parsed node must be serialized instead. That's the case if the root element
+    declares namespaces, since lxml adds their declarations to the serialized child elements.
+    """
+    if not olx:
+        return None
+    start_tag = _START_TAG_RE.match(olx, _OLX_PROLOG_RE.match(olx).end())
+    if not start_tag or start_tag.group(1) != tag or _XMLNS_RE.search(start_tag.group(0)):
+        return None
+    if start_tag.group(2):
+        return ''
+    end = olx.rfind('</{}'.format(tag))
+    if end < start_tag.end():
+        return None
+
+    inner_html = olx[start_tag.end():end]
+    body = inner_html.strip()
+    # A CDATA section can't contain "]]>", so this only matches a single section
+    if body.startswith('<![CDATA[') and body.find(']]>') == len(body) - 3:
+        cdata_start = inner_html.index('<![CDATA[')
+        cdata_end = inner_html.rindex(']]>')
+        return inner_html[:cdata_start] + inner_html[cdata_start + 9:cdata_end] + inner_html[cdata_end + 3:]
+    if '<![CDATA[' in inner_html:
+        return None
+    text_end = inner_html.find('<')
+    if text_end == -1:
+        text_end = len(inner_html)
+    return html.unescape(inner_html[:text_end]) + inner_html[text_end:]
+
 
 class HtmlBlock(XBlock, StudentViewBlockMixin):
     """
     XBlock for html asset.
+
+    Runtimes that keep the OLX source of the blocks they parse can provide it
+    as `runtime.get_olx_source(keys)`: `parse_xml` then slices the html out of it
+    instead of serializing the parsed nodes again.
     """
 
     display_name = String(
@@ -26,6 +79,7 @@ class HtmlBlock(XBlock, StudentViewBlockMixin):
     )
 
     student_view_template = "templates/html_student_view.html"
+    student_view_template_backend = "python"
 
     @classmethod
     def parse_xml(
@@ -33,11 +87,17 @@ class HtmlBlock(XBlock, StudentViewBlockMixin):
     ):  # pylint: disable=unused-argument
         """Retrieve blockstore olx"""
         block = runtime.construct_xblock_from_class(cls, keys)
-        parts = [node.text]
-        for c in node.getchildren():
-            parts.append(etree.tostring(c, with_tail=True, encoding="unicode"))
+        data = None
+        get_olx_source = getattr(runtime, 'get_olx_source', None)
+        if get_olx_source is not None:
+            data = inner_html_from_olx(get_olx_source(keys), node.tag)
+        if data is None:
+            parts = [node.text]
+            for c in node.getchildren():
+                parts.append(etree.tostring(c, with_tail=True, encoding="unicode"))
+            data = "".join([part for part in parts if part])
 
-        block.data = "".join([part for part in parts if part])
+        block.data = data
         # Attributes become fields.
         for name, value in node.items():
             cls._set_field_if_present(block, name, value, {})
@@ -0,0 +1,67 @@
+"""
+Post-processing of the inline html served by the blocks.
+"""
+import re
+
+from .dependencies import module_available
+
+# bleach takes a while to import, so it is only imported by `sanitize_html`
+bleach_available = module_available('bleach')
+
+
+# Tags and attributes kept by `sanitize_html`: what the LabXchange editors produce.
+SANITIZE_ALLOWED_TAGS = [
+    'a', 'abbr', 'acronym', 'b', 'blockquote', 'br', 'caption', 'cite', 'code', 'dd', 'del', 'div', 'dl', 'dt',
+    'em', 'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'ins', 'li', 'ol', 'p',
+    'pre', 's', 'small', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr',
+    'u', 'ul',
+]
+SANITIZE_ALLOWED_ATTRIBUTES = {
+    '*': ['class', 'id', 'lang', 'title'],
+    'a': ['href', 'rel', 'target'],
+    'img': ['alt', 'height', 'src', 'width'],
+    'td': ['colspan', 'rowspan'],
+    'th': ['colspan', 'rowspan', 'scope'],
+}
+
+# Elements whose content is whitespace-sensitive, and left as is by `minify_html`.
+_PRESERVED_ELEMENT_RE = re.compile(r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.DOTALL | re.IGNORECASE)
+# Comments, except for conditional comments (`<!--[if IE]>`).
+_COMMENT_RE = re.compile(r'<!--(?!\[if\b).*?-->', re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def minify_html(html_str):
+    """
+    Remove comments and collapse whitespace in `html_str`.
+
+    Whitespace runs are collapsed to a single space rather than removed,
+    so that the rendered text is unchanged.
+    """
+    parts = _PRESERVED_ELEMENT_RE.split(html_str)
+    minified = []
+    # `split` returns: text, preserved element, tag name of the preserved element, text, ...
+    for index in range(0, len(parts), 3):
+        text = _COMMENT_RE.sub('', parts[index])
+        minified.append(_WHITESPACE_RE.sub(' ', text))
+        if index + 1 < len(parts):
+            minified.append(parts[index + 1])
+    return ''.join(minified).strip()
+
+
+def sanitize_html(html_str):
+    """
+    Strip the tags and attributes that aren't allowed from `html_str`.
+
+    Sanitization needs `bleach`: without it, `html_str` is returned as is.
+    """
+    if not bleach_available:
+        return html_str
+    import bleach  # pylint: disable=import-outside-toplevel
+    return bleach.clean(
+        html_str,
+        tags=SANITIZE_ALLOWED_TAGS,
+        attributes=SANITIZE_ALLOWED_ATTRIBUTES,
+        strip=True,
+        strip_comments=True,
+    )
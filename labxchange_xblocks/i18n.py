@@ -1,733 +1,204 @@
 """
 ISO Languages
+
+The ISO 639-1 language table is loaded from `data/iso_languages.tsv` on first use,
+so that workers not serving blocks with languages don't load it.
+
+Transcripts and browsers use BCP 47 tags (eg. `en-US`, `pt-BR`, `zh-Hans`), see `resolve_language`
+and `match_language` to find the language or the transcript of a tag, and `negotiate_language`
+to pick the transcript for the Accept-Language header of a request.
 """
-iso_languages = {
-    "ab": {
-        "name": "Abkhaz",
-        "native_name": "аҧсуа"
-    },
-    "aa": {
-        "name": "Afar",
-        "native_name": "Afaraf"
-    },
-    "af": {
-        "name": "Afrikaans",
-        "native_name": "Afrikaans"
-    },
-    "ak": {
-        "name": "Akan",
-        "native_name": "Akan"
-    },
-    "sq": {
-        "name": "Albanian",
-        "native_name": "Shqip"
-    },
-    "am": {
-        "name": "Amharic",
-        "native_name": "አማርኛ"
-    },
-    "ar": {
-        "name": "Arabic",
-        "native_name": "العربية"
-    },
-    "an": {
-        "name": "Aragonese",
-        "native_name": "Aragonés"
-    },
-    "hy": {
-        "name": "Armenian",
-        "native_name": "Հայերեն"
-    },
-    "as": {
-        "name": "Assamese",
-        "native_name": "অসমীয়া"
-    },
-    "av": {
-        "name": "Avaric",
-        "native_name": "авар мацӀ, магӀарул мацӀ"
-    },
-    "ae": {
-        "name": "Avestan",
-        "native_name": "avesta"
-    },
-    "ay": {
-        "name": "Aymara",
-        "native_name": "aymar aru"
-    },
-    "az": {
-        "name": "Azerbaijani",
-        "native_name": "azərbaycan dili"
-    },
-    "bm": {
-        "name": "Bambara",
-        "native_name": "bamanankan"
-    },
-    "ba": {
-        "name": "Bashkir",
-        "native_name": "башҡорт теле"
-    },
-    "eu": {
-        "name": "Basque",
-        "native_name": "euskara, euskera"
-    },
-    "be": {
-        "name": "Belarusian",
-        "native_name": "Беларуская"
-    },
-    "bn": {
-        "name": "Bengali",
-        "native_name": "বাংলা"
-    },
-    "bh": {
-        "name": "Bihari",
-        "native_name": "भोजपुरी"
-    },
-    "bi": {
-        "name": "Bislama",
-        "native_name": "Bislama"
-    },
-    "bs": {
-        "name": "Bosnian",
-        "native_name": "bosanski jezik"
-    },
-    "br": {
-        "name": "Breton",
-        "native_name": "brezhoneg"
-    },
-    "bg": {
-        "name": "Bulgarian",
-        "native_name": "български език"
-    },
-    "my": {
-        "name": "Burmese",
-        "native_name": "ဗမာစာ"
-    },
-    "ca": {
-        "name": "Catalan; Valencian",
-        "native_name": "Català"
-    },
-    "ch": {
-        "name": "Chamorro",
-        "native_name": "Chamoru"
-    },
-    "ce": {
-        "name": "Chechen",
-        "native_name": "нохчийн мотт"
-    },
-    "ny": {
-        "name": "Chichewa; Chewa; Nyanja",
-        "native_name": "chiCheŵa, chinyanja"
-    },
-    "zh": {
-        "name": "Chinese",
-        "native_name": "中文 (Zhōngwén), 汉语, 漢語"
-    },
-    "cv": {
-        "name": "Chuvash",
-        "native_name": "чӑваш чӗлхи"
-    },
-    "kw": {
-        "name": "Cornish",
-        "native_name": "Kernewek"
-    },
-    "co": {
-        "name": "Corsican",
-        "native_name": "corsu, lingua corsa"
-    },
-    "cr": {
-        "name": "Cree",
-        "native_name": "ᓀᐦᐃᔭᐍᐏᐣ"
-    },
-    "hr": {
-        "name": "Croatian",
-        "native_name": "hrvatski"
-    },
-    "cs": {
-        "name": "Czech",
-        "native_name": "česky, čeština"
-    },
-    "da": {
-        "name": "Danish",
-        "native_name": "dansk"
-    },
-    "dv": {
-        "name": "Divehi; Dhivehi; Maldivian;",
-        "native_name": "ދިވެހި"
-    },
-    "nl": {
-        "name": "Dutch",
-        "native_name": "Nederlands, Vlaams"
-    },
-    "en": {
-        "name": "English",
-        "native_name": "English"
-    },
-    "eo": {
-        "name": "Esperanto",
-        "native_name": "Esperanto"
-    },
-    "et": {
-        "name": "Estonian",
-        "native_name": "eesti, eesti keel"
-    },
-    "ee": {
-        "name": "Ewe",
-        "native_name": "Eʋegbe"
-    },
-    "fo": {
-        "name": "Faroese",
-        "native_name": "føroyskt"
-    },
-    "fj": {
-        "name": "Fijian",
-        "native_name": "vosa Vakaviti"
-    },
-    "fi": {
-        "name": "Finnish",
-        "native_name": "suomi, suomen kieli"
-    },
-    "fr": {
-        "name": "French",
-        "native_name": "français, langue française"
-    },
-    "ff": {
-        "name": "Fula; Fulah; Pulaar; Pular",
-        "native_name": "Fulfulde, Pulaar, Pular"
-    },
-    "gl": {
-        "name": "Galician",
-        "native_name": "Galego"
-    },
-    "ka": {
-        "name": "Georgian",
-        "native_name": "ქართული"
-    },
-    "de": {
-        "name": "German",
-        "native_name": "Deutsch"
-    },
-    "el": {
-        "name": "Greek, Modern",
-        "native_name": "Ελληνικά"
-    },
-    "gn": {
-        "name": "Guaraní",
-        "native_name": "Avañeẽ"
-    },
-    "gu": {
-        "name": "Gujarati",
-        "native_name": "ગુજરાતી"
-    },
-    "ht": {
-        "name": "Haitian; Haitian Creole",
-        "native_name": "Kreyòl ayisyen"
-    },
-    "ha": {
-        "name": "Hausa",
-        "native_name": "Hausa, هَوُسَ"
-    },
-    "he": {
-        "name": "Hebrew (modern)",
-        "native_name": "עברית"
-    },
-    "hz": {
-        "name": "Herero",
-        "native_name": "Otjiherero"
-    },
-    "hi": {
-        "name": "Hindi",
-        "native_name": "हिन्दी, हिंदी"
-    },
-    "ho": {
-        "name": "Hiri Motu",
-        "native_name": "Hiri Motu"
-    },
-    "hu": {
-        "name": "Hungarian",
-        "native_name": "Magyar"
-    },
-    "ia": {
-        "name": "Interlingua",
-        "native_name": "Interlingua"
-    },
-    "id": {
-        "name": "Indonesian",
-        "native_name": "Bahasa Indonesia"
-    },
-    "ie": {
-        "name": "Interlingue",
-        "native_name": "Originally called Occidental; then Interlingue after WWII"
-    },
-    "ga": {
-        "name": "Irish",
-        "native_name": "Gaeilge"
-    },
-    "ig": {
-        "name": "Igbo",
-        "native_name": "Asụsụ Igbo"
-    },
-    "ik": {
-        "name": "Inupiaq",
-        "native_name": "Iñupiaq, Iñupiatun"
-    },
-    "io": {
-        "name": "Ido",
-        "native_name": "Ido"
-    },
-    "is": {
-        "name": "Icelandic",
-        "native_name": "Íslenska"
-    },
-    "it": {
-        "name": "Italian",
-        "native_name": "Italiano"
-    },
-    "iu": {
-        "name": "Inuktitut",
-        "native_name": "ᐃᓄᒃᑎᑐᑦ"
-    },
-    "ja": {
-        "name": "Japanese",
-        "native_name": "日本語 (にほんご／にっぽんご)"
-    },
-    "jv": {
-        "name": "Javanese",
-        "native_name": "basa Jawa"
-    },
-    "kl": {
-        "name": "Kalaallisut, Greenlandic",
-        "native_name": "kalaallisut, kalaallit oqaasii"
-    },
-    "kn": {
-        "name": "Kannada",
-        "native_name": "ಕನ್ನಡ"
-    },
-    "kr": {
-        "name": "Kanuri",
-        "native_name": "Kanuri"
-    },
-    "ks": {
-        "name": "Kashmiri",
-        "native_name": "कश्मीरी, كشميري‎"
-    },
-    "kk": {
-        "name": "Kazakh",
-        "native_name": "Қазақ тілі"
-    },
-    "km": {
-        "name": "Khmer",
-        "native_name": "ភាសាខ្មែរ"
-    },
-    "ki": {
-        "name": "Kikuyu, Gikuyu",
-        "native_name": "Gĩkũyũ"
-    },
-    "rw": {
-        "name": "Kinyarwanda",
-        "native_name": "Ikinyarwanda"
-    },
-    "ky": {
-        "name": "Kirghiz, Kyrgyz",
-        "native_name": "кыргыз тили"
-    },
-    "kv": {
-        "name": "Komi",
-        "native_name": "коми кыв"
-    },
-    "kg": {
-        "name": "Kongo",
-        "native_name": "KiKongo"
-    },
-    "ko": {
-        "name": "Korean",
-        "native_name": "한국어 (韓國語), 조선말 (朝鮮語)"
-    },
-    "ku": {
-        "name": "Kurdish",
-        "native_name": "Kurdî, كوردی‎"
-    },
-    "kj": {
-        "name": "Kwanyama, Kuanyama",
-        "native_name": "Kuanyama"
-    },
-    "la": {
-        "name": "Latin",
-        "native_name": "latine, lingua latina"
-    },
-    "lb": {
-        "name": "Luxembourgish, Letzeburgesch",
-        "native_name": "Lëtzebuergesch"
-    },
-    "lg": {
-        "name": "Luganda",
-        "native_name": "Luganda"
-    },
-    "li": {
-        "name": "Limburgish, Limburgan, Limburger",
-        "native_name": "Limburgs"
-    },
-    "ln": {
-        "name": "Lingala",
-        "native_name": "Lingála"
-    },
-    "lo": {
-        "name": "Lao",
-        "native_name": "ພາສາລາວ"
-    },
-    "lt": {
-        "name": "Lithuanian",
-        "native_name": "lietuvių kalba"
-    },
-    "lu": {
-        "name": "Luba-Katanga",
-        "native_name": ""
-    },
-    "lv": {
-        "name": "Latvian",
-        "native_name": "latviešu valoda"
-    },
-    "gv": {
-        "name": "Manx",
-        "native_name": "Gaelg, Gailck"
-    },
-    "mk": {
-        "name": "Macedonian",
-        "native_name": "македонски јазик"
-    },
-    "mg": {
-        "name": "Malagasy",
-        "native_name": "Malagasy fiteny"
-    },
-    "ms": {
-        "name": "Malay",
-        "native_name": "bahasa Melayu, بهاس ملايو‎"
-    },
-    "ml": {
-        "name": "Malayalam",
-        "native_name": "മലയാളം"
-    },
-    "mt": {
-        "name": "Maltese",
-        "native_name": "Malti"
-    },
-    "mi": {
-        "name": "Māori",
-        "native_name": "te reo Māori"
-    },
-    "mr": {
-        "name": "Marathi (Marāṭhī)",
-        "native_name": "मराठी"
-    },
-    "mh": {
-        "name": "Marshallese",
-        "native_name": "Kajin M̧ajeļ"
-    },
-    "mn": {
-        "name": "Mongolian",
-        "native_name": "монгол"
-    },
-    "na": {
-        "name": "Nauru",
-        "native_name": "Ekakairũ Naoero"
-    },
-    "nv": {
-        "name": "Navajo, Navaho",
-        "native_name": "Diné bizaad, Dinékʼehǰí"
-    },
-    "nb": {
-        "name": "Norwegian Bokmål",
-        "native_name": "Norsk bokmål"
-    },
-    "nd": {
-        "name": "North Ndebele",
-        "native_name": "isiNdebele"
-    },
-    "ne": {
-        "name": "Nepali",
-        "native_name": "नेपाली"
-    },
-    "ng": {
-        "name": "Ndonga",
-        "native_name": "Owambo"
-    },
-    "nn": {
-        "name": "Norwegian Nynorsk",
-        "native_name": "Norsk nynorsk"
-    },
-    "no": {
-        "name": "Norwegian",
-        "native_name": "Norsk"
-    },
-    "ii": {
-        "name": "Nuosu",
-        "native_name": "ꆈꌠ꒿ Nuosuhxop"
-    },
-    "nr": {
-        "name": "South Ndebele",
-        "native_name": "isiNdebele"
-    },
-    "oc": {
-        "name": "Occitan",
-        "native_name": "Occitan"
-    },
-    "oj": {
-        "name": "Ojibwe, Ojibwa",
-        "native_name": "ᐊᓂᔑᓈᐯᒧᐎᓐ"
-    },
-    "cu": {
-        "name": "Old Church Slavonic, Church Slavic, Church Slavonic, Old Bulgarian, Old Slavonic",
-        "native_name": "ѩзыкъ словѣньскъ"
-    },
-    "om": {
-        "name": "Oromo",
-        "native_name": "Afaan Oromoo"
-    },
-    "or": {
-        "name": "Oriya",
-        "native_name": "ଓଡ଼ିଆ"
-    },
-    "os": {
-        "name": "Ossetian, Ossetic",
-        "native_name": "ирон æвзаг"
-    },
-    "pa": {
-        "name": "Panjabi, Punjabi",
-        "native_name": "ਪੰਜਾਬੀ, پنجابی‎"
-    },
-    "pi": {
-        "name": "Pāli",
-        "native_name": "पाऴि"
-    },
-    "fa": {
-        "name": "Persian",
-        "native_name": "فارسی"
-    },
-    "pl": {
-        "name": "Polish",
-        "native_name": "polski"
-    },
-    "ps": {
-        "name": "Pashto, Pushto",
-        "native_name": "پښتو"
-    },
-    "pt": {
-        "name": "Portuguese",
-        "native_name": "Português"
-    },
-    "qu": {
-        "name": "Quechua",
-        "native_name": "Runa Simi, Kichwa"
-    },
-    "rm": {
-        "name": "Romansh",
-        "native_name": "rumantsch grischun"
-    },
-    "rn": {
-        "name": "Kirundi",
-        "native_name": "kiRundi"
-    },
-    "ro": {
-        "name": "Romanian, Moldavian, Moldovan",
-        "native_name": "română"
-    },
-    "ru": {
-        "name": "Russian",
-        "native_name": "русский язык"
-    },
-    "sa": {
-        "name": "Sanskrit (Saṁskṛta)",
-        "native_name": "संस्कृतम्"
-    },
-    "sc": {
-        "name": "Sardinian",
-        "native_name": "sardu"
-    },
-    "sd": {
-        "name": "Sindhi",
-        "native_name": "सिन्धी, سنڌي، سندھی‎"
-    },
-    "se": {
-        "name": "Northern Sami",
-        "native_name": "Davvisámegiella"
-    },
-    "sm": {
-        "name": "Samoan",
-        "native_name": "gagana faa Samoa"
-    },
-    "sg": {
-        "name": "Sango",
-        "native_name": "yângâ tî sängö"
-    },
-    "sr": {
-        "name": "Serbian",
-        "native_name": "српски језик"
-    },
-    "gd": {
-        "name": "Scottish Gaelic; Gaelic",
-        "native_name": "Gàidhlig"
-    },
-    "sn": {
-        "name": "Shona",
-        "native_name": "chiShona"
-    },
-    "si": {
-        "name": "Sinhala, Sinhalese",
-        "native_name": "සිංහල"
-    },
-    "sk": {
-        "name": "Slovak",
-        "native_name": "slovenčina"
-    },
-    "sl": {
-        "name": "Slovene",
-        "native_name": "slovenščina"
-    },
-    "so": {
-        "name": "Somali",
-        "native_name": "Soomaaliga, af Soomaali"
-    },
-    "st": {
-        "name": "Southern Sotho",
-        "native_name": "Sesotho"
-    },
-    "es": {
-        "name": "Spanish; Castilian",
-        "native_name": "español, castellano"
-    },
-    "su": {
-        "name": "Sundanese",
-        "native_name": "Basa Sunda"
-    },
-    "sw": {
-        "name": "Swahili",
-        "native_name": "Kiswahili"
-    },
-    "ss": {
-        "name": "Swati",
-        "native_name": "SiSwati"
-    },
-    "sv": {
-        "name": "Swedish",
-        "native_name": "svenska"
-    },
-    "ta": {
-        "name": "Tamil",
-        "native_name": "தமிழ்"
-    },
-    "te": {
-        "name": "Telugu",
-        "native_name": "తెలుగు"
-    },
-    "tg": {
-        "name": "Tajik",
-        "native_name": "тоҷикӣ, toğikī, تاجیکی‎"
-    },
-    "th": {
-        "name": "Thai",
-        "native_name": "ไทย"
-    },
-    "ti": {
-        "name": "Tigrinya",
-        "native_name": "ትግርኛ"
-    },
-    "bo": {
-        "name": "Tibetan Standard, Tibetan, Central",
-        "native_name": "བོད་ཡིག"
-    },
-    "tk": {
-        "name": "Turkmen",
-        "native_name": "Türkmen, Түркмен"
-    },
-    "tl": {
-        "name": "Tagalog",
-        "native_name": "Wikang Tagalog, ᜏᜒᜃᜅ᜔ ᜆᜄᜎᜓᜄ᜔"
-    },
-    "tn": {
-        "name": "Tswana",
-        "native_name": "Setswana"
-    },
-    "to": {
-        "name": "Tonga (Tonga Islands)",
-        "native_name": "faka Tonga"
-    },
-    "tr": {
-        "name": "Turkish",
-        "native_name": "Türkçe"
-    },
-    "ts": {
-        "name": "Tsonga",
-        "native_name": "Xitsonga"
-    },
-    "tt": {
-        "name": "Tatar",
-        "native_name": "татарча, tatarça, تاتارچا‎"
-    },
-    "tw": {
-        "name": "Twi",
-        "native_name": "Twi"
-    },
-    "ty": {
-        "name": "Tahitian",
-        "native_name": "Reo Tahiti"
-    },
-    "ug": {
-        "name": "Uighur, Uyghur",
-        "native_name": "Uyƣurqə, ئۇيغۇرچە‎"
-    },
-    "uk": {
-        "name": "Ukrainian",
-        "native_name": "українська"
-    },
-    "ur": {
-        "name": "Urdu",
-        "native_name": "اردو"
-    },
-    "uz": {
-        "name": "Uzbek",
-        "native_name": "zbek, Ўзбек, أۇزبېك‎"
-    },
-    "ve": {
-        "name": "Venda",
-        "native_name": "Tshivenḓa"
-    },
-    "vi": {
-        "name": "Vietnamese",
-        "native_name": "Tiếng Việt"
-    },
-    "vo": {
-        "name": "Volapük",
-        "native_name": "Volapük"
-    },
-    "wa": {
-        "name": "Walloon",
-        "native_name": "Walon"
-    },
-    "cy": {
-        "name": "Welsh",
-        "native_name": "Cymraeg"
-    },
-    "wo": {
-        "name": "Wolof",
-        "native_name": "Wollof"
-    },
-    "fy": {
-        "name": "Western Frisian",
-        "native_name": "Frysk"
-    },
-    "xh": {
-        "name": "Xhosa",
-        "native_name": "isiXhosa"
-    },
-    "yi": {
-        "name": "Yiddish",
-        "native_name": "ייִדיש"
-    },
-    "yo": {
-        "name": "Yoruba",
-        "native_name": "Yorùbá"
-    },
-    "za": {
-        "name": "Zhuang, Chuang",
-        "native_name": "Saɯ cueŋƅ, Saw cuengh"
-    }
+import functools
+import pkgutil
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from .content import FrozenDict, FrozenList
+
+LANGUAGES_FILE = 'data/iso_languages.tsv'
+
+# Deprecated ISO 639-1 codes, still used by some systems
+LANGUAGE_ALIASES = {
+    'in': 'id',
+    'iw': 'he',
+    'ji': 'yi',
 }
+
+
+@functools.lru_cache(maxsize=None)
+def all_languages():
+    """
+    Return the read-only table of languages by ISO 639-1 code, eg.
+
+        {"en": {"name": "English", "native_name": "English"}, ...}
+    """
+    lines = pkgutil.get_data(__package__, LANGUAGES_FILE).decode('utf-8').splitlines()
+    languages = {}
+    # The first line is the header
+    for line in lines[1:]:
+        code, name, native_name = line.split('\t')
+        languages[code] = FrozenDict(name=name, native_name=native_name)
+    return MappingProxyType(languages)
+
+
+class _LazyLanguages(Mapping):
+    """
+    Read-only mapping of `all_languages`, which only loads the table when it is used.
+    """
+
+    def __getitem__(self, code):
+        return all_languages()[code]
+
+    def __iter__(self):
+        return iter(all_languages())
+
+    def __len__(self):
+        return len(all_languages())
+
+
+# `iso_languages` used to be a dict defined in this module
+iso_languages = _LazyLanguages()
+
+
+def get_language(code):
+    """
+    Return the name and native name of the language with ISO 639-1 code `code`, or None if unknown.
+    """
+    return all_languages().get(code)
+
+
+@functools.lru_cache(maxsize=None)
+def language_options():
+    """
+    Return the languages as options of a field (see `xblock.fields.Field.values`), sorted by name.
+    """
+    return tuple(
+        FrozenDict(display_name=language['name'], value=code)
+        for code, language in sorted(all_languages().items(), key=lambda item: item[1]['name'])
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_language_tag(tag):
+    """
+    Return the BCP 47 language tag `tag` in its canonical case (eg. `en_us` => `en-US`, `ZH-HANS` => `zh-Hans`).
+
+    Returns None if `tag` isn't a string or is empty.
+    """
+    if not isinstance(tag, str):
+        return None
+    subtags = [subtag for subtag in tag.strip().replace('_', '-').split('-') if subtag]
+    if not subtags:
+        return None
+    normalized = [subtags[0].lower()]
+    for subtag in subtags[1:]:
+        if len(subtag) == 4 and subtag.isalpha():
+            # Script
+            normalized.append(subtag.title())
+        elif len(subtag) == 2 and subtag.isalpha() or len(subtag) == 3 and subtag.isdigit():
+            # Region
+            normalized.append(subtag.upper())
+        else:
+            normalized.append(subtag.lower())
+    return '-'.join(normalized)
+
+
+def _primary_language(tag):
+    """
+    Return the ISO 639-1 code of the primary language subtag of a normalized tag.
+    """
+    primary = tag.split('-', 1)[0]
+    return LANGUAGE_ALIASES.get(primary, primary)
+
+
+@functools.lru_cache(maxsize=1024)
+def resolve_language(tag):
+    """
+    Return the language of the BCP 47 tag `tag`, as returned by `get_language`, or None if unknown.
+
+    Regional and script variants resolve to their base language (eg. `pt-BR` => Portuguese).
+    """
+    normalized = normalize_language_tag(tag)
+    if normalized is None:
+        return None
+    return get_language(_primary_language(normalized))
+
+
+@functools.lru_cache(maxsize=4096)
+def match_language(tag, available_tags):
+    """
+    Return the tag of `available_tags` (a tuple) best matching the BCP 47 tag `tag`, or None.
+
+    An exact match is preferred, then a match ignoring case, then the base language
+    (`en-US` => `en`), then another variant of the same language (`en` => `en-GB`).
+    """
+    if tag in available_tags:
+        return tag
+    normalized = normalize_language_tag(tag)
+    if normalized is None:
+        return None
+    normalized_tags = {normalize_language_tag(available): available for available in reversed(available_tags)}
+    if normalized in normalized_tags:
+        return normalized_tags[normalized]
+    primary = _primary_language(normalized)
+    if primary in normalized_tags:
+        return normalized_tags[primary]
+    for available in available_tags:
+        available_normalized = normalize_language_tag(available)
+        if available_normalized and _primary_language(available_normalized) == primary:
+            return available
+    return None
+
+
+def _parse_accept_language(accept_language):
+    """
+    Return the language ranges of an Accept-Language header value, most preferred first.
+
+    Ranges with a quality of 0 or an invalid quality are left out.
+    """
+    ranges = []
+    for item in accept_language.split(','):
+        language_range, _, params = item.partition(';')
+        language_range = language_range.strip()
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if language_range and quality > 0:
+            ranges.append((quality, language_range))
+    # `sorted` is stable, so ranges of the same quality keep the order of the header
+    return [language_range for quality, language_range in sorted(ranges, key=lambda item: -item[0])]
+
+
+@functools.lru_cache(maxsize=4096)
+def negotiate_language(accept_language, available_tags):
+    """
+    Return the tag of `available_tags` (a tuple) best matching the Accept-Language header value
+    `accept_language` (eg. `fr-CH, fr;q=0.9, en;q=0.8, *;q=0.5`), or None.
+
+    The language ranges are tried in order of preference, each matched as in `match_language`.
+    The decision is memoized per header value and tags, which only take a few distinct values.
+    """
+    if not isinstance(accept_language, str) or not available_tags:
+        return None
+    for language_range in _parse_accept_language(accept_language):
+        if language_range == '*':
+            return available_tags[0]
+        tag = match_language(language_range, available_tags)
+        if tag is not None:
+            return tag
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def transcript_language_options(tags):
+    """
+    Return the language options of transcripts in the languages `tags` (a tuple), in the same order.
+
+        [{"lang": "pt-BR", "language": {"name": "Portuguese", "native_name": "Português"}}, ...]
+    """
+    return FrozenList(FrozenDict(lang=tag, language=resolve_language(tag)) for tag in tags)
@@ -73,6 +73,7 @@ class ImageBlock(XBlock, StudioEditableXBlockMixin, StudentViewBlockMixin):
     )
 
     student_view_template = 'templates/image_student_view.html'
+    student_view_template_backend = 'python'
     css_resource_url = 'public/css/image-xblock.css'
 
     def student_view_data(self, context=None):
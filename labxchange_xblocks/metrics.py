@@ -0,0 +1,367 @@
+"""
+Metrics of the handlers and views of the blocks, see `StudentViewBlockMixin`.
+
+Metrics are sent to the sink set with `set_metrics_sink`. The default sink drops them,
+and handlers and views aren't measured at all while it is in use.
+
+The phases of a handler call can also be timed for a single request, see `timed_phase`,
+and the memory they allocate can be profiled with tracemalloc, see `start_memory_profiling`.
+"""
+import bisect
+import functools
+import logging
+import socket
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+
+log = logging.getLogger(__name__)
+
+# What is recorded for each call of a handler or view.
+# `field_reads` is the number of distinct fields read, `response_size` is in bytes (None if unknown).
+HandlerMetrics = namedtuple('HandlerMetrics', [
+    'block_type',
+    'handler',
+    'wall_time',
+    'get_block_calls',
+    'field_reads',
+    'field_writes',
+    'response_size',
+])
+
+# Upper bounds of the histogram buckets of each metric; larger values go in an overflow bucket.
+HISTOGRAM_BOUNDS = {
+    'wall_time': (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5),
+    'get_block_calls': (0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+    'field_reads': (0, 1, 2, 5, 10, 20, 50),
+    'field_writes': (0, 1, 2, 5, 10, 20, 50),
+    'response_size': (1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20, 4 << 20, 16 << 20),
+}
+
+
+class Histogram:
+    """
+    Counts of values per bucket, with their sum.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+
+    def observe(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        """
+        Return the upper bound of the bucket of the `q` quantile (None for the overflow bucket, or if empty).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets[:-1]):
+            seen += bucket_count
+            if seen >= rank:
+                return self.bounds[index]
+        return None
+
+
+class NullMetricsSink:
+    """
+    Sink dropping all metrics.
+    """
+    enabled = False
+
+    def record(self, metrics):
+        pass
+
+
+class InMemoryMetricsSink:
+    """
+    Sink keeping a histogram of each metric, per block type and handler.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.histograms = {}  # (block_type, handler, metric name) => Histogram
+        self._lock = threading.Lock()
+
+    def record(self, metrics):
+        with self._lock:
+            for name, bounds in HISTOGRAM_BOUNDS.items():
+                value = getattr(metrics, name)
+                if value is None:
+                    continue
+                key = (metrics.block_type, metrics.handler, name)
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(bounds)
+                histogram.observe(value)
+
+    def histogram(self, block_type, handler, name):
+        """
+        Return the histogram of the metric `name` of a handler, or None if it wasn't recorded.
+        """
+        return self.histograms.get((block_type, handler, name))
+
+
+class StatsdMetricsSink:
+    """
+    Sink sending metrics to a statsd server over UDP, one datagram per call.
+
+    Wall time is sent as a timer in milliseconds, the other metrics as histograms,
+    named `<prefix>.<block type>.<handler>.<metric>`.
+    """
+    enabled = True
+
+    def __init__(self, host='127.0.0.1', port=8125, prefix='labxchange_xblocks'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def record(self, metrics):
+        name = f'{self.prefix}.{metrics.block_type}.{metrics.handler}'
+        lines = [f'{name}.wall_time:{metrics.wall_time * 1000:.3f}|ms']
+        for metric in ('get_block_calls', 'field_reads', 'field_writes', 'response_size'):
+            value = getattr(metrics, metric)
+            if value is not None:
+                lines.append(f'{name}.{metric}:{value}|h')
+        try:
+            self._socket.sendto('\n'.join(lines).encode('utf-8'), self.address)
+        except OSError as err:
+            log.debug(f"Unable to send metrics to statsd: {err!r}")
+
+    def close(self):
+        self._socket.close()
+
+
+_sink = NullMetricsSink()
+
+
+def get_metrics_sink():
+    return _sink
+
+
+def set_metrics_sink(sink):
+    """
+    Send metrics to `sink` (None to drop them), and return the previous sink.
+    """
+    global _sink  # pylint: disable=global-statement
+    previous_sink = _sink
+    _sink = sink if sink is not None else NullMetricsSink()
+    return previous_sink
+
+
+class Measurement:
+    """
+    Counters of a handler or view call in progress.
+    """
+
+    def __init__(self, block, handler):
+        self.block = block
+        self.handler = handler
+        self.get_block_calls = 0
+        # Fields read without going through the field descriptors, see `count_field_read`
+        self.read_fields = set()
+
+
+_active = threading.local()
+
+
+def active_measurements():
+    """
+    Return the stack of measurements in progress in this thread.
+    """
+    measurements = getattr(_active, 'measurements', None)
+    if measurements is None:
+        measurements = _active.measurements = []
+    return measurements
+
+
+def count_get_block():
+    """
+    Count a `runtime.get_block` call in the measurements in progress.
+    """
+    for measurement in getattr(_active, 'measurements', ()):
+        measurement.get_block_calls += 1
+
+
+def count_field_read(block, name):
+    """
+    Count a read of the field `name` of `block` that bypasses its field data cache in the measurements in progress.
+    """
+    for measurement in getattr(_active, 'measurements', ()):
+        if measurement.block is block:
+            measurement.read_fields.add(name)
+
+
+# Phases of the handlers timed with `timed_phase`, in the order of the Server-Timing header.
+PHASES = ('children', 'score', 'static', 'template', 'serialization')
+
+
+class PhaseTimings:
+    """
+    Durations of the phases of a handler call in progress, see `timed_phase`.
+    """
+
+    def __init__(self):
+        self.durations = dict.fromkeys(PHASES, 0)
+        self.running = set()
+
+    def server_timing(self, total):
+        """
+        Return the value of the Server-Timing header for these phases and the `total` duration (in seconds).
+        """
+        durations = list(self.durations.items()) + [('total', total)]
+        return ', '.join(f'{name};dur={duration * 1000:.2f}' for name, duration in durations)
+
+
+def start_phase_timings():
+    """
+    Start timing the phases of a handler call in this thread, and return its `PhaseTimings`.
+    """
+    _active.phase_timings = PhaseTimings()
+    return _active.phase_timings
+
+
+def stop_phase_timings():
+    _active.phase_timings = None
+
+
+def phase_timings_active():
+    return getattr(_active, 'phase_timings', None) is not None
+
+
+def timed_phase(name):
+    """
+    Decorator adding the duration of each call to the phase `name` of the handler call in progress, if timed.
+
+    Nested calls of the same phase are only counted once.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = getattr(_active, 'phase_timings', None)
+            if timings is None or name in timings.running:
+                return func(*args, **kwargs)
+            timings.running.add(name)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.running.discard(name)
+                timings.durations[name] = timings.durations.get(name, 0) + time.perf_counter() - start
+        return wrapper
+    return decorator
+
+
+class MemoryProfile:
+    """
+    Memory allocated by the handler and view calls made while memory profiling is on.
+
+    For each block type and handler, it records the number of calls, the highest peak of memory
+    allocated during a call, and the memory still allocated after the calls, by allocation site.
+    The latter is what the blocks (and the caches) keep, ie. the heavy structures.
+    """
+
+    def __init__(self):
+        self.calls = {}  # (block_type, handler) => number of calls
+        self.peaks = {}  # (block_type, handler) => bytes
+        self.retained = {}  # (block_type, handler) => {allocation site: [bytes, number of blocks]}
+        self._lock = threading.Lock()
+
+    def record(self, block_type, handler, peak, statistics):
+        """
+        Record a call, given its peak and the `tracemalloc.StatisticDiff`s of its snapshots.
+        """
+        key = (block_type, handler)
+        with self._lock:
+            self.calls[key] = self.calls.get(key, 0) + 1
+            self.peaks[key] = max(self.peaks.get(key, 0), peak)
+            retained = self.retained.setdefault(key, {})
+            for stat in statistics:
+                if stat.size_diff <= 0:
+                    continue
+                site = retained.setdefault(str(stat.traceback), [0, 0])
+                site[0] += stat.size_diff
+                site[1] += stat.count_diff
+
+    def top(self, block_type, handler, limit=10):
+        """
+        Return the `limit` allocation sites retaining the most memory after the calls of a handler,
+        as `(site, bytes, number of blocks)` tuples.
+        """
+        retained = self.retained.get((block_type, handler), {})
+        sites = sorted(retained.items(), key=lambda item: item[1][0], reverse=True)
+        return [(site, size, count) for site, (size, count) in sites[:limit]]
+
+
+_memory_profile = None
+_started_tracemalloc = False
+
+# `tracemalloc.reset_peak` was added in Python 3.9
+reset_peak_available = hasattr(tracemalloc, 'reset_peak')
+
+
+def start_memory_profiling(frames=1):
+    """
+    Start profiling the memory allocated by handlers and views, and return the `MemoryProfile`.
+
+    tracemalloc is started (keeping `frames` frames per allocation) if it isn't tracing yet.
+    Taking snapshots is slow, so this is meant for benchmarks and debugging, not production.
+    """
+    global _memory_profile, _started_tracemalloc  # pylint: disable=global-statement
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        _started_tracemalloc = True
+    _memory_profile = MemoryProfile()
+    return _memory_profile
+
+
+def stop_memory_profiling():
+    """
+    Stop profiling memory, and return the `MemoryProfile` (None if it wasn't started).
+    """
+    global _memory_profile, _started_tracemalloc  # pylint: disable=global-statement
+    profile = _memory_profile
+    _memory_profile = None
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+    return profile
+
+
+def memory_profiling_active():
+    return _memory_profile is not None
+
+
+def profile_memory(block_type, handler, func):
+    """
+    Call `func`, the handler or view `handler` of a block, and record its allocations in the memory profile.
+
+    Calls made by another profiled call are part of that call.
+    Before Python 3.9, which added `tracemalloc.reset_peak`, the peak can't be measured,
+    and the memory still allocated at the end of the call is recorded instead.
+    """
+    profile = _memory_profile
+    if profile is None or getattr(_active, 'profiling_memory', False):
+        return func()
+    ignored = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+    _active.profiling_memory = True
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(ignored)
+        if reset_peak_available:
+            tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1 if reset_peak_available else 0] - traced_before
+        after = tracemalloc.take_snapshot().filter_traces(ignored)
+    finally:
+        _active.profiling_memory = False
+    profile.record(block_type, handler, peak, after.compare_to(before, 'traceback'))
+    return result
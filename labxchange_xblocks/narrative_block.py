@@ -60,6 +60,6 @@ class NarrativeBlock(XBlock, StudioEditableXBlockMixin, StudentViewBlockMixin):
         """
         return {
             'display_name': self.display_name,
-            'key_points': self.key_points,
-            'narrative': self.narrative,
+            'key_points': self.process_html(self.key_points),
+            'narrative': self.process_html(self.narrative),
         }
@@ -3,19 +3,19 @@
 Question XBlock.
 """
 import html
-import json
 import logging
 from typing import List, Optional
 from xml.etree.ElementTree import tostring
 
 from lxml import etree
-from webob import Response
 from xblock import fields
 from xblock.core import XBlock
 from xblock.exceptions import JsonHandlerError
 from xblock.fields import Scope
 from xblock.scorable import Score
 
+from .content import QuestionContent
+from .metrics import timed_phase
 from .utils import StudentViewBlockMixin, _
 
 log = logging.getLogger(__name__)
@@ -151,18 +151,26 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
 
     student_view_template = "templates/question_student_view.html"
 
+    @property
+    def _content(self):
+        """
+        The question data and hints, shared with the other instances of this content (see `QuestionContent`).
+        """
+        return QuestionContent.for_block(self)
+
     @property
     def _question_data(self):
         """
         Calls parse_xml to parse the question data if it hasn't already been done.
 
-        Once this property is accessed for a QuestionBlock, it's safe to simply access self.question_data,
-        as that field has been populated.
+        Returns the read-only question data of `_content`, use it rather than `question_data`
+        when not changing the question.
 
         This is needed temporarily to handle switching between cached ProblemBlock fields and QuestionBlock
         fields, and can safely be removed when ProblemBlocks are no longer in use by LabXchange.
         """
-        if not self.question_data:
+        question_data = self._content.question_data
+        if not question_data:
             # If no question data has been parsed yet, then parse it.
             log.debug(
                 f"QuestionBlock: re-parsing XML data for block {self.scope_ids.usage_id}"
@@ -177,7 +185,8 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
             self._parse_xml(node)
             # Unmark the modified fields as "dirty" -- nothing has actually changed.
             self._clear_dirty_fields()
-        return self.question_data
+            question_data = self._content.question_data
+        return question_data
 
     def student_view_data(self, context=None):
         """
@@ -188,6 +197,7 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
     def _has_attempts(self) -> bool:
         return self.max_attempts < 1 or self.student_attempts < self.max_attempts
 
+    @timed_phase("score")
     def get_score(self):
         possible = self.weight if self.weight > 0 else 1
         correct = self._is_correct()
@@ -204,19 +214,19 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
         if t == "stringresponse":
             data = {
                 "type": t,
-                "question": self.question_data["question"],
+                "question": self._question_data["question"],
                 "studentAnswer": self.student_answer,
             }
 
             student_answer = self.student_answer.get("response", None) or None
             if student_answer:
                 data["comment"] = {
-                    k.lower(): v for k, v in self.question_data["comments"].items()
+                    k.lower(): v for k, v in self._question_data["comments"].items()
                 }.get(student_answer.lower(), "")
 
             # only show answers if student has no attempts remaining
             if not self._has_attempts():
-                data["answer"] = self.question_data["answers"][0]
+                data["answer"] = self._question_data["answers"][0]
 
             return data
 
@@ -228,11 +238,11 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
             comment = ""
             if has_answer:
                 group_key = "correct" if correct else "incorrect"
-                comment = self.question_data["comments"].get(group_key, "")
+                comment = self._question_data["comments"].get(group_key, "")
 
             return {
                 "type": t,
-                "question": self.question_data["question"],
+                "question": self._question_data["question"],
                 "choices": [
                     {
                         "content": choice["content"],
@@ -247,7 +257,7 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
                         else "",
                     }
                     for index, choice in enumerate(
-                        self.question_data.get("choices", [])
+                        self._question_data.get("choices", [])
                     )
                 ],
                 "comment": comment,
@@ -256,11 +266,11 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
 
         elif t == "optionresponse":
             answer_index = self._answer_index(not_found=-1)
-            options = self.question_data["options"]
+            options = self._question_data["options"]
             return {
                 "type": t,
-                "question": self.question_data["question"],
-                "display": self.question_data["display"],
+                "question": self._question_data["question"],
+                "display": self._question_data["display"],
                 "options": [
                     {
                         "content": option["content"],
@@ -289,7 +299,7 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
         if not student_answer:
             student_answer = self.student_answer
 
-        options = self.question_data["options"]
+        options = self._question_data["options"]
 
         answer_index = student_answer.get("index")
         if answer_index is None and "response" in self.student_answer:
@@ -305,6 +315,7 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
             return not_found
         return answer_index
 
+    @timed_phase("score")
     def _is_correct(self) -> Optional[bool]:
         """
         Return:
@@ -319,31 +330,46 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
         if t == "optionresponse":
             index = self._answer_index(not_found=-1)
             # this could happen if student submits answer, then options are removed later
-            if index >= len(self.question_data["options"]):
+            if index >= len(self._question_data["options"]):
                 return False
-            return self.question_data["options"][index]["correct"]
+            return self._question_data["options"][index]["correct"]
         if t == "stringresponse":
             response = self.student_answer["response"]
             return response.lower() in map(
-                lambda x: x.lower(), self.question_data["answers"]
+                lambda x: x.lower(), self._question_data["answers"]
             )
         if t == "choiceresponse":
             selected = self.student_answer["selected"]
-            for index, choice in enumerate(self.question_data["choices"]):
+            for index, choice in enumerate(self._question_data["choices"]):
                 if choice["correct"] != (index in selected):
                     return False
             return True
 
     def _student_view_user_state_data(self):
+        data = self._student_view_content_state_data()
+        data.update(self._student_view_learner_state_data())
+        return data
+
+    def _student_view_content_state_data(self, fields=None):  # pylint: disable=unused-argument
+        """
+        The part of the user state data that is the same for all learners.
+        """
+        return {
+            "maxAttempts": self.max_attempts,
+            "total_possible": self.weight if self.weight > 0 else 1,
+            "hints": self._content.hints,
+        }
+
+    def _student_view_learner_state_data(self):
+        """
+        The part of the user state data that depends on the learner.
+        """
         correct = self._is_correct()
         question_data = self._student_view_question_data(correct=correct)
         weight = self.weight if self.weight > 0 else 1
         return {
-            "maxAttempts": self.max_attempts,
             "current_score": weight if correct else 0,
-            "total_possible": weight,
             "questionData": question_data,
-            "hints": self.hints,
             "studentAttempts": self.student_attempts,
             "correct": correct,
         }
@@ -357,9 +383,10 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
         (ie. everything except for the answers),
         and the student state.
         """
-        state = self._student_view_user_state_data()
-        return Response(
-            json.dumps(state), content_type="application/json", charset="UTF-8"
+        return self.user_state_response(
+            self._student_view_content_state_data,
+            self._student_view_learner_state_data(),
+            self._requested_fields(request),
         )
 
     @XBlock.json_handler
@@ -394,7 +421,7 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
         t = self._question_data["type"]
         if t == "optionresponse":
             index = self._answer_index(student_answer=data)
-            n_options = len(self.question_data["options"])
+            n_options = len(self._question_data["options"])
             if index is None:
                 raise JsonHandlerError(400, "`index` field missing")
             try:
@@ -419,7 +446,7 @@ class QuestionBlock(XBlock, StudentViewBlockMixin):
 
         elif t == "choiceresponse":
             selected = data.get("selected")
-            n_choices = len(self.question_data["choices"])
+            n_choices = len(self._question_data["choices"])
             if selected is None:
                 raise JsonHandlerError(400, "`selected` field missing")
             if not isinstance(selected, list):
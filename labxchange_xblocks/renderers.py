@@ -0,0 +1,84 @@
+"""
+Python renderers of the simple templates of the blocks.
+
+Each renderer returns exactly what its Django template renders with autoescaping, without compiling
+the template nor building a `Context`. Blocks set `student_view_template_backend = 'python'` to use
+the renderer of their `student_view_template`, see `StudentViewBlockMixin._render_student_view_template`.
+"""
+from django.utils.html import conditional_escape
+
+
+def _escaped(context, name):
+    """
+    Return the variable `name` of `context` as rendered by `{{ name }}`.
+    """
+    if name not in context:
+        return ''
+    return conditional_escape(context[name])
+
+
+def _unescaped(context, name):
+    """
+    Return the variable `name` of `context` as rendered by `{{ name|safe }}`.
+    """
+    if name not in context:
+        return ''
+    return str(context[name])
+
+
+def render_html_student_view(context):
+    return f'{_unescaped(context, "html")}\n'
+
+
+def render_image_student_view(context):
+    parts = [
+        '<figure class="image-block-student-view">\n'
+        f'    <img class="image-block-image" src="{_escaped(context, "image_url")}"'
+        f' alt="{_escaped(context, "alt_text")}"/>\n'
+        '    '
+    ]
+    caption = context.get('caption')
+    citation = context.get('citation')
+    if caption or citation:
+        parts.append('\n    <figcaption>\n        ')
+        if caption:
+            parts.append(f'<span class="caption">{_escaped(context, "caption")}</span>')
+        parts.append('\n        ')
+        if citation:
+            parts.append(f'<cite>{_escaped(context, "citation")}</cite>')
+        parts.append('\n    </figcaption>\n    ')
+    parts.append('\n</figure>\n')
+    return ''.join(parts)
+
+
+def render_document_student_view(context):
+    document_url = _escaped(context, 'document_url')
+    return (
+        '<div class="document-block-student-view">\n'
+        f'  <object data="{document_url}" type="{_escaped(context, "document_type")}"'
+        f'  aria-label="{_escaped(context, "display_name")}">\n'
+        '    <p>It appears you don\'t have an appropriate viewer plugin installed.'
+        f' Click <a href="{document_url}">here</a> to view the file.</p>\n'
+        '  </object>\n'
+        '</div>\n'
+    )
+
+
+def render_simulation_student_view(context):
+    return (
+        '<div class="simulation-block-student-view">\n'
+        '    <iframe\n'
+        f'        title="{_escaped(context, "display_name")}"\n'
+        f'        src="{_escaped(context, "simulation_url")}">\n'
+        '    </iframe>\n'
+        '</div>\n'
+    )
+
+
+# Renderers by template path
+RENDERERS = {
+    'templates/html_student_view.html': render_html_student_view,
+    'templates/image_student_view.html': render_image_student_view,
+    'templates/document_student_view.html': render_document_student_view,
+    'templates/simulation_student_view.html': render_simulation_student_view,
+}
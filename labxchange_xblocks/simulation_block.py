@@ -41,6 +41,7 @@ class SimulationBlock(XBlock, StudioEditableXBlockMixin, StudentViewBlockMixin):
     )
 
     student_view_template = 'templates/simulation_student_view.html'
+    student_view_template_backend = 'python'
     css_resource_url = 'public/css/simulation-xblock.css'
 
     def student_view_data(self, context=None):
@@ -4,6 +4,8 @@ Assignment block tests
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import mock
+from webob import Request
 from xblock.completable import XBlockCompletionMode
 from xblock.field_data import DictFieldData
 from xblock.fields import ScopeIds
@@ -76,3 +78,26 @@ class AssignmentBlockTestCase(XmlTest, BlockTestCaseBase):
             ],
             'display_name': 'Assignment 1'
         })
+
+    def test_student_view_user_state_fields(self):
+        block = self._construct_xblock_mock(self.block_class, self.keys, field_data=DictFieldData({}))
+        block.children.append('usage_id_problem')
+        self.runtime_mock.get_block.return_value = mock.Mock()
+
+        with mock.patch.object(
+            AssignmentBlock, 'get_weighted_score_for_block', return_value={'earned': 1, 'possible': 2},
+        ):
+            response = block.student_view_user_state(Request.blank('/?fields=score'))
+            self.assertEqual(response.json, {'score': {'earned': 1, 'possible': 2}})
+
+            response = block.student_view_user_state(Request.blank('/'))
+            self.assertEqual(response.json, {
+                'score': {'earned': 1, 'possible': 2},
+                'child_blocks': {'usage_id_problem': {'score': {'earned': 1, 'possible': 2}}},
+            })
+        self.assertEqual(self.runtime_mock.get_block.call_count, 2)
+
+        # The children aren't scored for other keys
+        response = block.student_view_user_state(Request.blank('/?fields=other'))
+        self.assertEqual(response.json, {})
+        self.assertEqual(self.runtime_mock.get_block.call_count, 2)
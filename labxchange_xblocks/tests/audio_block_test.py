@@ -4,8 +4,12 @@ Audio block tests
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import json
+
 import ddt
+from webob import Request
 from xblock.field_data import DictFieldData
+from xblock.fields import ScopeIds
 
 from labxchange_xblocks.audio_block import AudioBlock
 from labxchange_xblocks.tests.utils import BlockTestCaseBase
@@ -95,10 +99,7 @@ class AudioBlockTestCase(BlockTestCaseBase):
                 {'lang': 'en', 'language': {'name': 'English', 'native_name': 'English'}},
             ],
             'transcripts': {
-                'en': {
-                    'type': 'inlinehtml',
-                    'content': '<p>Welcome to the show</p>',
-                },
+                'en': 'transcript/lang=en',
             },
             'user_state': {'current_language': 'en'},
         }
@@ -107,6 +108,163 @@ class AudioBlockTestCase(BlockTestCaseBase):
         data = block.student_view_data(None)
         assert data == expected_data
 
+    def test_student_view_user_state_fields(self):
+        """
+        Tests that only the requested fields are returned, and the transcripts are skipped.
+        """
+        field_data = {
+            'display_name': 'A very cool track',
+            'transcripts': {'en': {'type': 'inlinehtml', 'content': '<p>Welcome to the show</p>'}},
+        }
+        block = self._construct_xblock_mock(self.block_class, self.keys, field_data=DictFieldData(field_data))
+
+        response = block.student_view_user_state(Request.blank('/?fields=display_name,user_state'))
+        assert response.json == {
+            'display_name': 'A very cool track',
+            'user_state': {'current_language': 'en'},
+        }
+
+        response = block.student_view_user_state(Request.blank('/'))
+        assert response.json['transcripts'] == {'en': 'transcript/lang=en'}
+
+    def test_transcript_urls_per_learner(self):
+        """
+        Tests that transcript URLs, which can be specific to the learner, aren't shared between learners.
+        """
+        field_data = {'transcripts': {'en': {'type': 'inlinehtml', 'content': '<p>Welcome to the show</p>'}}}
+        self.runtime_mock.handler_url = lambda block, handler, query: f'{block.scope_ids.user_id}/{handler}/{query}'
+
+        for user_id in ('first_user', 'second_user'):
+            block = self._construct_xblock_mock(
+                self.block_class,
+                ScopeIds(user_id, self.block_type, 'def_id', 'usage_id'),
+                field_data=DictFieldData(field_data),
+            )
+            expected_transcripts = {'en': f'{user_id}/transcript/lang=en'}
+            response = block.student_view_user_state(Request.blank('/'))
+            assert response.json['transcripts'] == expected_transcripts
+            response = block.v1_student_view_data(Request.blank('/'))
+            assert response.json['transcripts'] == expected_transcripts
+
+    @ddt.data(
+        (None, 'en'),
+        ('fr-FR,fr;q=0.9,en;q=0.8', 'fr'),
+        ('de-DE', 'en'),
+        ('*', 'en'),
+    )
+    @ddt.unpack
+    def test_accept_language(self, accept_language, expected_language):
+        """
+        Tests that the current language is negotiated from the Accept-Language header.
+        """
+        field_data = {
+            'transcripts': {
+                'en': {'type': 'inlinehtml', 'content': '<p>Welcome to the show</p>'},
+                'fr': {'type': 'inlinehtml', 'content': '<p>Bienvenue</p>'},
+            },
+        }
+        block = self._construct_xblock_mock(self.block_class, self.keys, field_data=DictFieldData(field_data))
+        request = Request.blank('/?fields=user_state')
+        if accept_language:
+            request.headers['Accept-Language'] = accept_language
+
+        response = block.student_view_user_state(request)
+        assert response.json == {'user_state': {'current_language': expected_language}}
+        assert response.headers['Vary'] == 'Accept-Language'
+
+    def test_batch_accept_language(self):
+        """
+        Tests that batched calls negotiate the current language from the headers of the batch request.
+        """
+        field_data = {
+            'transcripts': {
+                'en': {'type': 'inlinehtml', 'content': '<p>Welcome to the show</p>'},
+                'fr': {'type': 'inlinehtml', 'content': '<p>Bienvenue</p>'},
+            },
+        }
+        block = self._construct_xblock_mock(self.block_class, self.keys, field_data=DictFieldData(field_data))
+        headers = {'Accept-Language': 'fr'}
+
+        direct = block.student_view_user_state(Request.blank('/?fields=user_state', headers=headers))
+        batched = block.batch(Request.blank(
+            '/batch?fields=user_state',
+            method='POST',
+            body=json.dumps([['student_view_user_state', '', None]]).encode('utf-8'),
+            headers=headers,
+        ))
+
+        assert direct.json == {'user_state': {'current_language': 'fr'}}
+        assert batched.json == [{'status': 200, 'body': direct.json}]
+
+    def test_regional_transcript_options(self):
+        """
+        Tests that transcripts in regional variants get the name of their base language.
+        """
+        field_data = {
+            'transcripts': {
+                'pt-BR': {'type': 'inlinehtml', 'content': '<p>Bem-vindo</p>'},
+                'en-US': {'type': 'inlinehtml', 'content': '<p>Welcome</p>'},
+            },
+        }
+        block = self._construct_xblock_mock(self.block_class, self.keys, field_data=DictFieldData(field_data))
+
+        response = block.student_view_user_state(Request.blank('/?fields=options'))
+        assert 'Vary' not in response.headers
+        assert response.json == {
+            'options': [
+                {'lang': 'pt-BR', 'language': {'name': 'Portuguese', 'native_name': 'Português'}},
+                {'lang': 'en-US', 'language': {'name': 'English', 'native_name': 'English'}},
+            ],
+        }
+
+    @ddt.data(
+        ('/?lang=fr', {}, 200, 'fr', '<p>Bienvenue</p>'),
+        ('/?lang=fr-CA', {}, 200, 'fr', '<p>Bienvenue</p>'),
+        ('/', {'Accept-Language': 'fr-FR,en;q=0.5'}, 200, 'fr', '<p>Bienvenue</p>'),
+        ('/', {}, 200, 'en', '<p>Welcome to the show</p>'),
+        ('/?lang=de', {}, 404, None, ''),
+        ('/?lang=es', {}, 404, None, ''),
+    )
+    @ddt.unpack
+    def test_transcript(self, url, headers, expected_status, expected_language, expected_body):
+        """
+        Tests that a single transcript is returned, with caching headers.
+        """
+        field_data = {
+            'transcripts': {
+                'en': {'type': 'inlinehtml', 'content': '<p>Welcome to the show</p>'},
+                'fr': {'type': 'inlinehtml', 'content': '<p>Bienvenue</p>'},
+                'es': {'type': 'srt', 'content': ''},
+            },
+        }
+        block = self._construct_xblock_mock(self.block_class, self.keys, field_data=DictFieldData(field_data))
+
+        response = block.transcript(Request.blank(url, headers=headers))
+
+        assert response.status_code == expected_status
+        assert response.text == expected_body
+        if expected_status == 200:
+            assert response.headers['Content-Language'] == expected_language
+            assert response.content_type == 'text/html'
+            assert response.cache_control.max_age == 300
+            assert response.etag
+
+            cached_response = block.transcript(Request.blank(url, headers=dict(headers, **{
+                'If-None-Match': f'"{response.etag}"',
+            })))
+            assert cached_response.status_code == 304
+            assert cached_response.etag == response.etag
+
+    def test_offline_bundle_files(self):
+        field_data = {
+            'transcripts': {
+                'en': {'type': 'inlinehtml', 'content': '<p>Welcome to the show</p>'},
+                'fr': {'type': 'other'},
+            },
+        }
+        block = self._construct_xblock_mock(self.block_class, self.keys, field_data=DictFieldData(field_data))
+        assert block.offline_bundle_files() == [('transcripts/en.html', b'<p>Welcome to the show</p>')]
+
 
 class MockAsset:
     def __init__(self, url):
@@ -0,0 +1,80 @@
+"""
+Cache tests
+"""
+from unittest import TestCase
+
+import mock
+
+from labxchange_xblocks.cache import LRUCache
+
+
+class LRUCacheTestCase(TestCase):
+    """
+    LRU cache test case
+    """
+
+    def test_get_set(self):
+        cache = LRUCache()
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.get("key", "default"), "default")
+
+        cache.set("key", "value")
+        self.assertEqual(cache.get("key"), "value")
+
+        cache.delete("key")
+        self.assertIsNone(cache.get("key"))
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_ttl(self):
+        cache = LRUCache(ttl=10)
+        with mock.patch("labxchange_xblocks.cache.time.monotonic", return_value=100):
+            cache.set("key", "value")
+        with mock.patch("labxchange_xblocks.cache.time.monotonic", return_value=109):
+            self.assertEqual(cache.get("key"), "value")
+        with mock.patch("labxchange_xblocks.cache.time.monotonic", return_value=110):
+            self.assertIsNone(cache.get("key"))
+        self.assertEqual(len(cache), 0)
+
+    def test_max_bytes(self):
+        cache = LRUCache(max_bytes=10)
+        cache.set("a", b"1234")
+        cache.set("b", b"5678")
+        cache.get("a")
+        cache.set("c", b"90ab")
+
+        self.assertEqual(cache.get("a"), b"1234")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), b"90ab")
+        self.assertEqual(cache.total_bytes, 8)
+
+        # Values larger than the cache aren't cached
+        cache.set("d", b"x" * 11)
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(len(cache), 2)
+
+        cache.set("a", b"12")
+        cache.delete("c")
+        self.assertEqual(cache.total_bytes, 2)
+        cache.clear()
+        self.assertEqual(cache.total_bytes, 0)
+
+    def test_sizeof(self):
+        cache = LRUCache(max_bytes=10, sizeof=lambda value: sum(len(item) for item in value))
+        cache.set("a", (b"12", b"34"))
+        cache.set("b", (b"5678", b"90"))
+        self.assertEqual(cache.total_bytes, 10)
+
+        cache.set("c", (b"x",))
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.total_bytes, 7)
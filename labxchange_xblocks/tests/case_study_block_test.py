@@ -4,16 +4,25 @@ Case study block tests
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import io
+import json
+import zipfile
+
 import ddt
+import mock
+from lxml import etree
+from webob import Request
 from xblock.completable import XBlockCompletionMode
 from xblock.field_data import DictFieldData
 from xblock.fields import ScopeIds
 from xblock.test.test_parsing import XmlTest
 
-from labxchange_xblocks.case_study_block import CaseStudyBlock
+from labxchange_xblocks.case_study_block import SECTIONS_FORMAT_VERSION, CaseStudyBlock, normalize_sections
+from labxchange_xblocks.delta import apply_delta
 from labxchange_xblocks.document_block import DocumentBlock
 from labxchange_xblocks.image_block import ImageBlock
-from labxchange_xblocks.tests.utils import BlockTestCaseBase
+from labxchange_xblocks.tests.utils import BlockTestCaseBase, PublishedDefinitionKey
+from labxchange_xblocks.utils import PROCESSED_HTML_CACHE_TTL, offline_bundle_cache, student_view_data_history
 
 
 @ddt.ddt
@@ -314,3 +323,405 @@ class CaseStudyBlockTestCase(XmlTest, BlockTestCaseBase):
                 "attachments": ["usage_id_image"],
             },
         )
+
+    def test_normalize_sections(self):
+        self.assertEqual(
+            normalize_sections([
+                {
+                    "title": "Section One",
+                    "children": [
+                        {"inlinehtml": "<span>hello</span>", "extra": "dropped"},
+                        {"inlinehtml": ["ignore", "this"]},
+                        {"usage_id": "lx_image"},
+                        {"usage_id": "lx_document", "embed": False},
+                        {"usage_id": ""},
+                        "not a child",
+                    ],
+                },
+                {"children": None},
+                "not a section",
+            ]),
+            [
+                {
+                    "title": "Section One",
+                    "children": [
+                        {"inlinehtml": "<span>hello</span>"},
+                        {"usage_id": "lx_image", "embed": True},
+                        {"usage_id": "lx_document", "embed": False},
+                    ],
+                },
+                {"title": "", "children": []},
+            ],
+        )
+
+    def test_save_normalizes_sections(self):
+        block = self._construct_xblock_mock(
+            self.block_class, self.keys, field_data=DictFieldData({})
+        )
+        block.sections = [
+            {"title": "Section One", "children": [{"inlinehtml": None}, {"usage_id": "lx_image"}]},
+        ]
+        block.save()
+
+        self.assertEqual(block.sections_format, SECTIONS_FORMAT_VERSION)
+        self.assertEqual(
+            block.sections,
+            [{"title": "Section One", "children": [{"usage_id": "lx_image", "embed": True}]}],
+        )
+        self.runtime_mock.save_block.assert_called_once_with(block)
+
+    def test_parse_xml_normalizes_sections(self):
+        node = etree.fromstring(
+            """<lx_case_study display_name="Imported" sections='[{"title": "One", "children": """
+            """[{"inlinehtml": "&lt;p&gt;hi&lt;/p&gt;"}, {"inlinehtml": 1}, {"usage_id": "lx_image"}]}]'/>"""
+        )
+        block = CaseStudyBlock.parse_xml(node, self.runtime_mock, self.keys)
+
+        self.assertEqual(block.display_name, "Imported")
+        self.assertEqual(block.sections_format, SECTIONS_FORMAT_VERSION)
+        self.assertEqual(
+            block.sections,
+            [{"title": "One", "children": [{"inlinehtml": "<p>hi</p>"}, {"usage_id": "lx_image", "embed": True}]}],
+        )
+
+    def test_student_view_data_normalized_sections(self):
+        sections = [
+            {"title": "Section One", "children": [
+                {"inlinehtml": "<span>hello</span>"},
+                {"usage_id": "lx_image", "embed": True},
+                {"usage_id": "NOTFOUNDINVALID", "embed": True},
+                {"usage_id": "pathway-1", "embed": False},
+            ]},
+        ]
+        block = self._construct_xblock_mock(
+            self.block_class,
+            self.keys,
+            field_data=DictFieldData({"sections": sections, "sections_format": SECTIONS_FORMAT_VERSION}),
+        )
+        image_block = ImageBlock(
+            self.runtime_mock,
+            scope_ids=ScopeIds("a_user", "lx_image", "def_id_image", "usage_id_image"),
+            field_data=DictFieldData({}),
+        )
+        block.children.append("lx_image")
+        self.runtime_mock.get_block.side_effect = lambda usage_id, **kwargs: image_block
+
+        data = block.student_view_data(context=None)
+
+        self.assertEqual(
+            data["sections"],
+            [{"title": "Section One", "children": [
+                {"inlinehtml": "<span>hello</span>"},
+                {"usage_id": "usage_id_image", "embed": True},
+                {"usage_id": "pathway-1", "embed": False},
+            ]}],
+        )
+
+    def _block_with_sections(self, keys=None):
+        """
+        Return a case study block with two sections and an image and a document child.
+        """
+        block = self._construct_xblock_mock(
+            self.block_class,
+            keys or self.keys,
+            field_data=DictFieldData({
+                "display_name": "Case Study 5",
+                "sections": [
+                    {"title": "Section One", "children": [
+                        {"inlinehtml": "<span>hello</span>"},
+                        {"usage_id": "lx_image", "embed": True},
+                    ]},
+                    {"title": "Section Two", "children": [
+                        {"usage_id": "lx_document", "embed": True},
+                        {"usage_id": "pathway-1", "embed": False},
+                    ]},
+                ],
+            }),
+        )
+        blocks = {
+            "lx_document": DocumentBlock(
+                self.runtime_mock,
+                scope_ids=ScopeIds("a_user", "lx_document", "def_id_document", "usage_id_document"),
+                field_data=DictFieldData({"display_name": "CS Document", }),
+            ),
+            "lx_image": ImageBlock(
+                self.runtime_mock,
+                scope_ids=ScopeIds("a_user", "lx_image", "def_id_image", "usage_id_image"),
+                field_data=DictFieldData({"display_name": "CS Image", }),
+            ),
+        }
+        block.children.extend(blocks)
+        self.runtime_mock.get_block.side_effect = lambda usage_id, **kwargs: blocks.get(usage_id)
+        return block
+
+    def test_section_outline(self):
+        block = self._block_with_sections()
+
+        response = block.v1_section_outline(mock.Mock(url=''))
+
+        self.assertEqual(
+            json.loads(response.body.decode("utf-8")),
+            {
+                "display_name": "Case Study 5",
+                "sections": [
+                    {"title": "Section One", "child_ids": ["lx_image"]},
+                    {"title": "Section Two", "child_ids": ["lx_document", "pathway-1"]},
+                ],
+            },
+        )
+        self.runtime_mock.get_block.assert_not_called()
+
+    def test_section_data(self):
+        block = self._block_with_sections()
+
+        response = block.v1_section_data(mock.Mock(url=''), "1")
+
+        self.assertEqual(
+            json.loads(response.body.decode("utf-8")),
+            {
+                "title": "Section Two",
+                "children": [
+                    {"usage_id": "usage_id_document", "embed": True},
+                    {"usage_id": "pathway-1", "embed": False},
+                ],
+                "child_blocks": [
+                    {"block_type": "lx_document", "display_name": "CS Document", "usage_id": "usage_id_document"},
+                ],
+            },
+        )
+        # Only the children of the requested section are loaded
+        self.assertEqual(
+            [call.args[0] for call in self.runtime_mock.get_block.call_args_list],
+            ["lx_document"],
+        )
+
+    @ddt.data("2", "-1", "one", None)
+    def test_section_data_not_found(self, suffix):
+        block = self._block_with_sections()
+
+        response = block.v1_section_data(mock.Mock(url=''), suffix)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_student_view_data_uses_child_metadata_index(self):
+        keys = self.keys._replace(def_id=PublishedDefinitionKey("def_id"))
+        block = self._block_with_sections(keys)
+        block.student_view_data(context=None)
+        self.assertEqual(self.runtime_mock.get_block.call_count, 2)
+
+        other_block = self._construct_xblock_mock(
+            self.block_class, keys, field_data=DictFieldData({"display_name": "Case Study 6"})
+        )
+        other_block.children.extend(["lx_image", "lx_document"])
+        data = other_block.student_view_data(context=None)
+
+        # Children already loaded once for this published version are read from the index
+        self.assertEqual(self.runtime_mock.get_block.call_count, 2)
+        self.assertEqual(
+            data["child_blocks"],
+            [
+                {"block_type": "lx_image", "display_name": "CS Image", "usage_id": "usage_id_image"},
+                {"block_type": "lx_document", "display_name": "CS Document", "usage_id": "usage_id_document"},
+            ],
+        )
+
+        # Another version can have other children
+        self._block_with_sections(keys._replace(def_id=PublishedDefinitionKey("def_id_v2"))).student_view_data()
+        self.assertEqual(self.runtime_mock.get_block.call_count, 4)
+
+    def test_student_view_data_unpublished_children(self):
+        block = self._block_with_sections()
+        block.content_version()
+        block.student_view_data(context=None)
+
+        # Children of unpublished content are loaded once per instance
+        self.assertEqual(self.runtime_mock.get_block.call_count, 2)
+        self._block_with_sections().student_view_data(context=None)
+        self.assertEqual(self.runtime_mock.get_block.call_count, 4)
+
+    def test_student_view_data_fields(self):
+        block = self._block_with_sections()
+
+        data = block.student_view_data(context={"fields": frozenset(["display_name"])})
+        self.assertEqual(data, {"display_name": "Case Study 5"})
+        self.runtime_mock.get_block.assert_not_called()
+
+        data = block.student_view_data(context={"fields": frozenset(["child_blocks"])})
+        self.assertNotIn("sections", data)
+        self.assertEqual(len(data["child_blocks"]), 2)
+
+    def test_student_view_data_handler_fields(self):
+        block = self._block_with_sections()
+
+        response = block.v1_student_view_data(Request.blank("/?fields=display_name"))
+        self.assertEqual(response.json, {"display_name": "Case Study 5"})
+        # Neither the data nor its version depend on the children
+        self.runtime_mock.get_block.assert_not_called()
+
+        response = block.v1_student_view_data(Request.blank("/?fields=child_blocks"))
+        self.assertEqual(len(response.json["child_blocks"]), 2)
+        self.assertTrue(self.runtime_mock.get_block.called)
+
+    def test_offline_bundle(self):
+        block = self._block_with_sections()
+
+        response = block.v1_offline_bundle(Request.blank("/"))
+        self.assertEqual(response.content_type, "application/zip")
+        etag = response.etag
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.app_iter))) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            self.assertEqual(
+                [(entry["usage_id"], entry["block_type"]) for entry in manifest["blocks"]],
+                [("usage_id", "lx_case_study"), ("usage_id_document", "lx_document"), ("usage_id_image", "lx_image")],
+            )
+            self.assertEqual(manifest["version"], etag)
+            self.assertEqual(
+                json.loads(archive.read("usage_id_image/student_view_data.json"))["display_name"],
+                "CS Image",
+            )
+            self.assertEqual(
+                json.loads(archive.read("usage_id/student_view_data.json")),
+                block.student_view_data(),
+            )
+
+        # The archive is cached per version
+        with mock.patch.object(CaseStudyBlock, "student_view_data") as student_view_data:
+            response = block.v1_offline_bundle(Request.blank("/"))
+            self.assertTrue(zipfile.ZipFile(io.BytesIO(response.body)).testzip() is None)
+        student_view_data.assert_not_called()
+
+        response = block.v1_offline_bundle(Request.blank("/", headers={"If-None-Match": f'"{etag}"'}))
+        self.assertEqual(response.status_code, 304)
+
+    def test_offline_bundle_too_large_to_cache(self):
+        block = self._block_with_sections()
+
+        with mock.patch.object(offline_bundle_cache, "max_bytes", 100):
+            body = b"".join(block.v1_offline_bundle(Request.blank("/")).app_iter)
+            self.assertGreater(len(body), 100)
+            self.assertEqual(len(offline_bundle_cache), 0)
+
+            with mock.patch.object(CaseStudyBlock, "student_view_data", return_value={}) as student_view_data:
+                b"".join(block.v1_offline_bundle(Request.blank("/")).app_iter)
+            student_view_data.assert_called_once()
+
+    def test_student_view_data_since(self):
+        block = self._block_with_sections()
+        response = block.v1_student_view_data(Request.blank("/"))
+        old_version, old_data = response.etag, response.json
+
+        block.sections = [
+            block.sections[0],
+            {"title": "Section Two renamed", "children": block.sections[1]["children"]},
+        ]
+        response = block.v1_student_view_data(Request.blank(f"/?since={old_version}"))
+        self.assertEqual(response.status_code, 226)
+        self.assertEqual(response.headers["IM"], "labxchange-delta")
+        self.assertEqual(list(response.json["lists"]), ["sections"])
+        self.assertEqual(apply_delta(old_data, response.json), block.student_view_data())
+        new_version = response.etag
+
+        # Full data for unknown versions, nothing for the current version
+        response = block.v1_student_view_data(Request.blank("/?since=unknown"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, block.student_view_data())
+        response = block.v1_student_view_data(Request.blank(f"/?since={new_version}"))
+        self.assertEqual(response.status_code, 304)
+
+    def test_student_view_data_history_bytes(self):
+        block = self._block_with_sections()
+        old_body = block.v1_student_view_data(Request.blank("/")).body
+        old_version = block.content_version()
+        self.assertEqual(student_view_data_history.total_bytes, len(old_body))
+
+        block.display_name = "Renamed"
+        new_body = block.v1_student_view_data(Request.blank("/")).body
+        self.assertEqual(student_view_data_history.total_bytes, len(old_body) + len(new_body))
+
+        # The history of a block doesn't fit, so deltas can't be computed
+        student_view_data_history.clear()
+        with mock.patch.object(student_view_data_history, "max_bytes", len(old_body) + len(new_body) - 1):
+            block.display_name = "Case Study 5"
+            block.v1_student_view_data(Request.blank("/"))
+            self.assertEqual(block.content_version(), old_version)
+            block.display_name = "Renamed"
+            response = block.v1_student_view_data(Request.blank(f"/?since={old_version}"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(student_view_data_history.total_bytes, 0)
+
+    def test_student_view_data_processes_inline_html(self):
+        block = self._construct_xblock_mock(
+            self.block_class,
+            self.keys,
+            field_data=DictFieldData({
+                "sections": [
+                    {"title": "Section One", "children": [
+                        {"inlinehtml": '\n<p>\n  Hello  <img src="/static/a.png">\n</p><!-- draft -->\n'},
+                    ]},
+                ],
+            }),
+        )
+        self.runtime_mock.replace_urls = mock.Mock(
+            side_effect=lambda html_str: html_str.replace('/static/', 'https://cdn.none/')
+        )
+
+        data = block.student_view_data(context=None)
+        block.student_view_data(context=None)
+
+        self.assertEqual(
+            data["sections"][0]["children"],
+            [{"inlinehtml": '<p> Hello <img src="https://cdn.none/a.png"> </p>'}],
+        )
+        # The inline html of drafts is processed once per block instance
+        self.assertEqual(self.runtime_mock.replace_urls.call_count, 1)
+
+    def test_published_inline_html_cache(self):
+        field_data = {"sections": [{"title": "Section One", "children": [{"inlinehtml": '<img src="/static/a.png">'}]}]}
+        self.runtime_mock.replace_urls = mock.Mock(
+            side_effect=lambda html_str: html_str.replace('/static/', 'https://cdn.none/')
+        )
+
+        def student_view_data(def_id):
+            block = self._construct_xblock_mock(
+                self.block_class, self.keys._replace(def_id=def_id), field_data=DictFieldData(field_data),
+            )
+            return block.student_view_data(context=None)["sections"][0]["children"]
+
+        expected = [{"inlinehtml": '<img src="https://cdn.none/a.png">'}]
+        with mock.patch("labxchange_xblocks.cache.time.monotonic", return_value=100):
+            self.assertEqual(student_view_data(PublishedDefinitionKey("def_id")), expected)
+            self.assertEqual(student_view_data(PublishedDefinitionKey("def_id")), expected)
+            self.assertEqual(self.runtime_mock.replace_urls.call_count, 1)
+
+            # Drafts aren't cached between instances
+            student_view_data("def_id")
+            student_view_data("def_id")
+            self.assertEqual(self.runtime_mock.replace_urls.call_count, 3)
+
+        # The expanded URLs may expire, so they are expanded again after a while
+        with mock.patch("labxchange_xblocks.cache.time.monotonic", return_value=100 + PROCESSED_HTML_CACHE_TTL):
+            self.assertEqual(student_view_data(PublishedDefinitionKey("def_id")), expected)
+            self.assertEqual(self.runtime_mock.replace_urls.call_count, 4)
+
+    def test_content_version_covers_children(self):
+        version = self._block_with_sections().content_version()
+
+        self.assertEqual(self._block_with_sections().content_version(), version)
+
+        # A child renamed in a draft changes the version on the next request
+        block = self._block_with_sections()
+        renamed_image_block = ImageBlock(
+            self.runtime_mock,
+            scope_ids=ScopeIds("a_user", "lx_image", "def_id_image", "usage_id_image"),
+            field_data=DictFieldData({"display_name": "CS Image renamed", }),
+        )
+        self.runtime_mock.get_block.side_effect = lambda usage_id, **kwargs: renamed_image_block
+        self.assertNotEqual(block.content_version(), version)
+
+    def test_content_version_published_children(self):
+        block = self._block_with_sections(self.keys._replace(def_id=PublishedDefinitionKey("def_id")))
+
+        block.content_version()
+
+        # The published definition pins the version of the children
+        self.runtime_mock.get_block.assert_not_called()
@@ -0,0 +1,116 @@
+"""
+Tests of the interned block content
+"""
+import copy
+import json
+import pickle
+from unittest import TestCase
+
+from webob import Request
+from xblock.field_data import DictFieldData
+from xblock.fields import ScopeIds
+
+from labxchange_xblocks.content import FrozenDict, FrozenList, QuestionContent, freeze
+from labxchange_xblocks.question_block import QuestionBlock
+from labxchange_xblocks.tests.utils import BlockTestCaseBase
+
+QUESTION_DATA = {
+    'type': 'stringresponse',
+    'question': 'The answer is correct.',
+    'answers': ['correct'],
+    'comments': {'wrong': 'Not quite.'},
+}
+
+
+class FreezeTestCase(TestCase):
+    """
+    Tests of freeze
+    """
+
+    def test_freeze(self):
+        value = {'list': [{'a': 1}], 'string': 'text'}
+        frozen = freeze(value)
+
+        self.assertIsInstance(frozen, FrozenDict)
+        self.assertIsInstance(frozen['list'], FrozenList)
+        self.assertIsInstance(frozen['list'][0], FrozenDict)
+        self.assertEqual(frozen, value)
+        self.assertEqual(json.loads(json.dumps(frozen)), value)
+        self.assertIs(freeze(frozen), frozen)
+
+    def test_read_only(self):
+        frozen = freeze({'list': [1, 2]})
+
+        for change in (
+            lambda: frozen.__setitem__('key', 'value'),
+            lambda: frozen.update({'key': 'value'}),
+            lambda: frozen.pop('list'),
+            lambda: frozen['list'].append(3),
+            lambda: frozen['list'].sort(),
+        ):
+            with self.assertRaises(TypeError):
+                change()
+
+    def test_copies(self):
+        frozen = freeze({'list': [1, 2]})
+
+        self.assertIs(copy.deepcopy(frozen), frozen)
+        self.assertEqual(pickle.loads(pickle.dumps(frozen)), frozen)
+        # Shallow copies are mutable
+        mutable = frozen.copy()
+        mutable['key'] = 'value'
+        self.assertNotIn('key', frozen)
+
+
+class QuestionContentTestCase(BlockTestCaseBase):
+    """
+    Tests of the interning of QuestionBlock content
+    """
+    block_type = 'lx_question'
+    block_class = QuestionBlock
+
+    def _question_block(self, user_id='a_user', **fields):
+        field_data = dict({'question_data': QUESTION_DATA, 'hints': [{'content': 'A hint'}]}, **fields)
+        return self._construct_xblock_mock(
+            QuestionBlock,
+            ScopeIds(user_id, 'lx_question', 'def_id', 'usage_id'),
+            field_data=DictFieldData(field_data),
+        )
+
+    def test_shared_by_instances(self):
+        first_block = self._question_block('first_user')
+        second_block = self._question_block('second_user')
+
+        content = QuestionContent.for_block(first_block)
+
+        self.assertIs(QuestionContent.for_block(second_block), content)
+        self.assertEqual(content.question_data, QUESTION_DATA)
+        self.assertEqual(content.hints, [{'content': 'A hint'}])
+        with self.assertRaises(AttributeError):
+            content.hints = []
+
+    def test_different_content(self):
+        block = self._question_block()
+        other_block = self._question_block(question_data=dict(QUESTION_DATA, answers=['other']))
+
+        self.assertIsNot(QuestionContent.for_block(other_block), QuestionContent.for_block(block))
+
+    def test_field_assignment(self):
+        block = self._question_block()
+        content = QuestionContent.for_block(block)
+
+        block.question_data = dict(QUESTION_DATA, question='Changed')
+
+        self.assertIsNot(QuestionContent.for_block(block), content)
+        self.assertEqual(QuestionContent.for_block(block).question_data['question'], 'Changed')
+
+    def test_no_copy_per_instance(self):
+        block = self._question_block()
+
+        response = block.student_view_user_state(Request.blank('/'))
+
+        self.assertEqual(response.status_code, 200)
+        # pylint: disable=protected-access
+        self.assertNotIn('question_data', block._field_data_cache)
+        self.assertNotIn('hints', block._field_data_cache)
+        self.assertFalse(block._get_fields_to_save())
@@ -0,0 +1,84 @@
+"""
+Tests of the student view data deltas
+"""
+from unittest import TestCase
+
+import ddt
+
+from labxchange_xblocks.delta import apply_delta, diff_lists, diff_student_view_data
+
+OLD_DATA = {
+    "display_name": "Case Study",
+    "video_poster": "poster.png",
+    "sections": [
+        {"title": "Section 1", "children": [{"inlinehtml": "<p>One</p>"}]},
+        {"title": "Section 2", "children": []},
+        {"title": "Section 3", "children": []},
+    ],
+    "child_blocks": [
+        {"usage_id": "a", "display_name": "A"},
+        {"usage_id": "b", "display_name": "B"},
+    ],
+    "annotations": [
+        {"id": "1", "title": "One"},
+    ],
+    "attachments": ["a"],
+}
+
+
+@ddt.ddt
+class DeltaTestCase(TestCase):
+    """
+    Tests of diff_student_view_data and apply_delta
+    """
+
+    @ddt.data(
+        {},
+        {"display_name": "Renamed case study"},
+        {"sections": OLD_DATA["sections"][:1]},
+        {"sections": OLD_DATA["sections"] + [{"title": "Section 4", "children": []}]},
+        {"sections": [{"title": "Section 1", "children": []}] + OLD_DATA["sections"][1:]},
+        {"child_blocks": [{"usage_id": "c", "display_name": "C"}, {"usage_id": "b", "display_name": "B2"}]},
+        {"child_blocks": [{"usage_id": "a", "display_name": "A"}, {"usage_id": "a", "display_name": "A"}]},
+        {"annotations": [{"id": "2", "title": "Two"}, {"id": "1", "title": "One"}]},
+        {"attachments": ["a", "b"], "video_poster": None},
+        {"new_key": [1, 2]},
+    )
+    def test_round_trip(self, changes):
+        new_data = dict(OLD_DATA, **changes)
+        delta = diff_student_view_data(OLD_DATA, new_data)
+        self.assertEqual(apply_delta(OLD_DATA, delta), new_data)
+
+    def test_unset(self):
+        new_data = dict(OLD_DATA)
+        del new_data["video_poster"]
+        delta = diff_student_view_data(OLD_DATA, new_data)
+        self.assertEqual(delta, {"set": {}, "unset": ["video_poster"], "lists": {}})
+        self.assertEqual(apply_delta(OLD_DATA, delta), new_data)
+
+    def test_diff_lists_by_id(self):
+        old = OLD_DATA["child_blocks"]
+        new = [{"usage_id": "b", "display_name": "B2"}, {"usage_id": "c", "display_name": "C"}]
+        self.assertEqual(
+            diff_lists(old, new),
+            {
+                "id_key": "usage_id",
+                "added": [{"usage_id": "c", "display_name": "C"}],
+                "removed": ["a"],
+                "changed": [{"usage_id": "b", "display_name": "B2"}],
+                "order": ["b", "c"],
+            },
+        )
+
+    def test_diff_lists_by_index(self):
+        old = OLD_DATA["sections"]
+        new = [old[0], {"title": "Section 2 renamed", "children": []}]
+        self.assertEqual(
+            diff_lists(old, new),
+            {
+                "added": [],
+                "removed": [2],
+                "changed": {"1": {"title": "Section 2 renamed", "children": []}},
+            },
+        )
+        self.assertIsNone(diff_lists(old, list(old)))
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Html block tests
+"""
+import ddt
+from lxml import etree
+
+from labxchange_xblocks.html_block import HtmlBlock, inner_html_from_olx
+from labxchange_xblocks.tests.utils import BlockTestCaseBase
+
+
+@ddt.ddt
+class HtmlBlockTestCase(BlockTestCaseBase):
+    """
+    Html block test case
+    """
+    block_type = 'lx_html'
+    block_class = HtmlBlock
+
+    olx_data = (
+        (
+            '<html display_name="Intro"><p>One <b>two</b></p>\n<p>Three</p></html>',
+            '<p>One <b>two</b></p>\n<p>Three</p>',
+        ),
+        (
+            '<html display_name="Intro"><![CDATA[<p>One</p><p>Two</p>]]></html>',
+            '<p>One</p><p>Two</p>',
+        ),
+        (
+            '<html display_name="Intro">\n  <![CDATA[<p>One</p>]]>\n</html>',
+            '\n  <p>One</p>\n',
+        ),
+        (
+            '<?xml version="1.0"?>\n<!-- exported --><html display_name="Intro">Text <i>only</i></html>\n',
+            'Text <i>only</i>',
+        ),
+        (
+            '<html display_name="Intro"/>',
+            '',
+        ),
+    )
+
+    def _parse(self, olx, runtime_source=None):
+        if runtime_source is not None:
+            self.runtime_mock.get_olx_source = lambda keys: runtime_source
+        return HtmlBlock.parse_xml(etree.fromstring(olx.encode('utf-8')), self.runtime_mock, self.keys)
+
+    @ddt.data(*olx_data)
+    @ddt.unpack
+    def test_parse_xml(self, olx, expected_data):
+        block = self._parse(olx)
+
+        self.assertEqual(block.display_name, 'Intro')
+        self.assertEqual(block.data, expected_data)
+
+    @ddt.data(*olx_data)
+    @ddt.unpack
+    def test_parse_xml_from_olx_source(self, olx, expected_data):
+        block = self._parse(olx, runtime_source=olx)
+
+        self.assertEqual(block.display_name, 'Intro')
+        self.assertEqual(block.data, expected_data)
+
+    def test_parse_xml_from_olx_source_keeps_source_markup(self):
+        olx = "<html><p class='a'>x &amp; y<br></br></p></html>"
+
+        self.assertEqual(self._parse(olx).data, '<p class="a">x &amp; y<br/></p>')
+        self.assertEqual(self._parse(olx, runtime_source=olx).data, "<p class='a'>x &amp; y<br></br></p>")
+
+    @ddt.data(
+        '<html>Tom &amp; Jerry &lt;script&gt; <b>and</b> Tom &amp; Jerry</html>',
+        '<html>Tom &#38; Jerry</html>',
+        '<html xmlns:m="http://www.w3.org/1998/Math/MathML"><p>x</p><m:math><m:mi>x</m:mi></m:math></html>',
+        '<html><m:math xmlns:m="http://www.w3.org/1998/Math/MathML"><m:mi>x</m:mi></m:math></html>',
+        '<html>One<!-- two -->three</html>',
+    )
+    def test_parse_xml_from_olx_source_same_data(self, olx):
+        self.assertEqual(self._parse(olx, runtime_source=olx).data, self._parse(olx).data)
+
+    @ddt.data(
+        '<problem><p>Other block</p></problem>',
+        '<html><![CDATA[<p>One</p>]]><p>Two</p></html>',
+        '',
+        None,
+    )
+    def test_parse_xml_falls_back_to_nodes(self, runtime_source):
+        olx = '<html><p>One</p><p>Two</p></html>'
+        self.assertIsNone(inner_html_from_olx(runtime_source, 'html'))
+
+        block = self._parse(olx, runtime_source=runtime_source)
+
+        self.assertEqual(block.data, '<p>One</p><p>Two</p>')
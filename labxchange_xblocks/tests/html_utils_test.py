@@ -0,0 +1,38 @@
+"""
+Html post-processing tests
+"""
+from unittest import TestCase, skipUnless
+
+import ddt
+
+from labxchange_xblocks.html_utils import bleach_available, minify_html, sanitize_html
+
+
+@ddt.ddt
+class HtmlUtilsTestCase(TestCase):
+    """
+    Html post-processing test case
+    """
+
+    @ddt.data(
+        ('', ''),
+        ('<p>One</p><p>Two</p>', '<p>One</p><p>Two</p>'),
+        ('\n  <p>\n    One   two\n  </p>\n', '<p> One two </p>'),
+        ('<p>One</p><!-- editor comment --><p>Two</p>', '<p>One</p><p>Two</p>'),
+        ('<!--[if IE]><p>IE</p><![endif]-->', '<!--[if IE]><p>IE</p><![endif]-->'),
+        ('<div>\n  <pre>  keep\n    this  </pre>\n</div>', '<div> <pre>  keep\n    this  </pre> </div>'),
+        ('<PRE>a  b</PRE>  <p>c  d</p>', '<PRE>a  b</PRE> <p>c d</p>'),
+    )
+    @ddt.unpack
+    def test_minify_html(self, html_str, expected):
+        self.assertEqual(minify_html(html_str), expected)
+
+    @skipUnless(bleach_available, 'bleach is not installed')
+    def test_sanitize_html(self):
+        self.assertEqual(
+            sanitize_html(
+                '<p class="intro" onclick="steal()">Hi <script>alert(1)</script>'
+                '<img src="/static/a.png" alt="A"></p>'
+            ),
+            '<p class="intro">Hi alert(1)<img src="/static/a.png" alt="A"></p>',
+        )
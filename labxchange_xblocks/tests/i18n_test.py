@@ -0,0 +1,133 @@
+"""
+Tests of the ISO languages table
+"""
+import json
+from unittest import TestCase
+
+import ddt
+
+from labxchange_xblocks import i18n
+
+
+class LanguagesTestCase(TestCase):
+    """
+    Tests of the languages table
+    """
+
+    def test_get_language(self):
+        self.assertEqual(i18n.get_language('fr'), {'name': 'French', 'native_name': 'français, langue française'})
+        self.assertIsNone(i18n.get_language('xx'))
+        self.assertEqual(json.loads(json.dumps(i18n.get_language('en'))), {'name': 'English', 'native_name': 'English'})
+
+    def test_lazy_loading(self):
+        i18n.all_languages.cache_clear()
+        self.addCleanup(i18n.all_languages.cache_clear)
+
+        self.assertEqual(i18n.all_languages.cache_info().currsize, 0)
+        i18n.get_language('en')
+        i18n.get_language('fr')
+        self.assertEqual(i18n.all_languages.cache_info().misses, 1)
+
+    def test_all_languages(self):
+        languages = i18n.all_languages()
+
+        self.assertEqual(len(languages), 182)
+        self.assertEqual(list(languages)[:3], ['ab', 'aa', 'af'])
+        with self.assertRaises(TypeError):
+            languages['xx'] = {'name': 'Unknown', 'native_name': 'Unknown'}
+        with self.assertRaises(TypeError):
+            languages['en']['name'] = 'Changed'
+
+    def test_language_options(self):
+        options = i18n.language_options()
+
+        self.assertEqual(len(options), 182)
+        self.assertEqual(options[0], {'display_name': 'Abkhaz', 'value': 'ab'})
+        names = [option['display_name'] for option in options]
+        self.assertEqual(names, sorted(names))
+        self.assertIs(i18n.language_options(), options)
+
+    def test_iso_languages(self):
+        i18n.all_languages.cache_clear()
+        self.assertEqual(i18n.all_languages.cache_info().currsize, 0)
+        self.assertIn('fr', i18n.iso_languages)
+        self.assertEqual(i18n.all_languages.cache_info().currsize, 1)
+
+        self.assertEqual(dict(i18n.iso_languages), dict(i18n.all_languages()))
+        self.assertEqual(i18n.iso_languages['fr'], i18n.get_language('fr'))
+        self.assertEqual(len(i18n.iso_languages), 182)
+        with self.assertRaises(AttributeError):
+            i18n.unknown_attribute  # pylint: disable=pointless-statement
+
+
+@ddt.ddt
+class LanguageTagsTestCase(TestCase):
+    """
+    Tests of the BCP 47 language tag resolution
+    """
+
+    @ddt.data(
+        ('en', 'en'),
+        ('EN-us', 'en-US'),
+        ('pt_br', 'pt-BR'),
+        ('zh-hans-cn', 'zh-Hans-CN'),
+        ('es-419', 'es-419'),
+        ('de-CH-1996', 'de-CH-1996'),
+        (' fr ', 'fr'),
+        ('', None),
+        (None, None),
+    )
+    @ddt.unpack
+    def test_normalize_language_tag(self, tag, expected_tag):
+        self.assertEqual(i18n.normalize_language_tag(tag), expected_tag)
+
+    @ddt.data(
+        ('en', 'English'),
+        ('en-US', 'English'),
+        ('pt-BR', 'Portuguese'),
+        ('zh-Hans', 'Chinese'),
+        ('iw', 'Hebrew (modern)'),
+        ('xx-YY', None),
+        ('', None),
+    )
+    @ddt.unpack
+    def test_resolve_language(self, tag, expected_name):
+        language = i18n.resolve_language(tag)
+        self.assertEqual(language and language['name'], expected_name)
+
+    @ddt.data(
+        ('en', ('fr', 'en'), 'en'),
+        ('en-us', ('en-US', 'en'), 'en-US'),
+        ('en-US', ('fr', 'en'), 'en'),
+        ('en', ('en-GB', 'en-US'), 'en-GB'),
+        ('pt-PT', ('pt-BR',), 'pt-BR'),
+        ('de', ('en', 'fr'), None),
+        (None, ('en',), None),
+    )
+    @ddt.unpack
+    def test_match_language(self, tag, available_tags, expected_tag):
+        self.assertEqual(i18n.match_language(tag, available_tags), expected_tag)
+
+    def test_transcript_language_options(self):
+        options = i18n.transcript_language_options(('pt-BR', 'en', 'xx'))
+
+        self.assertEqual(options, [
+            {'lang': 'pt-BR', 'language': {'name': 'Portuguese', 'native_name': 'Português'}},
+            {'lang': 'en', 'language': {'name': 'English', 'native_name': 'English'}},
+            {'lang': 'xx', 'language': None},
+        ])
+        self.assertIs(i18n.transcript_language_options(('pt-BR', 'en', 'xx')), options)
+
+    @ddt.data(
+        ('fr-CH, fr;q=0.9, en;q=0.8, *;q=0.5', ('en', 'fr'), 'fr'),
+        ('en;q=0.5, pt-PT', ('en', 'pt-BR'), 'pt-BR'),
+        ('de, *;q=0.1', ('fr', 'en'), 'fr'),
+        ('de, en;q=0', ('en',), None),
+        ('en;q=invalid, fr;q=0.2', ('en', 'fr'), 'fr'),
+        ('', ('en',), None),
+        (None, ('en',), None),
+        ('en', (), None),
+    )
+    @ddt.unpack
+    def test_negotiate_language(self, accept_language, available_tags, expected_tag):
+        self.assertEqual(i18n.negotiate_language(accept_language, available_tags), expected_tag)
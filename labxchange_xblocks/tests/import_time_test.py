@@ -0,0 +1,85 @@
+"""
+Tests of the time it takes to import the blocks
+"""
+import os
+import re
+import subprocess
+import sys
+from unittest import TestCase, skipIf
+
+BLOCK_MODULES = (
+    'labxchange_xblocks.annotated_video_block',
+    'labxchange_xblocks.assignment_block',
+    'labxchange_xblocks.audio_block',
+    'labxchange_xblocks.case_study_block',
+    'labxchange_xblocks.document_block',
+    'labxchange_xblocks.html_block',
+    'labxchange_xblocks.image_block',
+    'labxchange_xblocks.narrative_block',
+    'labxchange_xblocks.question_block',
+    'labxchange_xblocks.simulation_block',
+    'labxchange_xblocks.video_block',
+)
+
+# Dependencies that the blocks import anyway, and aren't counted
+IMPORTED_BY_XBLOCK = ('xblock.core', 'webob', 'django.conf')
+
+# Slow to import, and only needed by some requests
+LAZY_MODULES = (
+    'pkg_resources',
+    'django.template',
+    'bleach',
+    'static_replace',
+    'openedx.core.djangolib.blockstore_cache',
+    'openedx.core.lib.blockstore_api',
+)
+
+# Time it takes to import the blocks besides `IMPORTED_BY_XBLOCK`, in seconds, with a large margin
+IMPORT_TIME_BUDGET = 0.2
+
+IMPORT_TIME_LINE_RE = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def measure_imports():
+    """
+    Import the blocks in a new interpreter, and return their import time in seconds and the imported modules.
+    """
+    code = f'import {", ".join(IMPORTED_BY_XBLOCK)}\nimport {", ".join(BLOCK_MODULES)}'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    total = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE_RE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = match.groups()
+        modules.add(module)
+        # Modules imported directly by the code, which include the modules they import
+        if not indent and module.startswith('labxchange_xblocks'):
+            total += int(cumulative)
+    return total / 1e6, modules
+
+
+class ImportTimeTestCase(TestCase):
+    """
+    Tests of the import time of the blocks
+    """
+
+    @skipIf(sys.version_info < (3, 7), '-X importtime was added in Python 3.7')
+    def test_import_time(self):
+        # The fastest of a few runs, as the machine might be busy
+        measures = [measure_imports() for _ in range(3)]
+        import_time = min(import_time for import_time, _ in measures)
+        _, modules = measures[0]
+
+        self.assertIn('labxchange_xblocks.video_block', modules)
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, modules)
+        self.assertLess(import_time, IMPORT_TIME_BUDGET)
@@ -0,0 +1,300 @@
+"""
+Tests of the handler and view metrics
+"""
+import json
+import socket
+from unittest import TestCase
+
+import mock
+from webob import Request
+from xblock.field_data import DictFieldData
+from xblock.fields import ScopeIds
+
+from labxchange_xblocks.case_study_block import CaseStudyBlock
+from labxchange_xblocks.image_block import ImageBlock
+from labxchange_xblocks.metrics import (
+    HandlerMetrics,
+    Histogram,
+    InMemoryMetricsSink,
+    NullMetricsSink,
+    StatsdMetricsSink,
+    memory_profiling_active,
+    set_metrics_sink,
+    start_memory_profiling,
+    stop_memory_profiling
+)
+from labxchange_xblocks.question_block import QuestionBlock
+from labxchange_xblocks.tests.utils import BlockTestCaseBase
+
+
+class InstrumentationTestCase(BlockTestCaseBase):
+    """
+    Tests of the instrumentation of handlers and views
+    """
+    block_type = 'lx_image'
+    block_class = ImageBlock
+
+    def setUp(self):
+        super().setUp()
+        self.sink = InMemoryMetricsSink()
+        previous_sink = set_metrics_sink(self.sink)
+        self.addCleanup(set_metrics_sink, previous_sink)
+
+    def test_handlers_and_views_are_instrumented(self):
+        for block_class, name in (
+            (ImageBlock, 'v1_student_view_data'),
+            (ImageBlock, 'student_view'),
+            (QuestionBlock, 'submit_answer'),
+            (QuestionBlock, 'student_view_user_state'),
+        ):
+            method = getattr(block_class, name)
+            self.assertTrue(method.lx_instrumented)
+            if name != 'student_view':
+                self.assertTrue(method._is_xblock_handler)  # pylint: disable=protected-access
+        self.assertFalse(hasattr(ImageBlock.student_view_data, 'lx_instrumented'))
+
+    def test_handler_metrics(self):
+        block = self._construct_xblock_mock(
+            ImageBlock, self.keys, field_data=DictFieldData({'display_name': 'Image 1'})
+        )
+
+        response = block.v1_student_view_data(Request.blank('/'))
+
+        def histogram(name):
+            return self.sink.histogram('lx_image', 'v1_student_view_data', name)
+
+        self.assertEqual(histogram('wall_time').count, 1)
+        self.assertEqual(histogram('response_size').total, len(response.body))
+        self.assertGreater(histogram('field_reads').total, 0)
+        self.assertEqual(histogram('field_writes').total, 0)
+
+    def test_field_reads(self):
+        block = self._construct_xblock_mock(
+            QuestionBlock,
+            ScopeIds('a_user', 'lx_question', 'def_id', 'usage_id'),
+            field_data=DictFieldData({
+                'display_name': 'Question',
+                'question_data': {
+                    'type': 'stringresponse',
+                    'answers': ['correct'],
+                    'question': 'The answer is correct.',
+                    'comments': {},
+                },
+            }),
+        )
+
+        block.student_view_user_state(Request.blank('/'))
+
+        # The content fields are read without going through the field descriptors, so they aren't cached
+        # in the block, and are counted on their own
+        self.assertNotIn('question_data', block._field_data_cache)  # pylint: disable=protected-access
+        field_reads = self.sink.histogram('lx_question', 'student_view_user_state', 'field_reads').total
+        self.assertGreater(field_reads, len(block._field_data_cache))  # pylint: disable=protected-access
+
+    def test_get_block_calls(self):
+        block = self._construct_xblock_mock(
+            CaseStudyBlock,
+            ScopeIds('a_user', 'lx_case_study', 'def_id', 'usage_id'),
+            field_data=DictFieldData({}),
+        )
+        children = {
+            f'image_{index}': ImageBlock(
+                self.runtime_mock,
+                scope_ids=ScopeIds('a_user', 'lx_image', f'def_image_{index}', f'image_{index}'),
+                field_data=DictFieldData({}),
+            )
+            for index in range(3)
+        }
+        block.children.extend(children)
+        self.runtime_mock.get_block.side_effect = lambda usage_id, **kwargs: children.get(usage_id)
+
+        block.v1_student_view_data(Request.blank('/'))
+
+        histogram = self.sink.histogram('lx_case_study', 'v1_student_view_data', 'get_block_calls')
+        self.assertEqual(histogram.total, self.runtime_mock.get_block.call_count)
+        self.assertEqual(histogram.total, 3)
+
+    def test_field_writes(self):
+        block = self._construct_xblock_mock(
+            QuestionBlock,
+            ScopeIds('a_user', 'lx_question', 'def_id', 'usage_id'),
+            field_data=DictFieldData({
+                'question_data': {
+                    'type': 'stringresponse',
+                    'answers': ['correct'],
+                    'question': 'The answer is correct.',
+                    'comments': {},
+                },
+            }),
+        )
+
+        response = block.submit_answer(
+            Request.blank('/', method='POST', body=json.dumps({'response': 'correct'}).encode('utf-8'))
+        )
+
+        self.assertEqual(response.status_code, 200)
+        # student_answer and student_attempts
+        self.assertEqual(self.sink.histogram('lx_question', 'submit_answer', 'field_writes').total, 2)
+
+    def test_null_sink(self):
+        set_metrics_sink(None)
+        block = self._construct_xblock_mock(ImageBlock, self.keys, field_data=DictFieldData({}))
+
+        with mock.patch.object(NullMetricsSink, 'record') as record:
+            block.v1_student_view_data(Request.blank('/'))
+
+        record.assert_not_called()
+        self.assertEqual(self.sink.histograms, {})
+
+
+class ServerTimingTestCase(BlockTestCaseBase):
+    """
+    Tests of the Server-Timing header
+    """
+    block_type = 'lx_question'
+    block_class = QuestionBlock
+
+    def _question_block(self):
+        return self._construct_xblock_mock(
+            QuestionBlock,
+            self.keys,
+            field_data=DictFieldData({
+                'question_data': {
+                    'type': 'stringresponse',
+                    'answers': ['correct'],
+                    'question': 'The answer is correct.',
+                    'comments': {},
+                },
+            }),
+        )
+
+    def test_server_timing(self):
+        block = self._question_block()
+
+        with mock.patch('labxchange_xblocks.metrics.time.perf_counter', side_effect=range(100)):
+            response = block.student_view_user_state(Request.blank('/?lx_debug_timing=1'))
+
+        timings = dict(
+            timing.split(';dur=') for timing in response.headers['Server-Timing'].split(', ')
+        )
+        self.assertEqual(list(timings), ['children', 'score', 'static', 'template', 'serialization', 'total'])
+        self.assertEqual(timings['children'], '0.00')
+        self.assertNotEqual(timings['score'], '0.00')
+        self.assertNotEqual(timings['serialization'], '0.00')
+
+    def test_no_server_timing(self):
+        block = self._question_block()
+
+        response = block.student_view_user_state(Request.blank('/'))
+
+        self.assertNotIn('Server-Timing', response.headers)
+
+
+class MemoryProfilingTestCase(BlockTestCaseBase):
+    """
+    Tests of the memory profiling of handlers and views
+    """
+    block_type = 'lx_case_study'
+    block_class = CaseStudyBlock
+
+    def setUp(self):
+        super().setUp()
+        self.profile = start_memory_profiling()
+        self.addCleanup(stop_memory_profiling)
+
+    def test_memory_profile(self):
+        block = self._construct_xblock_mock(
+            CaseStudyBlock,
+            ScopeIds('a_user', 'lx_case_study', 'def_id', 'usage_id'),
+            field_data=DictFieldData({
+                'sections': [{'title': f'Section {index}', 'children': []} for index in range(100)],
+            }),
+        )
+
+        block.v1_student_view_data(Request.blank('/'))
+        block.v1_student_view_data(Request.blank('/'))
+
+        key = ('lx_case_study', 'v1_student_view_data')
+        self.assertEqual(self.profile.calls, {key: 2})
+        self.assertGreater(self.profile.peaks[key], 0)
+        top = self.profile.top(*key, limit=3)
+        self.assertEqual(len(top), 3)
+        self.assertEqual([size for _, size, _ in top], sorted((size for _, size, _ in top), reverse=True))
+
+    def test_memory_profile_without_reset_peak(self):
+        block = self._construct_xblock_mock(
+            CaseStudyBlock,
+            ScopeIds('a_user', 'lx_case_study', 'def_id', 'usage_id'),
+            field_data=DictFieldData({
+                'sections': [{'title': f'Section {index}', 'children': []} for index in range(100)],
+            }),
+        )
+
+        with mock.patch('labxchange_xblocks.metrics.reset_peak_available', False):
+            block.v1_student_view_data(Request.blank('/'))
+
+        # The memory kept by the caches is recorded
+        self.assertGreater(self.profile.peaks[('lx_case_study', 'v1_student_view_data')], 0)
+
+    def test_stop(self):
+        self.assertTrue(memory_profiling_active())
+        self.assertIs(stop_memory_profiling(), self.profile)
+        self.assertFalse(memory_profiling_active())
+
+        block = self._construct_xblock_mock(ImageBlock, self.keys, field_data=DictFieldData({}))
+        block.v1_student_view_data(Request.blank('/'))
+
+        self.assertEqual(self.profile.calls, {})
+
+
+class HistogramTestCase(TestCase):
+    """
+    Tests of Histogram
+    """
+
+    def test_histogram(self):
+        histogram = Histogram((1, 10, 100))
+        self.assertIsNone(histogram.quantile(0.5))
+        for value in (0, 1, 5, 50, 50, 500):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.buckets, [2, 1, 2, 1])
+        self.assertEqual(histogram.count, 6)
+        self.assertEqual(histogram.total, 606)
+        self.assertEqual(histogram.quantile(0.5), 10)
+        self.assertEqual(histogram.quantile(0.8), 100)
+        self.assertIsNone(histogram.quantile(1))
+
+
+class StatsdMetricsSinkTestCase(TestCase):
+    """
+    Tests of StatsdMetricsSink, against a local UDP listener
+    """
+
+    def test_record(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(listener.close)
+        listener.bind(('127.0.0.1', 0))
+        listener.settimeout(5)
+        sink = StatsdMetricsSink(port=listener.getsockname()[1], prefix='lx')
+        self.addCleanup(sink.close)
+
+        sink.record(HandlerMetrics(
+            block_type='lx_image',
+            handler='v1_student_view_data',
+            wall_time=0.0125,
+            get_block_calls=2,
+            field_reads=3,
+            field_writes=0,
+            response_size=None,
+        ))
+
+        self.assertEqual(
+            listener.recv(4096).decode('utf-8').split('\n'),
+            [
+                'lx.lx_image.v1_student_view_data.wall_time:12.500|ms',
+                'lx.lx_image.v1_student_view_data.get_block_calls:2|h',
+                'lx.lx_image.v1_student_view_data.field_reads:3|h',
+                'lx.lx_image.v1_student_view_data.field_writes:0|h',
+            ],
+        )
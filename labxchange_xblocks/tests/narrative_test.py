@@ -85,3 +85,16 @@ class NarrativeBlockTestCase(BlockTestCaseBase):
     def test_student_view(self, field_data, _expected_data, expected_html):
         self._test_student_view(field_data, expected_html)
         self._test_public_view(field_data, expected_html)
+
+    def test_student_view_data_processes_html(self):
+        self._test_student_view_data(
+            {
+                'key_points': '<ul>\n    <li>Point one.</li>\n</ul>\n',
+                'narrative': '<!-- draft --><p>This is a   narrative.</p>',
+            },
+            {
+                'display_name': 'Narrative',
+                'key_points': '<ul> <li>Point one.</li> </ul>',
+                'narrative': '<p>This is a narrative.</p>',
+            },
+        )
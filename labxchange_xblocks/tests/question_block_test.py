@@ -10,7 +10,7 @@ import json
 import xml.etree.ElementTree as ET
 
 import ddt
-from mock import Mock
+from mock import Mock, patch
 from xblock.field_data import DictFieldData
 
 from labxchange_xblocks.question_block import (
@@ -20,7 +20,7 @@ from labxchange_xblocks.question_block import (
     parse_optionresponse_from_node,
     parse_stringresponse_from_node
 )
-from labxchange_xblocks.tests.utils import BlockTestCaseBase
+from labxchange_xblocks.tests.utils import BlockTestCaseBase, PublishedDefinitionKey
 
 
 @ddt.ddt
@@ -403,6 +403,41 @@ class QuestionBlockTestCase(BlockTestCaseBase):
         response = block.student_view_user_state(Mock())
         assert json.loads(response.body.decode("utf-8")) == expected_data
 
+    def test_student_view_user_state_caches_content(self):
+        """
+        The content-only part of the user state of published content is serialized once, and reused for other learners.
+        """
+        field_data = {
+            "max_attempts": 3,
+            "weight": 2,
+            "question_data": {
+                "type": "stringresponse",
+                "answers": ["correct"],
+                "question": "The answer is correct.",
+                "comments": {},
+            },
+        }
+        keys = self.keys._replace(def_id=PublishedDefinitionKey(self.keys.def_id))
+        block = self._construct_xblock_mock(
+            self.block_class, keys, field_data=DictFieldData(dict(field_data, student_attempts=1))
+        )
+        other_block = self._construct_xblock_mock(
+            self.block_class, keys, field_data=DictFieldData(field_data)
+        )
+
+        first = json.loads(block.student_view_user_state(Mock()).body.decode("utf-8"))
+        with patch.object(
+            self.block_class, "_student_view_content_state_data"
+        ) as content_state_data:
+            second = json.loads(other_block.student_view_user_state(Mock()).body.decode("utf-8"))
+        content_state_data.assert_not_called()
+
+        assert first["maxAttempts"] == second["maxAttempts"] == 3
+        assert first["total_possible"] == second["total_possible"] == 2
+        assert first["studentAttempts"] == 1
+        assert second["studentAttempts"] == 0
+        assert block._student_view_user_state_data() == first  # pylint: disable=protected-access
+
     def test_student_view_data(self):
         """
         Student view data isn't used, so it shouldn't return anything.
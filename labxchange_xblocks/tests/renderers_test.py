@@ -0,0 +1,62 @@
+"""
+Tests of the Python renderers of the templates
+"""
+from unittest import TestCase
+
+import ddt
+from django.template import Context, Engine
+from django.utils.safestring import mark_safe
+
+from labxchange_xblocks.renderers import RENDERERS
+from labxchange_xblocks.utils import load_resource
+
+UNSAFE = '<script>alert("x" & \'y\')</script>'
+
+CONTEXTS = {
+    'templates/html_student_view.html': (
+        {'html': '<p>Some <b>html</b> &amp; text</p>'},
+        {'html': ''},
+        {'html': None},
+        {},
+    ),
+    'templates/image_student_view.html': (
+        {'image_url': 'https://example.com/a.png?x=1&y=2', 'alt_text': UNSAFE, 'caption': 'A caption',
+         'citation': 'A citation'},
+        {'image_url': '/static/a.png', 'alt_text': '', 'caption': UNSAFE, 'citation': ''},
+        {'image_url': '/static/a.png', 'alt_text': 'Alt', 'caption': '', 'citation': mark_safe('<i>Safe</i>')},
+        {'image_url': '/static/a.png', 'alt_text': None, 'caption': None, 'citation': None},
+        {},
+    ),
+    'templates/document_student_view.html': (
+        {'document_url': 'https://example.com/a.pdf?x=1&y=2', 'document_type': 'application/pdf',
+         'display_name': UNSAFE},
+        {'document_url': '', 'document_type': '', 'display_name': None},
+        {},
+    ),
+    'templates/simulation_student_view.html': (
+        {'simulation_url': 'https://example.com/sim?x=1&y="2"', 'display_name': UNSAFE},
+        {'simulation_url': '', 'display_name': None},
+        {},
+    ),
+}
+
+
+@ddt.ddt
+class RenderersTestCase(TestCase):
+    """
+    Tests that the renderers render the same as the Django templates
+    """
+
+    def test_all_renderers_tested(self):
+        self.assertEqual(set(RENDERERS), set(CONTEXTS))
+
+    @ddt.data(*[
+        (template_path, context)
+        for template_path, contexts in CONTEXTS.items()
+        for context in contexts
+    ])
+    @ddt.unpack
+    def test_parity(self, template_path, context):
+        expected = Engine().from_string(load_resource(template_path)).render(Context(context))
+
+        self.assertEqual(RENDERERS[template_path](context).encode('utf-8'), expected.encode('utf-8'))
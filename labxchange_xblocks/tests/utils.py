@@ -12,6 +12,24 @@ from xblock.field_data import DictFieldData
 from xblock.fields import ScopeIds
 from xblock.runtime import Runtime
 
+from labxchange_xblocks.content import interned_content_cache
+from labxchange_xblocks.utils import (
+    child_metadata_cache,
+    offline_bundle_cache,
+    processed_html_cache,
+    student_view_data_cache,
+    student_view_data_history,
+    user_state_content_cache
+)
+
+
+class PublishedDefinitionKey(str):
+    """
+    Definition key of published blockstore content, whose versions are immutable
+    """
+    bundle_version = 3
+    draft_name = None
+
 
 class BlockTestCaseBase(TestCase):
     """
@@ -22,6 +40,13 @@ class BlockTestCaseBase(TestCase):
 
     def setUp(self):
         super().setUp()
+        child_metadata_cache.clear()
+        interned_content_cache.clear()
+        offline_bundle_cache.clear()
+        processed_html_cache.clear()
+        student_view_data_cache.clear()
+        student_view_data_history.clear()
+        user_state_content_cache.clear()
         self.keys = ScopeIds('a_user', self.block_type, 'def_id', 'usage_id')
         self.runtime_mock = mock.Mock(spec=Runtime)
         self.runtime_mock.construct_xblock_from_class = mock.Mock(side_effect=self._construct_xblock_mock)
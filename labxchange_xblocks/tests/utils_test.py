@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the handlers shared by all blocks
+"""
+import json
+from unittest import TestCase
+
+import ddt
+import mock
+from webob import Request, Response
+from xblock.field_data import DictFieldData
+from xblock.fields import ScopeIds
+
+from labxchange_xblocks.annotated_video_block import AnnotatedVideoBlock
+from labxchange_xblocks.case_study_block import CaseStudyBlock
+from labxchange_xblocks.delta import apply_delta
+from labxchange_xblocks.image_block import ImageBlock
+from labxchange_xblocks.tests.utils import BlockTestCaseBase, PublishedDefinitionKey
+from labxchange_xblocks.utils import (
+    LX_BLOCK_TYPES_OVERRIDE,
+    MAX_BATCH_CALLS,
+    MAX_BULK_BLOCKS,
+    dump_json,
+    json_response,
+    orjson_available,
+    splice_json_objects
+)
+from labxchange_xblocks.video_block import VideoBlock
+
+
+class StudentViewBlockMixinTestCase(BlockTestCaseBase):
+    """
+    Tests of StudentViewBlockMixin, using the image block
+    """
+    block_type = 'lx_image'
+    block_class = ImageBlock
+    maxDiff = None
+
+    def _image_block(self, usage_id, display_name):
+        return self._construct_xblock_mock(
+            ImageBlock,
+            ScopeIds('a_user', 'lx_image', f'def_{usage_id}', usage_id),
+            field_data=DictFieldData({'display_name': display_name}),
+        )
+
+    def _parent_block(self, usage_id, children):
+        block = self._construct_xblock_mock(
+            CaseStudyBlock,
+            ScopeIds('a_user', 'lx_case_study', f'def_{usage_id}', usage_id),
+            field_data=DictFieldData({'display_name': 'Case Study'}),
+        )
+        block.children.extend(children)
+        return block
+
+    def _json_request(self, body, url='/handler'):
+        return Request.blank(url, method='POST', body=json.dumps(body).encode('utf-8'))
+
+    def test_bulk_student_view_data(self):
+        block = self._parent_block('usage_id', ['image-1', 'image-2', 'missing', 'broken'])
+        blocks = {
+            'image-1': self._image_block('image-1', 'Image 1'),
+            'image-2': self._image_block('image-2', 'Image 2'),
+            'outside': self._image_block('outside', 'Not a child'),
+        }
+
+        def get_block(usage_id, block_type_overrides):
+            if usage_id == 'broken':
+                raise ValueError('invalid key')
+            return blocks.get(usage_id)
+
+        self.runtime_mock.get_block.side_effect = get_block
+
+        response = block.v1_bulk_student_view_data(
+            self._json_request({'usage_ids': ['image-1', 'image-2', 'missing', 'broken', 'image-2', 'outside']})
+        )
+
+        self.assertEqual(response.status_code, 200)
+        image_data = {
+            'alt_text': '',
+            'caption': '',
+            'citation': '',
+            'extended_desc': '',
+            'image_url': '',
+        }
+        self.assertEqual(
+            json.loads(response.body.decode('utf-8')),
+            {
+                'image-1': {'data': dict(image_data, display_name='Image 1')},
+                'image-2': {'data': dict(image_data, display_name='Image 2')},
+                'missing': {'error': 'Block not found.'},
+                'broken': {'error': 'Block not found.'},
+                'outside': {'error': 'Block not found.'},
+            },
+        )
+        # Repeated ids are only loaded once, and blocks that aren't descendants aren't loaded
+        self.assertEqual(
+            [call.args[0] for call in self.runtime_mock.get_block.call_args_list],
+            ['image-1', 'image-2', 'missing', 'broken'],
+        )
+
+    def test_bulk_student_view_data_descendants(self):
+        block = self._parent_block('usage_id', ['image-1', 'section', 'image-2'])
+        blocks = {
+            'image-1': self._image_block('image-1', 'Image 1'),
+            'section': self._parent_block('section', ['image-3']),
+            'image-2': self._image_block('image-2', 'Image 2'),
+            'image-3': self._image_block('image-3', 'Image 3'),
+        }
+        self.runtime_mock.get_block.side_effect = lambda usage_id, block_type_overrides: blocks[usage_id]
+
+        response = block.v1_bulk_student_view_data(self._json_request({'usage_ids': ['image-2']}))
+        self.assertEqual(response.json['image-2']['data']['display_name'], 'Image 2')
+        # Only the requested child is loaded
+        self.assertEqual(self.runtime_mock.get_block.call_count, 1)
+
+        self.runtime_mock.get_block.reset_mock()
+        response = block.v1_bulk_student_view_data(self._json_request({'usage_ids': ['image-3']}))
+        self.assertEqual(response.json['image-3']['data']['display_name'], 'Image 3')
+        # The children are loaded to walk the level below
+        self.assertEqual(self.runtime_mock.get_block.call_count, 4)
+
+    def test_bulk_student_view_data_block_error(self):
+        block = self._parent_block('usage_id', ['image-2'])
+        other_block = self._image_block('image-2', 'Image 2')
+        other_block.student_view_data = mock.Mock(side_effect=KeyError('oops'))
+        self.runtime_mock.get_block.return_value = other_block
+
+        response = block.v1_bulk_student_view_data(self._json_request({'usage_ids': ['image-2']}))
+
+        self.assertEqual(
+            json.loads(response.body.decode('utf-8')),
+            {'image-2': {'error': 'Unable to get the student view data of this block.'}},
+        )
+
+    def test_bulk_student_view_data_invalid_request(self):
+        block = self._image_block('usage_id', 'Image 1')
+
+        for body in ({}, {'usage_ids': 'usage_id'}, {'usage_ids': [1]}, ['usage_id']):
+            response = block.v1_bulk_student_view_data(self._json_request(body))
+            self.assertEqual(response.status_code, 400)
+
+        response = block.v1_bulk_student_view_data(
+            self._json_request({'usage_ids': ['usage_id'] * (MAX_BULK_BLOCKS + 1)})
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch(self):
+        block = self._image_block('usage_id', 'Image 1')
+
+        response = block.batch(self._json_request(
+            [
+                ['v1_student_view_data', '', None],
+                ['v1_bulk_student_view_data', None, {'usage_ids': ['usage_id']}],
+                ['v1_bulk_student_view_data', '', {'usage_ids': 'invalid'}],
+                ['batch', '', []],
+                ['student_view', '', None],
+                ['no_such_handler', '', None],
+            ],
+            url='/batch?lx_block_types=1',
+        ))
+
+        self.assertEqual(response.status_code, 200)
+        image_data = {
+            'alt_text': '',
+            'caption': '',
+            'citation': '',
+            'display_name': 'Image 1',
+            'extended_desc': '',
+            'image_url': '',
+        }
+        self.assertEqual(
+            json.loads(response.body.decode('utf-8')),
+            [
+                {'status': 200, 'body': image_data},
+                {'status': 200, 'body': {'usage_id': {'data': image_data}}},
+                {'status': 400, 'body': {'error': 'Expected a JSON body like {"usage_ids": [...]}.'}},
+                {'status': 404, 'body': {'error': "Unknown handler 'batch'."}},
+                {'status': 404, 'body': {'error': "Unknown handler 'student_view'."}},
+                {'status': 404, 'body': {'error': "Unknown handler 'no_such_handler'."}},
+            ],
+        )
+
+    def test_batch_passes_query_string_and_payload(self):
+        block = self._image_block('usage_id', 'Image 1')
+        handler_calls = []
+
+        def handler(request, suffix):
+            handler_calls.append((request.method, request.url, request.json_body, request.data, suffix))
+            return Response(status=204)
+
+        block.test_handler = mock.Mock(side_effect=handler, _is_xblock_handler=True)
+
+        response = block.batch(self._json_request(
+            [['test_handler', 'save', {'speed': 2}]],
+            url='/batch?lx_block_types=1',
+        ))
+
+        self.assertEqual(json.loads(response.body.decode('utf-8')), [{'status': 204, 'body': ''}])
+        self.assertEqual(
+            handler_calls,
+            [('POST', 'http://localhost/test_handler/save?lx_block_types=1', {'speed': 2}, {'speed': 2}, 'save')],
+        )
+
+    def test_batch_invalid_suffix(self):
+        block = self._image_block('usage_id', 'Image 1')
+
+        response = block.batch(self._json_request([['v1_student_view_data', 0, None]]))
+
+        self.assertEqual(
+            json.loads(response.body.decode('utf-8')),
+            [{'status': 400, 'body': {'error': 'Expected a string or null suffix.'}}],
+        )
+
+    def test_batch_invalid_json_response(self):
+        block = self._image_block('usage_id', 'Image 1')
+        block.test_handler = mock.Mock(
+            return_value=Response('{"oops', content_type='application/json', charset='utf8'),
+            _is_xblock_handler=True,
+        )
+
+        response = block.batch(self._json_request([['test_handler', '', None]]))
+
+        self.assertEqual(json.loads(response.body.decode('utf-8')), [{'status': 200, 'body': '{"oops'}])
+
+    def test_batch_handler_error(self):
+        block = self._image_block('usage_id', 'Image 1')
+        block.test_handler = mock.Mock(side_effect=ValueError, _is_xblock_handler=True)
+
+        response = block.batch(self._json_request([['test_handler', '', None]]))
+
+        self.assertEqual(
+            json.loads(response.body.decode('utf-8')),
+            [{'status': 500, 'body': {'error': "Error running handler 'test_handler'."}}],
+        )
+
+    def test_batch_invalid_request(self):
+        block = self._image_block('usage_id', 'Image 1')
+
+        too_many_calls = [['v1_student_view_data', '', None]] * (MAX_BATCH_CALLS + 1)
+        for body in ({}, [['v1_student_view_data', '']], [[1, '', None]], too_many_calls):
+            response = block.batch(self._json_request(body))
+            self.assertEqual(response.status_code, 400)
+
+    def test_student_view_data_etag(self):
+        block = self._image_block('usage_id', 'Image 1')
+        block.student_view_data = mock.Mock(wraps=block.student_view_data)
+
+        response = block.v1_student_view_data(Request.blank('/'))
+        etag = response.etag
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(etag, block.content_version())
+        self.assertEqual(json.loads(response.body.decode('utf-8'))['display_name'], 'Image 1')
+
+        for if_none_match in (f'"{etag}"', f'W/"{etag}"', f'"other", "{etag}"', '*'):
+            response = block.v1_student_view_data(Request.blank('/', headers={'If-None-Match': if_none_match}))
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.body, b'')
+            self.assertEqual(response.etag, etag)
+
+        response = block.v1_student_view_data(Request.blank('/', headers={'If-None-Match': '"other"'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.etag, etag)
+        # The serialized data is cached per content version
+        self.assertEqual(block.student_view_data.call_count, 1)
+
+        block.display_name = 'Image 1 renamed'
+        response = block.v1_student_view_data(Request.blank('/', headers={'If-None-Match': f'"{etag}"'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.etag, etag)
+        self.assertEqual(json.loads(response.body.decode('utf-8'))['display_name'], 'Image 1 renamed')
+
+    def test_student_view_data_fields(self):
+        block = self._image_block('usage_id', 'Image 1')
+
+        response = block.v1_student_view_data(Request.blank('/?fields=display_name,unknown'))
+        self.assertEqual(response.json, {'display_name': 'Image 1'})
+
+        # Responses with other fields are cached separately
+        response = block.v1_student_view_data(Request.blank('/'))
+        self.assertIn('image_url', response.json)
+        response = block.v1_student_view_data(Request.blank('/?fields='))
+        self.assertEqual(response.json, {})
+
+    def test_content_version(self):
+        block = self._image_block('usage_id', 'Image 1')
+        same_block = self._image_block('usage_id', 'Image 1')
+        other_block = self._image_block('usage_id', 'Image 2')
+
+        self.assertEqual(block.content_version(), same_block.content_version())
+        self.assertNotEqual(block.content_version(), other_block.content_version())
+        self.assertNotEqual(block.content_version(), block.content_version(LX_BLOCK_TYPES_OVERRIDE))
+
+    def _published_image_block(self, def_id, display_name):
+        return self._construct_xblock_mock(
+            ImageBlock,
+            ScopeIds('a_user', 'lx_image', PublishedDefinitionKey(def_id), 'usage_id'),
+            field_data=DictFieldData({'display_name': display_name}),
+        )
+
+    def test_content_version_published_definition(self):
+        # Published definitions can't change: the field values aren't hashed
+        self.assertEqual(
+            self._published_image_block('def_1', 'Image 1').content_version(),
+            self._published_image_block('def_1', 'Image 2').content_version(),
+        )
+        self.assertNotEqual(
+            self._published_image_block('def_1', 'Image 1').content_version(),
+            self._published_image_block('def_2', 'Image 1').content_version(),
+        )
+
+    def test_user_state_response(self):
+        get_content_data = mock.Mock(return_value={'display_name': 'Image 1'})
+
+        for position in (1, 2):
+            block = self._published_image_block('def_1', 'Image 1')
+            response = block.user_state_response(get_content_data, {'position': position})
+            self.assertEqual(response.content_type, 'application/json')
+            self.assertEqual(response.json, {'display_name': 'Image 1', 'position': position})
+
+        # The content data of a published definition is only serialized once
+        get_content_data.assert_called_once_with(None)
+
+    def test_user_state_response_unversioned(self):
+        get_content_data = mock.Mock(side_effect=[{'display_name': 'Image 1'}, {'display_name': 'Image 2'}])
+
+        for display_name, position in (('Image 1', 1), ('Image 2', 2)):
+            block = self._image_block('usage_id', display_name)
+            response = block.user_state_response(get_content_data, {'position': position})
+            self.assertEqual(response.json, {'display_name': display_name, 'position': position})
+
+        # Content that isn't versioned isn't hashed to be cached
+        self.assertEqual(get_content_data.call_count, 2)
+
+    def test_student_view_data_not_cacheable(self):
+        block = self._construct_xblock_mock(VideoBlock, self.keys, field_data=DictFieldData({'speed': 1.5}))
+
+        response = block.v1_student_view_data(Request.blank('/', headers={'If-None-Match': '*'}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.etag)
+        self.assertEqual(json.loads(response.body.decode('utf-8'))['speed'], 1.5)
+
+
+@mock.patch(
+    'labxchange_xblocks.annotated_video_block.settings',
+    new=mock.Mock(YOUTUBE={'IMAGE_API': 'https://img.youtube.com/vi/{youtube_id}/0.jpg'}),
+)
+class AnnotatedVideoStudentViewDataTestCase(BlockTestCaseBase):
+    """
+    Tests of the student view data of the annotated video block, with a mock runtime and video block
+
+    Unlike annotated_video_block_test, this doesn't need edx-platform.
+    """
+    block_type = 'lx_annotated_video'
+    block_class = AnnotatedVideoBlock
+
+    def setUp(self):
+        super().setUp()
+        self.video_block = self._construct_xblock_mock(
+            VideoBlock,
+            ScopeIds('a_user', 'lx_video', 'def_id_video', 'video'),
+            field_data=DictFieldData({'display_name': 'Video', 'youtube_id_1_0': 'p2Q6BrNhdh8'}),
+        )
+        self.runtime_mock.get_block.side_effect = (
+            lambda usage_id, **kwargs: self.video_block if usage_id == 'video' else None
+        )
+        self.block = self._construct_xblock_mock(
+            self.block_class,
+            self.keys,
+            field_data=DictFieldData({
+                'display_name': 'Annotated video',
+                'video_id': 'video',
+                'annotations': [
+                    {'id': f'annotation-{index}', 'title': f'Annotation {index}', 'start': index}
+                    for index in range(10)
+                ],
+            }),
+        )
+        self.block.children.append('video')
+
+    def test_student_view_data(self):
+        response = self.block.v1_student_view_data(Request.blank('/'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json['child_blocks'],
+            [{'usage_id': 'video', 'block_type': 'lx_video', 'display_name': 'Video'}],
+        )
+        self.assertEqual(response.json['video_youtube_id'], 'p2Q6BrNhdh8')
+        self.assertEqual(response.json['video_poster'], 'https://img.youtube.com/vi/p2Q6BrNhdh8/0.jpg')
+        self.assertEqual(len(response.json['annotations']), 10)
+
+    def test_student_view_data_since(self):
+        response = self.block.v1_student_view_data(Request.blank('/'))
+        old_version, old_data = response.etag, response.json
+
+        annotations = list(self.block.annotations)
+        annotations[3] = dict(annotations[3], title='Renamed annotation')
+        self.block.annotations = annotations
+        response = self.block.v1_student_view_data(Request.blank(f'/?since={old_version}'))
+
+        self.assertEqual(response.status_code, 226)
+        self.assertEqual(list(response.json['lists']), ['annotations'])
+        new_data = apply_delta(old_data, response.json)
+        self.assertEqual(new_data, self.block.student_view_data())
+        self.assertEqual(new_data['annotations'][3]['title'], 'Renamed annotation')
+        self.assertEqual(new_data['video_youtube_id'], 'p2Q6BrNhdh8')
+
+    def test_student_view_data_loads_video_once(self):
+        self.block.v1_student_view_data(Request.blank('/'))
+
+        # Once for the child metadata, and once for the YouTube ID of the student view data and its version
+        self.assertEqual(self.runtime_mock.get_block.call_count, 2)
+
+    def test_student_view_skips_children(self):
+        with mock.patch.object(AnnotatedVideoBlock, 'add_children_to_fragment') as add_children_to_fragment:
+            self.block.student_view()
+
+        render_context = add_children_to_fragment.call_args[0][3]
+        self.assertEqual(render_context, {'display_name': 'Annotated video', 'video_id': 'video'})
+        self.runtime_mock.get_block.assert_not_called()
+
+
+@ddt.ddt
+class DumpJsonTestCase(TestCase):
+    """
+    Tests of the JSON serialization shared by all handlers
+    """
+
+    @ddt.data(True, False)
+    def test_dump_json(self, use_orjson):
+        if use_orjson and not orjson_available:
+            self.skipTest('orjson is not installed')
+        data = {'name': 'Stars - ستارے', 'values': [1, 2.5, None, True], 3: 'int key'}
+
+        with mock.patch('labxchange_xblocks.utils.orjson_available', use_orjson):
+            body = dump_json(data)
+
+        self.assertIsInstance(body, bytes)
+        self.assertEqual(body, '{"name":"Stars - ستارے","values":[1,2.5,null,true],"3":"int key"}'.encode('utf-8'))
+
+    def test_dump_json_orjson_fallback(self):
+        # Too large for orjson
+        self.assertEqual(dump_json({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+
+    def test_json_response(self):
+        response = json_response({'error': 'oops'}, status=400)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content_type, 'application/json')
+        self.assertEqual(response.json, {'error': 'oops'})
+
+    @ddt.data(
+        (b'{}', b'{}', b'{}'),
+        (b'{"a":1}', b'{}', b'{"a":1}'),
+        (b'{}', b'{"b":[2]}', b'{"b":[2]}'),
+        (b'{"a":1}', b'{"b":[2]}', b'{"a":1,"b":[2]}'),
+    )
+    @ddt.unpack
+    def test_splice_json_objects(self, content_json, user_json, expected_json):
+        self.assertEqual(splice_json_objects(content_json, user_json), expected_json)
@@ -7,7 +7,9 @@ import json
 
 import ddt
 from mock import Mock
+from webob import Request
 from xblock.field_data import DictFieldData
+from xblock.fields import ScopeIds
 
 from labxchange_xblocks.tests.utils import BlockTestCaseBase
 from labxchange_xblocks.video_block import VideoBlock
@@ -28,6 +30,7 @@ class VideoBlockTestCase(BlockTestCaseBase):
                 "encoded_videos": {},
                 "saved_video_position": 0.0,
                 "speed": None,
+                "transcript_language": "en",
                 "transcripts": {},
             },
         ),
@@ -41,6 +44,7 @@ class VideoBlockTestCase(BlockTestCaseBase):
                 },
                 "saved_video_position": 0.0,
                 "speed": None,
+                "transcript_language": "en",
                 "transcripts": {},
             },
         ),
@@ -54,6 +58,7 @@ class VideoBlockTestCase(BlockTestCaseBase):
                 },
                 "saved_video_position": 0.0,
                 "speed": None,
+                "transcript_language": "en",
                 "transcripts": {},
             },
         ),
@@ -67,6 +72,7 @@ class VideoBlockTestCase(BlockTestCaseBase):
                 },
                 "saved_video_position": 0.0,
                 "speed": None,
+                "transcript_language": "en",
                 "transcripts": {},
             },
         ),
@@ -81,6 +87,7 @@ class VideoBlockTestCase(BlockTestCaseBase):
                 },
                 "saved_video_position": 0.0,
                 "speed": None,
+                "transcript_language": "en",
                 "transcripts": {"en": "transcript/download/lang=en"},
             },
         ),
@@ -98,6 +105,7 @@ class VideoBlockTestCase(BlockTestCaseBase):
                 },
                 "speed": 1.5,
                 "saved_video_position": 90.0,
+                "transcript_language": "fr",
                 "transcripts": {"en": "transcript/download/lang=en"},
             },
         ),
@@ -116,6 +124,51 @@ class VideoBlockTestCase(BlockTestCaseBase):
         response = block.student_view_user_state(Mock())
         assert json.loads(response.body.decode("utf-8")) == expected_data
 
+    @ddt.data(
+        ({}, None, "en"),
+        ({}, "pt-PT, en;q=0.5", "pt-BR"),
+        ({}, "de, fr;q=0.8", "fr"),
+        ({}, "de", "en"),
+        ({"transcript_language": "en"}, "fr", "en"),
+    )
+    @ddt.unpack
+    def test_accept_language(self, field_data, accept_language, expected_language):
+        """
+        The transcript language of a learner who hasn't chosen one is negotiated from the Accept-Language header.
+        """
+        field_data = dict({"transcripts": {"en": "en.srt", "fr": "fr.srt", "pt-BR": "pt-BR.srt"}}, **field_data)
+        block = self._construct_xblock_mock(
+            self.block_class, self.keys, field_data=DictFieldData(field_data)
+        )
+        request = Request.blank("/")
+        if accept_language:
+            request.headers["Accept-Language"] = accept_language
+
+        response = block.student_view_user_state(request)
+
+        assert response.json["transcript_language"] == expected_language
+        assert response.headers["Vary"] == "Accept-Language"
+        assert not block._get_fields_to_save()
+
+    def test_transcript_urls_per_learner(self):
+        """
+        Transcript URLs, which can be specific to the learner, aren't shared between learners.
+        """
+        field_data = {"youtube_id_1_0": "-SNwRT85WMo", "transcripts": {"en": "en.srt"}}
+        self.runtime_mock.handler_url = lambda block, handler, query: f"{block.scope_ids.user_id}/{handler}/{query}"
+
+        for user_id in ("first_user", "second_user"):
+            block = self._construct_xblock_mock(
+                self.block_class,
+                ScopeIds(user_id, self.block_type, "def_id", "usage_id"),
+                field_data=DictFieldData(field_data),
+            )
+            expected_transcripts = {"en": f"{user_id}/transcript/download/lang=en"}
+            response = block.student_view_user_state(Request.blank("/"))
+            assert response.json["transcripts"] == expected_transcripts
+            response = block.v1_student_view_data(Request.blank("/"))
+            assert response.json["transcripts"] == expected_transcripts
+
     @ddt.data(
         (
             {
@@ -143,3 +196,56 @@ class VideoBlockTestCase(BlockTestCaseBase):
             self.block_class, self.keys, field_data=DictFieldData(field_data)
         )
         assert block.get_transcripts_info() == expected_data
+
+    @ddt.data(
+        ("en", "en.srt"),
+        ("en-US", "en.srt"),
+        ("pt", "pt-BR.srt"),
+        ("PT_br", "pt-BR.srt"),
+        ("de", None),
+    )
+    @ddt.unpack
+    def test_transcript_download_language(self, lang, expected_filename):
+        """
+        Regional variants are served the transcript of their base language, and the other way around.
+        """
+        block = self._construct_xblock_mock(
+            self.block_class,
+            self.keys,
+            field_data=DictFieldData({"transcripts": {"en": "en.srt", "pt-BR": "pt-BR.srt"}}),
+        )
+        blockstore = Mock()
+        blockstore.get_library_block_asset_file_content.side_effect = (
+            lambda usage_id, filename: f"1\n00:00:00,000 --> 00:00:01,000\n{filename}\n".encode("utf-8")
+        )
+        self.runtime_mock.service.return_value = blockstore
+
+        response = block.transcript(Request.blank(f"/?lang={lang}"), "download")
+
+        if expected_filename is None:
+            assert response.status_code == 404
+        else:
+            assert response.status_code == 200
+            assert response.text.endswith(f"{expected_filename}\n")
+            assert "Vary" not in response.headers
+
+    def test_transcript_download_accept_language(self):
+        """
+        Without a `lang` parameter, the transcript best matching the Accept-Language header is downloaded.
+        """
+        block = self._construct_xblock_mock(
+            self.block_class,
+            self.keys,
+            field_data=DictFieldData({"transcripts": {"en": "en.srt", "pt-BR": "pt-BR.srt"}}),
+        )
+        blockstore = Mock()
+        blockstore.get_library_block_asset_file_content.side_effect = (
+            lambda usage_id, filename: f"1\n00:00:00,000 --> 00:00:01,000\n{filename}\n".encode("utf-8")
+        )
+        self.runtime_mock.service.return_value = blockstore
+
+        response = block.transcript(Request.blank("/", headers={"Accept-Language": "pt-PT,pt;q=0.9"}), "download")
+
+        assert response.status_code == 200
+        assert response.text.endswith("pt-BR.srt\n")
+        assert response.headers["Vary"] == "Accept-Language"
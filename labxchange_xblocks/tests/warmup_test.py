@@ -0,0 +1,85 @@
+"""
+Tests of the warm-up of worker processes
+"""
+from unittest import TestCase
+
+import mock
+
+import labxchange_xblocks
+from labxchange_xblocks import utils
+from labxchange_xblocks.apps import LabXchangeXBlocksConfig
+from labxchange_xblocks.assignment_block import AssignmentBlock
+from labxchange_xblocks.question_block import QuestionBlock
+from labxchange_xblocks.warmup import warm_up
+
+INSTALLED_BLOCKS = [
+    ('lx_assignment', AssignmentBlock),
+    ('problem', QuestionBlock),
+    ('other', mock.Mock(__module__='other_xblocks.other')),
+]
+
+
+class WarmUpTestCase(TestCase):
+    """
+    Tests of warm_up
+    """
+
+    def setUp(self):
+        super().setUp()
+        utils._xblock_classes_from_categories.cache_clear()  # pylint: disable=protected-access
+        self.addCleanup(utils._xblock_classes_from_categories.cache_clear)  # pylint: disable=protected-access
+        patcher = mock.patch('labxchange_xblocks.warmup.XBlock.load_classes', return_value=INSTALLED_BLOCKS)
+        self.load_classes = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch('labxchange_xblocks.warmup.compile_template')
+    @mock.patch('labxchange_xblocks.warmup.settings', new=mock.Mock(configured=True))
+    def test_warm_up(self, compile_template):
+        self.assertGreaterEqual(warm_up(), 0)
+
+        compiled = [call.args[0] for call in compile_template.call_args_list]
+        self.assertEqual(compiled, list(utils.template_paths()))
+        self.assertIn('templates/html_student_view.html', compiled)
+        # The nested blocks of the assignment block are resolved
+        self.assertEqual(list(AssignmentBlock.allowed_nested_blocks), [QuestionBlock])
+        self.assertEqual(self.load_classes.call_count, 2)
+
+    @mock.patch('labxchange_xblocks.warmup.compile_template')
+    @mock.patch('labxchange_xblocks.warmup.settings', new=mock.Mock(configured=False))
+    def test_warm_up_without_django(self, compile_template):
+        warm_up()
+
+        compile_template.assert_not_called()
+
+    def test_xblock_specs(self):
+        specs = utils.xblock_specs_from_categories(('problem', 'drag-and-drop-v2'))
+
+        self.assertEqual(list(specs), [QuestionBlock])
+        # Unlike a generator, the specs can be iterated again, and are only looked up once
+        self.assertEqual(list(specs), [QuestionBlock])
+        self.load_classes.assert_called_once_with()
+
+    @mock.patch('labxchange_xblocks.warmup.warm_up', return_value=0.5)
+    def test_package_attribute(self, warm_up_mock):
+        self.assertEqual(labxchange_xblocks.warm_up(), 0.5)
+        warm_up_mock.assert_called_once_with()
+        with self.assertRaises(AttributeError):
+            labxchange_xblocks.unknown_attribute  # pylint: disable=pointless-statement
+
+
+class AppConfigTestCase(TestCase):
+    """
+    Tests of the Django application configuration
+    """
+
+    @mock.patch('labxchange_xblocks.warmup.warm_up')
+    def test_ready(self, warm_up_mock):
+        config = LabXchangeXBlocksConfig('labxchange_xblocks', labxchange_xblocks)
+
+        with mock.patch('labxchange_xblocks.apps.settings', new=mock.Mock(LABXCHANGE_XBLOCKS_WARM_UP=False)):
+            config.ready()
+        warm_up_mock.assert_not_called()
+
+        with mock.patch('labxchange_xblocks.apps.settings', new=mock.Mock(LABXCHANGE_XBLOCKS_WARM_UP=True)):
+            config.ready()
+        warm_up_mock.assert_called_once_with()
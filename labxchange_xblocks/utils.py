@@ -1,22 +1,56 @@
 """
 Helper code.
 """
+import functools
+import hashlib
+import inspect
+import io
 import json
+import logging
+import os
+import pkgutil
+import time
+import zipfile
+from collections import namedtuple
+from urllib.parse import urlsplit
 
-import pkg_resources
-from django.template import Context, Template
-from django.template.defaulttags import register
 from web_fragments.fragment import Fragment
-from webob import Response
+from webob import Request, Response
 from xblock.core import XBlock, XBlockMixin
+from xblock.fields import Scope
+
+from . import __version__
+from .cache import LRUCache
+from .content import read_field
+from .delta import diff_student_view_data
+from .dependencies import module_available
+from .html_utils import minify_html, sanitize_html
+from .metrics import (
+    HandlerMetrics,
+    Measurement,
+    active_measurements,
+    count_get_block,
+    get_metrics_sink,
+    memory_profiling_active,
+    phase_timings_active,
+    profile_memory,
+    start_phase_timings,
+    stop_phase_timings,
+    timed_phase
+)
+
+log = logging.getLogger(__name__)
 
 module_name = __name__
 
+# edx-platform modules take a while to import, so `static_replace` is only imported by `expand_static_urls`
+replace_urls_available = module_available('static_replace')
+
 try:
-    from static_replace import replace_static_urls
-    replace_urls_available = True
+    import orjson
+    orjson_available = True
 except ImportError:
-    replace_urls_available = False
+    orjson_available = False
 
 
 # Used to override block types when getting block data of children
@@ -26,8 +60,56 @@ LX_BLOCK_TYPES_OVERRIDE = {
     'html': 'lx_html',
 }
 
+# What aggregator blocks need to know about a child block, without instantiating it.
+# `usage_id` is the usage id of the loaded block (the original one, if loaded with `use_original`).
+ChildMetadata = namedtuple('ChildMetadata', ['block_type', 'display_name', 'usage_id'])
+
+# Child metadata index of published content, see `StudentViewBlockMixin.get_child_metadata`.
+# Entries are keyed on the published definition of the parent, which pins the version of its children,
+# so they never go stale and don't need to be invalidated.
+child_metadata_cache = LRUCache(max_size=10000)
+
+# Maximum number of blocks returned by `StudentViewBlockMixin.v1_bulk_student_view_data`
+MAX_BULK_BLOCKS = 100
+
+# Maximum number of handler calls run by `StudentViewBlockMixin.batch`
+MAX_BATCH_CALLS = 20
+
+# Maximum number of blocks in an archive returned by `StudentViewBlockMixin.v1_offline_bundle`
+MAX_OFFLINE_BUNDLE_BLOCKS = 500
+
+# Offline bundle archives, keyed by block and version of the block and its descendants.
+# Archives can be large, so the cache is also bounded by their total size, in bytes.
+OFFLINE_BUNDLE_CACHE_BYTES = 32 * 1024 * 1024
+offline_bundle_cache = LRUCache(max_size=50, max_bytes=OFFLINE_BUNDLE_CACHE_BYTES)
+
+# Serialized `v1_student_view_data` bodies, keyed by block and content version.
+# Bodies of large blocks can be large, so the cache is also bounded by their total size, in bytes.
+STUDENT_VIEW_DATA_CACHE_BYTES = 16 * 1024 * 1024
+student_view_data_cache = LRUCache(max_size=1000, max_bytes=STUDENT_VIEW_DATA_CACHE_BYTES)
+
+# Recent versions of the full `v1_student_view_data` body of each block, to compute deltas against.
+# Each entry is a tuple of `(version, body)` pairs, and counts for the total size of its bodies.
+STUDENT_VIEW_DATA_HISTORY_SIZE = 5
+STUDENT_VIEW_DATA_HISTORY_BYTES = 16 * 1024 * 1024
+student_view_data_history = LRUCache(
+    max_size=1000,
+    max_bytes=STUDENT_VIEW_DATA_HISTORY_BYTES,
+    sizeof=lambda history: sum(len(body) for _, body in history),
+)
+
+# Value of the IM header of `v1_student_view_data` delta responses, see `delta.py` for the format.
+STUDENT_VIEW_DATA_DELTA_IM = 'labxchange-delta'
+
+# Serialized content-only parts of user state responses, see `StudentViewBlockMixin.user_state_response`.
+user_state_content_cache = LRUCache(max_size=2000)
+
+# Inline html of published content processed by `StudentViewBlockMixin.process_html`, keyed by the published
+# definition, the runtime and the html. Expanded static URLs may be signed and expire, so entries expire too.
+PROCESSED_HTML_CACHE_TTL = 5 * 60
+processed_html_cache = LRUCache(max_size=2000, ttl=PROCESSED_HTML_CACHE_TTL)
+
 
-@register.filter
 def get_xblock_content(child_blocks, usage_id):
     """
     Helper function to get the content of an xblock from the standard `child_blocks` list,
@@ -40,6 +122,195 @@ def get_xblock_content(child_blocks, usage_id):
     return None
 
 
+@timed_phase('serialization')
+def dump_json(data):
+    """
+    Serialize `data` to compact, UTF-8 encoded JSON bytes.
+
+    Uses orjson when it is installed, and the standard library otherwise.
+    """
+    if orjson_available:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson is stricter than the standard library (eg. integers over 64 bits): fall back to it
+            pass
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(data, status=200):
+    """
+    Return a JSON response with `data`.
+    """
+    return json_bytes_response(dump_json(data), status=status)
+
+
+def json_bytes_response(body, status=200):
+    """
+    Return a JSON response with a body that is already serialized.
+    """
+    return Response(
+        body=body,
+        status=status,
+        content_type='application/json',
+        charset='UTF-8'
+    )
+
+
+def splice_json_objects(content_json, user_json):
+    """
+    Merge two serialized JSON objects, which must not have keys in common, without decoding them.
+    """
+    if content_json == b'{}':
+        return user_json
+    if user_json == b'{}':
+        return content_json
+    return content_json[:-1] + b',' + user_json[1:]
+
+
+def field_requested(fields, name):
+    """
+    Return True if the top-level key `name` is part of the requested `fields` (None meaning all of them).
+    """
+    return fields is None or name in fields
+
+
+def project_fields(data, fields):
+    """
+    Return the top-level keys of `data` that are part of the requested `fields` (None meaning all of them).
+    """
+    if fields is None:
+        return data
+    return {name: value for name, value in data.items() if name in fields}
+
+
+class _ZipStream(io.RawIOBase):
+    """
+    Unseekable file object collecting what a `ZipFile` writes, so that it can be streamed as it is generated.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def pop(self):
+        """
+        Return what was written since the last call.
+        """
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _response_size(result):
+    """
+    Return the size in bytes of what a handler or view returned, or None if it can't be known cheaply.
+    """
+    if isinstance(result, Response):
+        # Streamed responses (eg. offline bundles) have no content length
+        return result.content_length
+    if isinstance(result, Fragment):
+        return len(result.content.encode('utf-8'))
+    return None
+
+
+def instrument(name, method):
+    """
+    Wrap the handler or view `method` named `name`, so that its metrics are sent to the metrics sink.
+
+    See `metrics.HandlerMetrics` for what is measured. Its allocations are also recorded while memory
+    profiling is on, see `metrics.start_memory_profiling`.
+    """
+    is_handler = getattr(method, '_is_xblock_handler', False)
+
+    @functools.wraps(method)
+    def instrumented(self, *args, **kwargs):
+        # The request is the first argument of handlers
+        if is_handler and args and not phase_timings_active() and self._server_timing_requested(args[0]):
+            call = _call_with_server_timing
+        else:
+            call = _call_with_metrics
+        if memory_profiling_active():
+            return profile_memory(
+                self.scope_ids.block_type, name, functools.partial(call, self, name, method, args, kwargs),
+            )
+        return call(self, name, method, args, kwargs)
+
+    instrumented.lx_instrumented = True
+    return instrumented
+
+
+def _call_with_metrics(block, name, method, args, kwargs):
+    """
+    Call `method`, the handler or view `name` of `block`, and send its metrics to the metrics sink.
+    """
+    sink = get_metrics_sink()
+    measurements = active_measurements()
+    if not sink.enabled or any(m.block is block and m.handler == name for m in measurements):
+        # Not measuring, or an override calling the method it overrides
+        return method(block, *args, **kwargs)
+
+    measurement = Measurement(block, name)
+    cached_fields = set(block._field_data_cache)  # pylint: disable=protected-access
+    written_fields = set(block._get_fields_to_save())  # pylint: disable=protected-access
+    measurements.append(measurement)
+    start = time.perf_counter()
+    try:
+        result = method(block, *args, **kwargs)
+    finally:
+        measurements.pop()
+    wall_time = time.perf_counter() - start
+    sink.record(HandlerMetrics(
+        block_type=block.scope_ids.block_type,
+        handler=name,
+        wall_time=wall_time,
+        get_block_calls=measurement.get_block_calls,
+        # Fields read through the descriptors are cached in the block, the others are counted by `read_field`
+        field_reads=len(
+            (set(block._field_data_cache) - cached_fields) | measurement.read_fields  # pylint: disable=protected-access
+        ),
+        field_writes=len(set(block._get_fields_to_save()) - written_fields),  # pylint: disable=protected-access
+        response_size=_response_size(result),
+    ))
+    return result
+
+
+def _call_with_server_timing(block, name, method, args, kwargs):
+    """
+    Call the handler `method`, timing its phases, and add a Server-Timing header to its response.
+    """
+    timings = start_phase_timings()
+    start = time.perf_counter()
+    try:
+        result = _call_with_metrics(block, name, method, args, kwargs)
+    finally:
+        stop_phase_timings()
+    if isinstance(result, Response):
+        result.headers['Server-Timing'] = timings.server_timing(time.perf_counter() - start)
+    return result
+
+
+def _instrument_handlers_and_views(cls):
+    """
+    Instrument the handlers and views of `cls` (including inherited ones) that aren't instrumented yet.
+    """
+    for name in dir(cls):
+        if name.startswith('_'):
+            continue
+        method = inspect.getattr_static(cls, name)
+        if not inspect.isfunction(method) or getattr(method, 'lx_instrumented', False):
+            continue
+        if getattr(method, '_is_xblock_handler', False) or name.endswith('_view'):
+            setattr(cls, name, instrument(name, method))
+
+
 def _(text):
     """
     Mark string for extraction.
@@ -47,13 +318,67 @@ def _(text):
     return text
 
 
+class XBlockSpecs:
+    """
+    XBlock classes of the available XBlocks from categories.
+
+    The classes are looked up the first time they are iterated, and then once per process,
+    since looking them up scans the entry points of all the installed XBlocks.
+    """
+
+    def __init__(self, categories):
+        self.categories = tuple(categories)
+
+    def __iter__(self):
+        return iter(_xblock_classes_from_categories(self.categories))
+
+
+@functools.lru_cache(maxsize=None)
+def _xblock_classes_from_categories(categories):
+    return tuple(class_ for category, class_ in XBlock.load_classes() if category in categories)
+
+
 def xblock_specs_from_categories(categories):
     """
     Return XBlock classes for available XBlocks from categories.
     """
-    return (
-        class_ for category, class_ in XBlock.load_classes() if category in categories
-    )
+    return XBlockSpecs(categories)
+
+
+def load_resource(resource_path):
+    """
+    Return the content of the package resource `resource_path`, eg. `templates/html_student_view.html`.
+    """
+    return pkgutil.get_data(__package__, resource_path).decode('utf-8')
+
+
+def template_paths():
+    """
+    Return the resource paths of the templates of the blocks.
+    """
+    templates = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+    return tuple(sorted(f'templates/{name}' for name in os.listdir(templates) if name.endswith('.html')))
+
+
+@functools.lru_cache(maxsize=None)
+def _register_template_filters():
+    """
+    Register the template filters used by the templates of the blocks, as Django builtins.
+    """
+    from django.template.defaulttags import register  # pylint: disable=import-outside-toplevel
+    register.filter(get_xblock_content)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(template_path):
+    """
+    Return the Django template of the package resource `template_path`, compiled once per process.
+
+    Django templates are only imported then, as they take a while to import.
+    """
+    from django.template import Template  # pylint: disable=import-outside-toplevel
+    _register_template_filters()
+    return Template(load_resource(template_path))
 
 
 class StudentViewBlockMixin(XBlockMixin):
@@ -62,10 +387,26 @@ class StudentViewBlockMixin(XBlockMixin):
     """
 
     student_view_template = None
+    # How `student_view_template` is rendered: 'django', or 'python' to use its renderer in `renderers.py`
+    # (falling back to Django for templates without one).
+    student_view_template_backend = 'django'
+    # Whether `student_view_data` only depends on the content of the block (see `content_version`),
+    # so that `v1_student_view_data` responses can be cached and validated with an ETag.
+    # Blocks that include user state in their student view data must unset it.
+    student_view_data_cacheable = True
+    # Keys of `student_view_data` the LMS views render (None meaning all of them), so that blocks
+    # can skip computing the others (see `field_requested`).
+    lms_view_fields = None
+    # Whether `process_html` strips the tags and attributes that aren't allowed (requires `bleach`).
+    sanitize_html = False
     css_resource_url = None
     js_resource_url = None
     js_init_function = None
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _instrument_handlers_and_views(cls)
+
     @property
     def user_state(self):
         return {}
@@ -76,23 +417,91 @@ class StudentViewBlockMixin(XBlockMixin):
         """
         return {}
 
-    def _block_type_overrides(self, request):
+    @timed_phase('children')
+    def load_block(self, usage_id, **kwargs):
         """
-        Returns LX_BLOCK_TYPES_OVERRIDE if lx_block_types=1 is part of the request.
+        Return `self.runtime.get_block(usage_id, **kwargs)`, counting the call in the handler metrics.
         """
-        # Deal with the many types of request objects that might come through here
-        if hasattr(request, 'url'):  # WebOb
-            url = request.url
-        elif hasattr(request, 'get_full_path'):  # HttpRequest
-            url = request.get_full_path()
+        count_get_block()
+        return self.runtime.get_block(usage_id, **kwargs)
+
+    def get_child_metadata(self, child_usage_id, block_type_overrides=None, use_original=False):
+        """
+        Return the `ChildMetadata` of a child block, or None if the child can't be loaded.
+
+        For published content, the child block is only instantiated if it isn't in the child metadata index yet.
+        Other children can change at any time, so they are loaded once per instance of this block.
+        """
+        cache_key = (str(child_usage_id), bool(block_type_overrides), use_original)
+        definition = self._published_definition()
+        if definition is None:
+            metadata_by_child = self.__dict__.setdefault('_lx_child_metadata', {})
+            metadata = metadata_by_child.get(cache_key)
         else:
-            url = ''
+            cache_key = (definition,) + cache_key
+            metadata = child_metadata_cache.get(cache_key)
+        if metadata is None:
+            get_block_kwargs = {'block_type_overrides': block_type_overrides}
+            if use_original:
+                get_block_kwargs['use_original'] = True
+            child_block = self.load_block(child_usage_id, **get_block_kwargs)
+            if child_block:
+                metadata = ChildMetadata(
+                    block_type=child_block.scope_ids.block_type,
+                    display_name=child_block.display_name,
+                    usage_id=str(child_block.scope_ids.usage_id),
+                )
+                if definition is None:
+                    metadata_by_child[cache_key] = metadata
+                else:
+                    child_metadata_cache.set(cache_key, metadata)
+        return metadata
 
+    def _block_type_overrides(self, request):
+        """
+        Returns LX_BLOCK_TYPES_OVERRIDE if lx_block_types=1 is part of the request.
+        """
         block_type_overrides = None
-        if 'lx_block_types=1' in url:
+        if 'lx_block_types=1' in self._request_url(request):
             block_type_overrides = LX_BLOCK_TYPES_OVERRIDE
         return block_type_overrides
 
+    def _server_timing_requested(self, request):
+        """
+        Returns True if lx_debug_timing=1 is part of the request, to add a Server-Timing header to the response.
+        """
+        url = self._request_url(request)
+        return isinstance(url, str) and 'lx_debug_timing=1' in url
+
+    def _requested_fields(self, request):
+        """
+        Returns the set of keys listed in the `fields` query parameter of the request, or None if it's absent.
+        """
+        value = self._request_param(request, 'fields')
+        if value is None:
+            return None
+        return frozenset(name.strip() for name in value.split(',') if name.strip())
+
+    def _request_param(self, request, name):
+        """
+        Returns the value of the `name` query parameter of the request, or None.
+        """
+        # WebOb and HttpRequest both have a `GET` mapping
+        params = getattr(request, 'GET', None)
+        value = params.get(name) if params is not None else None
+        return value if isinstance(value, str) else None
+
+    def _request_url(self, request):
+        """
+        Returns the URL of the request.
+        """
+        # Deal with the many types of request objects that might come through here
+        if hasattr(request, 'url'):  # WebOb
+            return request.url
+        if hasattr(request, 'get_full_path'):  # HttpRequest
+            return request.get_full_path()
+        return ''
+
     @XBlock.supports("multi_device")  # Mark as mobile-friendly
     def student_view(self, context=None):
         """
@@ -114,7 +523,7 @@ class StudentViewBlockMixin(XBlockMixin):
         if self.has_children:
             child_blocks_data = []
             for child_usage_id in self.children:
-                child_block = self.runtime.get_block(child_usage_id)
+                child_block = self.load_block(child_usage_id)
                 if child_block:
                     child_block_fragment = child_block.render(child_view, initial_context)
                     child_block_content = child_block_fragment.content
@@ -125,7 +534,7 @@ class StudentViewBlockMixin(XBlockMixin):
                         'display_name': child_block.display_name,
                     })
             render_context['child_blocks'] = child_blocks_data
-        fragment.add_content(self._render_django_template(self.student_view_template, render_context))
+        fragment.add_content(self._render_student_view_template(render_context))
 
     def add_js_resource(self, fragment):
         if self.js_resource_url and self.js_init_function:
@@ -138,20 +547,31 @@ class StudentViewBlockMixin(XBlockMixin):
         if self.css_resource_url:
             fragment.add_css_url(self.runtime.local_resource_url(self, self.css_resource_url))
 
+    @timed_phase('template')
+    def _render_student_view_template(self, context):
+        """
+        Render `student_view_template` with `context`, with the backend set by `student_view_template_backend`.
+        """
+        if self.student_view_template_backend == 'python':
+            from .renderers import RENDERERS  # pylint: disable=import-outside-toplevel
+            renderer = RENDERERS.get(self.student_view_template)
+            if renderer is not None:
+                return renderer(context)
+        return self._render_django_template(self.student_view_template, context)
+
+    @timed_phase('template')
     def _render_django_template(self, template_path, context=None, i18n_service=None):
         """
         Evaluate a django template by resource path, applying the provided context.
         """
-        template_str = self._load_unicode_template(template_path)
-        template = Template(template_str)
-        return template.render(Context(context or {}))
+        from django.template import Context  # pylint: disable=import-outside-toplevel
+        return compile_template(template_path).render(Context(context or {}))
 
     def _load_unicode_template(self, resource_path):
         """
         Gets the content of a resource as UTF8
         """
-        resource_content = pkg_resources.resource_string(module_name, resource_path)
-        return resource_content.decode('utf-8')
+        return load_resource(resource_path)
 
     def _lms_view(self, context, child_view):
         """
@@ -161,11 +581,15 @@ class StudentViewBlockMixin(XBlockMixin):
 
         fragment = Fragment()
 
+        if self.lms_view_fields is None:
+            render_context = self.student_view_data()
+        else:
+            render_context = self.student_view_data({'fields': self.lms_view_fields})
         self.add_children_to_fragment(
             fragment,
             child_view,
             context,
-            self.student_view_data(),
+            render_context,
         )
 
         self.add_css_resource(fragment)
@@ -176,15 +600,482 @@ class StudentViewBlockMixin(XBlockMixin):
     def v1_student_view_data(self, request, suffix=None):  # pylint: disable=unused-argument
         """
         Return JSON representation of content and settings for student view.
+
+        The `fields` query parameter (eg. `?fields=display_name,sections`) limits the response to these keys.
+        Blocks can skip computing the keys that aren't requested, see `field_requested`.
+
+        For cacheable blocks, the response has the content version as ETag,
+        and an empty 304 response is returned if the client already has this version.
+        A client holding an older version can pass it as the `since` query parameter: if that version
+        is still in the recent history of the block, and the delta is smaller than the full data,
+        a `226 IM Used` response is returned with the delta from that version (see `delta.py`).
+        """
+        block_type_overrides = self._block_type_overrides(request)
+        fields = self._requested_fields(request)
+        context = {
+            'block_type_overrides': block_type_overrides,
+            'fields': fields,
+        }
+        if not self.student_view_data_cacheable:
+            return json_response(project_fields(self.student_view_data(context=context), fields))
+
+        version = self.content_version(block_type_overrides, fields)
+        since = self._request_param(request, 'since')
+        if self._etag_matches(request, version) or since == version:
+            response = Response(status=304)
+            response.etag = version
+            return response
+
+        cache_key = (str(self.scope_ids.usage_id), version, fields and tuple(sorted(fields)))
+        body = student_view_data_cache.get(cache_key)
+        if body is None:
+            body = dump_json(project_fields(self.student_view_data(context=context), fields))
+            student_view_data_cache.set(cache_key, body)
+
+        if fields is None:
+            self._record_student_view_data_version(version, body)
+            delta_body = self._student_view_data_delta(since, version, body) if since else None
+            if delta_body:
+                response = json_bytes_response(delta_body, status=226)
+                response.headers['IM'] = STUDENT_VIEW_DATA_DELTA_IM
+                response.etag = version
+                return response
+
+        response = json_bytes_response(body)
+        response.etag = version
+        return response
+
+    def _record_student_view_data_version(self, version, body):
+        """
+        Add the full student view data `body` of `version` to the recent history of this block.
+        """
+        usage_id = str(self.scope_ids.usage_id)
+        history = student_view_data_history.get(usage_id, ())
+        if all(history_version != version for history_version, _ in history):
+            history = (history + ((version, body),))[-STUDENT_VIEW_DATA_HISTORY_SIZE:]
+            student_view_data_history.set(usage_id, history)
+
+    def _student_view_data_delta(self, since, version, body):
+        """
+        Return the serialized delta from the `since` version to `body`, or None.
+
+        None is returned if `since` isn't in the recent history of this block,
+        or if the delta isn't smaller than `body`.
+        """
+        usage_id = str(self.scope_ids.usage_id)
+        cache_key = (usage_id, version, 'since', since)
+        delta_body = student_view_data_cache.get(cache_key)
+        if delta_body is None:
+            old_body = dict(student_view_data_history.get(usage_id, ())).get(since)
+            if old_body is None:
+                return None
+            delta_body = dump_json(diff_student_view_data(json.loads(old_body), json.loads(body)))
+            if len(delta_body) >= len(body):
+                delta_body = b''
+            student_view_data_cache.set(cache_key, delta_body)
+        return delta_body or None
+
+    def user_state_response(self, get_content_data, user_data, fields=None):
+        """
+        Return a JSON response with the content-only data of this block and the `user_data` of the learner.
+
+        Content-only data is the same for all learners. For published content it is serialized once per
+        version of the definition (`get_content_data(fields)` is only called then), and only `user_data`
+        is serialized for each request. Other content is serialized for each request, as versioning it
+        would mean hashing its field values, which costs more than serializing them.
+        Both must be dicts with distinct keys, and are limited to the requested `fields`, if given.
+        """
+        definition = self._published_definition()
+        if definition is None:
+            content_json = dump_json(project_fields(get_content_data(fields), fields))
+        else:
+            cache_key = (str(self.scope_ids.usage_id), definition, __version__, fields and tuple(sorted(fields)))
+            content_json = user_state_content_cache.get(cache_key)
+            if content_json is None:
+                content_json = dump_json(project_fields(get_content_data(fields), fields))
+                user_state_content_cache.set(cache_key, content_json)
+        return json_bytes_response(splice_json_objects(content_json, dump_json(project_fields(user_data, fields))))
+
+    def content_version(self, block_type_overrides=None, fields=None):
+        """
+        Return a hash identifying the version of the content of this block.
+
+        It covers the content and settings field values, the children (see `_children_content`),
+        whether block type overrides are applied, and the version of this package.
+        The definition id of published content stands for its field values and children.
+        If `fields` is given, only the children the requested keys of the student view data depend on are covered,
+        so that children aren't loaded for keys that don't need them.
+        """
+        definition = self._published_definition()
+        if definition is not None:
+            # There's no need to hash the field values of published content, nor its children,
+            # whose version is pinned by the published version of this block.
+            content = {'__definition__': definition}
+        else:
+            # Read without going through the field descriptors, which would keep a copy of mutable values
+            content = {
+                name: field.to_json(read_field(self, name))
+                for name, field in self.fields.items()  # pylint: disable=no-member
+                if field.scope in (Scope.content, Scope.settings)
+            }
+            content['__children__'] = self._children_content(block_type_overrides, fields)
+        content['__block_type_overrides__'] = bool(block_type_overrides)
+        content['__version__'] = __version__
+        serialized_content = json.dumps(content, sort_keys=True, default=str)
+        return hashlib.sha1(serialized_content.encode('utf-8')).hexdigest()
+
+    def _published_definition(self):
+        """
+        Return the definition id of this block if it is published blockstore content, else None.
+
+        The definition id of published content changes with every version of its bundle.
+        """
+        def_id = self.scope_ids.def_id
+        if getattr(def_id, 'bundle_version', None) and not getattr(def_id, 'draft_name', None):
+            return str(def_id)
+        return None
+
+    def _children_content(self, block_type_overrides, fields=None):  # pylint: disable=unused-argument
+        """
+        Return what the student view data of this block depends on in its children, for `content_version`.
+
+        By default that's the list of children; blocks whose data includes child metadata must extend it,
+        and only load the children if a key of the requested `fields` depends on them.
+        """
+        if not self.has_children:
+            return None
+        return [str(child_usage_id) for child_usage_id in self.children]
+
+    def _request_header(self, request, name):
+        """
+        Returns the value of the `name` header of the request, or None.
+        """
+        # WebOb and HttpRequest both have a case-insensitive `headers` mapping
+        headers = getattr(request, 'headers', None)
+        value = headers.get(name) if headers is not None else None
+        return value if isinstance(value, str) else None
+
+    def _etag_matches(self, request, etag):
+        """
+        Returns True if the If-None-Match header of the request matches `etag`.
+        """
+        if_none_match = self._request_header(request, 'If-None-Match')
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag == '*' or tag.strip('"') == etag:
+                return True
+        return False
+
+    @XBlock.handler
+    def v1_bulk_student_view_data(self, request, suffix=None):  # pylint: disable=unused-argument
+        """
+        Return JSON representation of content and settings for student view of several blocks.
+
+        Expects a JSON body like `{"usage_ids": ["lb:LabXchange:1:lx_image:1", ...]}`,
+        and returns the data of each block, keyed by usage id. Only this block and its descendants can be
+        requested. A block that can't be loaded doesn't fail the request; its error is reported in place of its data:
+
+            {
+                "lb:LabXchange:1:lx_image:1": {"data": {"display_name": "Image", ...}},
+                "lb:LabXchange:1:lx_image:2": {"error": "Block not found."},
+            }
         """
+        try:
+            usage_ids = json.loads(request.body.decode('utf-8'))['usage_ids']
+        except (AttributeError, KeyError, TypeError, ValueError):
+            usage_ids = None
+        if not isinstance(usage_ids, list) or not all(isinstance(usage_id, str) for usage_id in usage_ids):
+            return json_response({'error': 'Expected a JSON body like {"usage_ids": [...]}.'}, status=400)
+        if len(usage_ids) > MAX_BULK_BLOCKS:
+            return json_response({'error': f'At most {MAX_BULK_BLOCKS} blocks can be requested at once.'}, status=400)
+
+        block_type_overrides = self._block_type_overrides(request)
         context = {
-            'block_type_overrides': self._block_type_overrides(request),
+            'block_type_overrides': block_type_overrides,
         }
-        return Response(
-            json.dumps(self.student_view_data(context=context)),
-            content_type='application/json',
-            charset='UTF-8'
+        blocks = self._bulk_blocks(set(usage_ids), block_type_overrides)
+        blocks_data = {}
+        for usage_id in usage_ids:
+            if usage_id not in blocks_data:
+                blocks_data[usage_id] = self._bulk_block_data(usage_id, blocks.get(usage_id), context)
+
+        return json_response(blocks_data)
+
+    def _bulk_blocks(self, usage_ids, block_type_overrides):
+        """
+        Return the blocks of `usage_ids` that are this block or one of its descendants, by usage id.
+
+        The descendants are walked one level at a time, until all the requested blocks are found.
+        The requested blocks of a level are loaded first, and the others only if there's a level below to walk.
+        """
+        self_usage_id = str(self.scope_ids.usage_id)
+        blocks = {self_usage_id: self} if self_usage_id in usage_ids else {}
+        remaining_usage_ids = set(usage_ids) - {self_usage_id}
+        seen_usage_ids = {self_usage_id}
+        level = [self]
+        while remaining_usage_ids and level:
+            child_usage_ids = []
+            for block in level:
+                for child_usage_id in (block.children if getattr(block, 'has_children', False) else ()):
+                    if str(child_usage_id) not in seen_usage_ids:
+                        seen_usage_ids.add(str(child_usage_id))
+                        child_usage_ids.append(child_usage_id)
+            child_usage_ids.sort(key=lambda child_usage_id: str(child_usage_id) not in remaining_usage_ids)
+            level = []
+            for child_usage_id in child_usage_ids:
+                if not remaining_usage_ids:
+                    break
+                try:
+                    child_block = self.load_block(child_usage_id, block_type_overrides=block_type_overrides)
+                except Exception as err:  # pylint: disable=broad-except
+                    log.info(f"Bulk student view data: unable to load block {child_usage_id}: {err!r}")
+                    child_block = None
+                if child_block:
+                    level.append(child_block)
+                    if str(child_usage_id) in remaining_usage_ids:
+                        blocks[str(child_usage_id)] = child_block
+                        remaining_usage_ids.discard(str(child_usage_id))
+        return blocks
+
+    def _bulk_block_data(self, usage_id, block, context):
+        """
+        Return `{"data": ...}` with the student view data of `block` (the block `usage_id`), or `{"error": ...}`.
+        """
+        if not block:
+            return {'error': 'Block not found.'}
+        if not hasattr(block, 'student_view_data'):
+            return {'error': 'Block has no student view data.'}
+
+        try:
+            return {'data': block.student_view_data(context=context)}
+        except Exception:  # pylint: disable=broad-except
+            log.exception(f"Bulk student view data: error getting the data of block {usage_id}")
+            return {'error': 'Unable to get the student view data of this block.'}
+
+    @XBlock.handler
+    def batch(self, request, suffix=None):  # pylint: disable=unused-argument
+        """
+        Run several handlers of this block and return all their responses at once.
+
+        Expects a JSON body with a list of `[handler name, suffix, payload]` calls, eg.
+
+            [["v1_student_view_data", "", null], ["submit_answer", "", {"index": 1}]]
+
+        A call with a payload is run as a POST request with the JSON-encoded payload as its body,
+        and a call without one as a GET request. The query string and the headers (eg. Accept-Language,
+        cookies) of the batch request are passed on to every call. All calls run on this same block
+        instance, so its fields are only loaded once.
+
+        Returns the responses in the same order:
+
+            [{"status": 200, "body": {...}}, {"status": 400, "body": {"error": "..."}}]
+
+        `body` is the decoded JSON of JSON responses, and the text of other responses
+        (and of JSON responses that can't be decoded).
+        """
+        try:
+            calls = json.loads(request.body.decode('utf-8'))
+        except (AttributeError, ValueError):
+            calls = None
+        if not (
+            isinstance(calls, list)
+            and all(isinstance(call, list) and len(call) == 3 and isinstance(call[0], str) for call in calls)
+        ):
+            return json_response(
+                {'error': 'Expected a JSON body like [[handler name, suffix, payload], ...].'},
+                status=400,
+            )
+        if len(calls) > MAX_BATCH_CALLS:
+            return json_response({'error': f'At most {MAX_BATCH_CALLS} calls can be batched at once.'}, status=400)
+
+        query_string = urlsplit(self._request_url(request)).query
+        # The body headers of the batch request don't apply to the calls
+        headers = {
+            name: value for name, value in (getattr(request, 'headers', None) or {}).items()
+            if name.lower() not in ('content-length', 'content-type')
+        }
+        results = [
+            self._batch_call(handler_name, suffix, payload, query_string, headers)
+            for handler_name, suffix, payload in calls
+        ]
+        return json_response(results)
+
+    def _batch_call(self, handler_name, suffix, payload, query_string, headers):
+        """
+        Run the handler `handler_name` for `batch`, and return its status and body.
+        """
+        handler = getattr(self, handler_name, None)
+        if handler_name == 'batch' or not getattr(handler, '_is_xblock_handler', False):
+            return {'status': 404, 'body': {'error': f'Unknown handler {handler_name!r}.'}}
+        if suffix is None:
+            suffix = ''
+        elif not isinstance(suffix, str):
+            return {'status': 400, 'body': {'error': 'Expected a string or null suffix.'}}
+
+        url = f'/{handler_name}/{suffix}'
+        if query_string:
+            url = f'{url}?{query_string}'
+        if payload is None:
+            handler_request = Request.blank(url, headers=headers)
+        else:
+            handler_request = Request.blank(
+                url,
+                method='POST',
+                body=dump_json(payload),
+                content_type='application/json',
+                headers=headers,
+            )
+            # Handlers written for Django REST framework requests read the payload from `request.data`
+            handler_request.data = payload
+
+        try:
+            response = handler(handler_request, suffix)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(f"Batch: error running handler {handler_name} of block {self.scope_ids.usage_id}")
+            return {'status': 500, 'body': {'error': f'Error running handler {handler_name!r}.'}}
+
+        body = response.body.decode('utf-8', 'replace')
+        if body and response.content_type == 'application/json':
+            try:
+                body = json.loads(body)
+            except ValueError:
+                log.warning(f"Batch: handler {handler_name} of block {self.scope_ids.usage_id} returned invalid JSON")
+        return {'status': response.status_code, 'body': body}
+
+    @XBlock.handler
+    def v1_offline_bundle(self, request, suffix=None):  # pylint: disable=unused-argument
+        """
+        Return a zip archive with the student view data of this block and all its descendants, for offline use.
+
+        The archive has a `<usage_id>/student_view_data.json` file per block, the files returned by
+        `offline_bundle_files` (eg. transcripts), and a `manifest.json` listing the blocks and their files.
+        It's streamed as it is generated, and has the version of the block and its descendants as ETag.
+
+        Only aggregator blocks (blocks with children) have an offline bundle.
+        """
+        if not self.has_children:
+            return Response(status=404)
+
+        block_type_overrides = self._block_type_overrides(request)
+        blocks = self._offline_bundle_blocks(block_type_overrides)
+        if blocks is None:
+            return json_response(
+                {'error': f'Offline bundles are limited to {MAX_OFFLINE_BUNDLE_BLOCKS} blocks.'},
+                status=400,
+            )
+
+        versions = [
+            block.content_version(block_type_overrides) if isinstance(block, StudentViewBlockMixin) else ''
+            for block in blocks
+        ]
+        version = hashlib.sha1(' '.join(versions).encode('utf-8')).hexdigest()
+        if self._etag_matches(request, version):
+            response = Response(status=304)
+            response.etag = version
+            return response
+
+        # Archives with user state can't be shared between learners
+        cacheable = all(
+            block.student_view_data_cacheable for block in blocks if isinstance(block, StudentViewBlockMixin)
         )
+        cache_key = (str(self.scope_ids.usage_id), version)
+        body = offline_bundle_cache.get(cache_key) if cacheable else None
+        if body is not None:
+            app_iter = [body]
+        else:
+            app_iter = self._offline_bundle_chunks(
+                blocks, block_type_overrides, version, cache_key if cacheable else None,
+            )
+        response = Response(app_iter=app_iter, content_type='application/zip')
+        response.content_disposition = f'attachment; filename="{self.scope_ids.block_type}.zip"'
+        response.etag = version
+        return response
+
+    def _offline_bundle_blocks(self, block_type_overrides):
+        """
+        Return this block and its descendants, depth first, or None if there are more than MAX_OFFLINE_BUNDLE_BLOCKS.
+        """
+        blocks = []
+        seen_usage_ids = {str(self.scope_ids.usage_id)}
+        pending = [self]
+        while pending:
+            block = pending.pop()
+            blocks.append(block)
+            if len(blocks) > MAX_OFFLINE_BUNDLE_BLOCKS:
+                return None
+            if not getattr(block, 'has_children', False):
+                continue
+            children = []
+            for child_usage_id in block.children:
+                if str(child_usage_id) in seen_usage_ids:
+                    continue
+                seen_usage_ids.add(str(child_usage_id))
+                try:
+                    child_block = self.load_block(child_usage_id, block_type_overrides=block_type_overrides)
+                except Exception as err:  # pylint: disable=broad-except
+                    log.info(f"Offline bundle: unable to load block {child_usage_id}: {err!r}")
+                    child_block = None
+                if child_block:
+                    children.append(child_block)
+            pending.extend(reversed(children))
+        return blocks
+
+    def _offline_bundle_chunks(self, blocks, block_type_overrides, version, cache_key):
+        """
+        Generate the offline bundle archive of `blocks`, one chunk per block, and cache it under `cache_key` if given.
+
+        Archives too large for the cache aren't kept in memory once they exceed its size.
+        """
+        stream = _ZipStream()
+        chunks = []
+        chunks_size = 0
+        context = {
+            'block_type_overrides': block_type_overrides,
+        }
+        manifest = {
+            'usage_id': str(self.scope_ids.usage_id),
+            'version': version,
+            'blocks': [],
+        }
+        with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for block in blocks:
+                usage_id = str(block.scope_ids.usage_id)
+                files = []
+                if isinstance(block, StudentViewBlockMixin):
+                    path = f'{usage_id}/student_view_data.json'
+                    archive.writestr(path, dump_json(block.student_view_data(context=context)))
+                    files.append(path)
+                    for name, content in block.offline_bundle_files():
+                        path = f'{usage_id}/{name}'
+                        archive.writestr(path, content)
+                        files.append(path)
+                manifest['blocks'].append({
+                    'usage_id': usage_id,
+                    'block_type': block.scope_ids.block_type,
+                    'files': files,
+                })
+                chunk = stream.pop()
+                if cache_key is not None:
+                    chunks.append(chunk)
+                    chunks_size += len(chunk)
+                    if chunks_size > offline_bundle_cache.max_bytes:
+                        cache_key, chunks = None, []
+                yield chunk
+            archive.writestr('manifest.json', dump_json(manifest))
+        chunks.append(stream.pop())
+        yield chunks[-1]
+        if cache_key is not None:
+            offline_bundle_cache.set(cache_key, b''.join(chunks))
+
+    def offline_bundle_files(self):
+        """
+        Return the `(name, content)` of the files to add to offline bundles for this block, besides its data.
+        """
+        return []
 
     def expand_static_url(self, url):
         """
@@ -192,24 +1083,69 @@ class StudentViewBlockMixin(XBlockMixin):
 
         This is required to make URLs like '/static/image.png' work (note: that is the
         only portable URL format for static files that works across export/import and reruns).
-        This method is unfortunately a bit hackish since XBlock does not provide a low-level API
-        for this.
 
         Input: a string like "/static/image.png"
         Output: an absolute URL as a string, e.g. "https://cdn.none/course/234/image.png"
         """
         html_str = '"{}"'.format(url)  # The static replacers look for quoted URLs like this
+        return self.expand_static_urls(html_str)[1:-1]
+
+    @timed_phase('static')
+    def expand_static_urls(self, html_str):
+        """
+        Expand all the static URLs ("Studio URLs") in `html_str`, in one pass.
+
+        This method is unfortunately a bit hackish since XBlock does not provide a low-level API
+        for this.
+
+        Input: a string like '<img src="/static/image.png">'
+        Output: a string like '<img src="https://cdn.none/course/234/image.png">'
+        """
         if hasattr(self.runtime, 'transform_static_paths_to_urls'):
             # This runtime supports the newest API for replacing static URLs,
             # where the static assets are specific to each XBlock:
-            url = self.runtime.transform_static_paths_to_urls(self, html_str)[1:-1]
+            html_str = self.runtime.transform_static_paths_to_urls(self, html_str)
         elif hasattr(self.runtime, 'replace_urls'):
             # This is the LMS modulestore runtime, which has this API:
-            url = self.runtime.replace_urls(html_str)[1:-1]
+            html_str = self.runtime.replace_urls(html_str)
         elif hasattr(self.runtime, 'course_id'):
             # edX Studio uses a different runtime for 'studio_view' than 'student_view',
             # and the 'studio_view' runtime doesn't provide the replace_urls API.
             if replace_urls_available:
-                url = replace_static_urls(html_str, None, course_id=self.runtime.course_id)[1:-1]
+                from static_replace import replace_static_urls  # pylint: disable=import-outside-toplevel
+                html_str = replace_static_urls(html_str, None, course_id=self.runtime.course_id)
+
+        return html_str
+
+    def process_html(self, html_str):
+        """
+        Return inline html content ready to be served: static URLs expanded, minified,
+        and sanitized if `sanitize_html` is set.
+
+        For published content, the result is cached for a few minutes per version and runtime.
+        Other content can change at any time, so it is processed once per instance of this block.
+        """
+        if not html_str:
+            return html_str
+
+        cache_key = (self.sanitize_html, html_str)
+        definition = self._published_definition()
+        if definition is None:
+            processed_by_html = self.__dict__.setdefault('_lx_processed_html', {})
+            processed = processed_by_html.get(cache_key)
+        else:
+            cache_key = (definition, type(self.runtime)) + cache_key
+            processed = processed_html_cache.get(cache_key)
+        if processed is None:
+            processed = html_str
+            if self.sanitize_html:
+                processed = sanitize_html(processed)
+            processed = minify_html(self.expand_static_urls(processed))
+            if definition is None:
+                processed_by_html[cache_key] = processed
+            else:
+                processed_html_cache.set(cache_key, processed)
+        return processed
+
 
-        return url
+_instrument_handlers_and_views(StudentViewBlockMixin)
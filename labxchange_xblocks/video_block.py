@@ -13,17 +13,17 @@ from xblock import fields
 from xblock.core import XBlock
 from xblock.fields import Scope
 
+from .dependencies import module_available
 from .exceptions import NotFoundError
 from .fields import RelativeTime
-from .utils import StudentViewBlockMixin, _
+from .i18n import match_language, negotiate_language
+from .utils import StudentViewBlockMixin, _, field_requested, json_response
 
-try:
-    from openedx.core.djangolib import blockstore_cache
-    from openedx.core.lib import blockstore_api
-    USE_BLOCKSTORE_CACHE = True
-except ModuleNotFoundError:
-    # We'll try to use the blockstore service instead.
-    USE_BLOCKSTORE_CACHE = False
+# The edx-platform modules are only imported to load transcripts.
+# Without them, we'll try to use the blockstore service instead.
+USE_BLOCKSTORE_CACHE = (
+    module_available('openedx.core.djangolib.blockstore_cache') and module_available('openedx.core.lib.blockstore_api')
+)
 
 log = logging.getLogger(__name__)
 
@@ -116,36 +116,69 @@ class VideoBlock(XBlock, StudentViewBlockMixin):
     )
 
     student_view_template = "templates/video_student_view.html"
+    # The student view data includes the user state
+    student_view_data_cacheable = False
 
     def student_view_data(self, context=None):
         """Return all data required to render or edit the xblock"""
-        return self._get_student_view_user_state()
+        return self._get_student_view_user_state((context or {}).get("fields"))
 
     def _get_youtube_url(self, video_id):
         return f"https://www.youtube.com/watch?v={video_id}"
 
-    def _get_student_view_user_state(self):
+    def _get_student_view_user_state(self, fields=None):
         """Return student view user state"""
+        state = self._get_student_view_learner_state(fields=fields)
+        state.update(self._get_student_view_content_state(fields))
+        return state
+
+    def _get_student_view_learner_state(self, accept_language=None, fields=None):
+        """
+        Return the part of the student view user state that depends on the learner
+
+        The transcript URLs are part of it, as handler URLs can be specific to the learner.
+        """
         state = {
             "saved_video_position": self.saved_video_position.total_seconds(),
             "speed": self.speed,
+            "transcript_language": self._get_learner_transcript_language(accept_language),
         }
+        if field_requested(fields, "transcripts"):
+            state["transcripts"] = {
+                language_code: self.runtime.handler_url(
+                    self, "transcript/download", query=f"lang={language_code}"
+                )
+                for language_code in self.transcripts
+            }
+        return state
 
-        transcripts = self.transcripts.copy()
-        for language_code in self.transcripts.keys():
-            transcripts[language_code] = self.runtime.handler_url(
-                self, "transcript/download", query=f"lang={language_code}"
-            )
-        state["transcripts"] = transcripts
+    def _get_learner_transcript_language(self, accept_language=None):
+        """
+        Return the transcript language chosen by the learner or, if they haven't chosen one yet,
+        the one best matching the `accept_language` header value
+        """
+        if not self.fields["transcript_language"].is_set_on(self):
+            language = negotiate_language(accept_language, tuple(self.get_transcripts_info()))
+            if language is not None:
+                return language
+        return self.transcript_language
 
-        encoded_videos = {}
-        if self.youtube_id_1_0:
-            encoded_videos.update(
-                {"youtube": {"url": self._get_youtube_url(self.youtube_id_1_0)}}
-            )
-        elif self.html5_sources:
-            encoded_videos.update({"fallback": {"url": self.html5_sources[0]}})
-        state["encoded_videos"] = encoded_videos
+    def _get_student_view_content_state(self, fields=None):
+        """
+        Return the part of the student view user state that is the same for all learners
+
+        Only the keys that are part of the requested `fields` are computed.
+        """
+        state = {}
+        if field_requested(fields, "encoded_videos"):
+            encoded_videos = {}
+            if self.youtube_id_1_0:
+                encoded_videos.update(
+                    {"youtube": {"url": self._get_youtube_url(self.youtube_id_1_0)}}
+                )
+            elif self.html5_sources:
+                encoded_videos.update({"fallback": {"url": self.html5_sources[0]}})
+            state["encoded_videos"] = encoded_videos
         return state
 
     @XBlock.handler
@@ -153,10 +186,15 @@ class VideoBlock(XBlock, StudentViewBlockMixin):
         self, request, suffix=""
     ):  # pylint: disable=unused-argument
         """Return student view user state"""
-        state = self._get_student_view_user_state()
-        return Response(
-            json.dumps(state), content_type="application/json", charset="UTF-8"
+        fields = self._requested_fields(request)
+        response = self.user_state_response(
+            self._get_student_view_content_state,
+            self._get_student_view_learner_state(self._request_header(request, "Accept-Language"), fields),
+            fields,
         )
+        # The transcript language is negotiated from the header if the learner hasn't chosen one
+        response.vary = ("Accept-Language",)
+        return response
 
     @XBlock.handler
     def xmodule_handler(self, request, suffix=None):
@@ -178,9 +216,7 @@ class VideoBlock(XBlock, StudentViewBlockMixin):
                 setattr(self, key, value)
 
             response_data = {"success": True}
-        return Response(
-            json.dumps(response_data), content_type="application/json", charset="UTF-8"
-        )
+        return json_response(response_data)
 
     def get_transcripts_info(self):
         """Return all transcripts info"""
@@ -191,24 +227,45 @@ class VideoBlock(XBlock, StudentViewBlockMixin):
                 transcripts_info[language_code] = transcript_file
         return transcripts_info
 
+    def offline_bundle_files(self):
+        """Add the transcripts to offline bundles, as srt files"""
+        files = []
+        transcripts = self.get_transcripts_info()
+        for language_code in transcripts:
+            try:
+                content, _, _ = self.get_transcript_from_blockstore(
+                    language_code, Transcript.SRT, transcripts
+                )
+            except NotFoundError as err:
+                log.info(f"Video {self.scope_ids.usage_id}: transcript not added to the offline bundle: {err}")
+                continue
+            files.append((f"transcripts/{language_code}.srt", content.encode("utf-8")))
+        return files
+
     def get_transcript_from_blockstore(self, language, output_format, transcripts):
         """Return trancsript from blockstore"""
         language = language or "en"
 
         if output_format not in (Transcript.SRT, Transcript.SJSON, Transcript.TXT):
             raise NotFoundError(f"Invalid transcript format `{output_format}`")
-        if language not in transcripts:
+        # eg. the "en" transcript for "en-US"
+        transcript_language = match_language(language, tuple(transcripts))
+        if transcript_language is None:
             raise NotFoundError(
                 f"Video {self.scope_ids.usage_id} does not have a transcript "
                 f"file defined for the '{language}' language in its OLX."
             )
-        filename = transcripts[language]
+        filename = transcripts[transcript_language]
         if not filename.endswith(".srt"):
             raise NotFoundError(
                 "Video XBlocks in Blockstore only support .srt transcript files."
             )
 
         if USE_BLOCKSTORE_CACHE:
+            # pylint: disable=import-outside-toplevel
+            from openedx.core.djangolib import blockstore_cache
+            from openedx.core.lib import blockstore_api
+
             bundle_uuid = self.scope_ids.def_id.bundle_uuid
             path = self.scope_ids.def_id.olx_path.rpartition("/")[0] + "/static/" + filename
             bundle_version = self.scope_ids.def_id.bundle_version
@@ -258,7 +315,7 @@ class VideoBlock(XBlock, StudentViewBlockMixin):
             log.info("Invalid /translation request: no language.")
             return Response(status=400)
 
-        if language not in ["en"] + transcripts.keys():
+        if language != "en" and match_language(language, tuple(transcripts)) is None:
             log.info(
                 f"Video: transcript not available for given language (language: {language})."
             )
@@ -323,7 +380,14 @@ class VideoBlock(XBlock, StudentViewBlockMixin):
             elif hasattr(request, 'query_params'):
                 params = request.query_params
             lang = params.get("lang", None)
-            return self.handle_transcript_download(transcripts, lang)
+            if lang:
+                return self.handle_transcript_download(transcripts, lang)
+            response = self.handle_transcript_download(
+                transcripts,
+                self._get_learner_transcript_language(self._request_header(request, "Accept-Language")),
+            )
+            response.vary = ("Accept-Language",)
+            return response
         else:
             log.debug("Path not supported.")
             response = Response(status=404)
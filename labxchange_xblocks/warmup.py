@@ -0,0 +1,53 @@
+"""
+Warm-up of worker processes.
+
+The blocks load some things on first use: compiled templates, the languages table, the classes of
+the blocks they can nest, and the tables of the parsers they use. `warm_up` loads them all,
+so that the first requests a worker serves are as fast as the following ones.
+
+It can be run when Django starts, see `apps.LabXchangeXBlocksConfig`.
+"""
+import logging
+import time
+
+from django.conf import settings
+from xblock.core import XBlock
+
+from .fields import RelativeTime
+from .html_utils import minify_html, sanitize_html
+from .i18n import all_languages, language_options, normalize_language_tag
+from .utils import compile_template, template_paths
+
+log = logging.getLogger(__name__)
+
+
+def warm_up():
+    """
+    Load what the blocks of this package load on first use, and return the time it took in seconds.
+
+    Templates are only compiled if Django is configured.
+    """
+    start = time.perf_counter()
+
+    if settings.configured:
+        for template_path in template_paths():
+            compile_template(template_path)
+
+    all_languages()
+    language_options()
+    normalize_language_tag('en-US')
+
+    # Scans the entry points of the installed XBlocks, and imports the blocks of this package
+    block_classes = [
+        class_ for _, class_ in XBlock.load_classes() if class_.__module__.startswith(f'{__package__}.')
+    ]
+    for class_ in block_classes:
+        list(getattr(class_, 'allowed_nested_blocks', ()))
+
+    # `time.strptime` compiles its regular expressions on first use, and bleach loads the html5lib tables
+    RelativeTime.isotime_to_timedelta('00:00:00')
+    minify_html(sanitize_html('<p>Warm-up</p>'))
+
+    duration = time.perf_counter() - start
+    log.info(f'Warmed up {len(block_classes)} blocks in {duration:.3f}s')
+    return duration
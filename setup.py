@@ -94,7 +94,7 @@ setup(
     packages=[
         'labxchange_xblocks',
     ],
-    package_data=package_data('labxchange_xblocks', ['static', 'public']),
+    package_data=package_data('labxchange_xblocks', ['data', 'static', 'public']),
     include_package_data=True,
     install_requires=load_requirements('requirements/base.in'),
     license="Apache 2.0",